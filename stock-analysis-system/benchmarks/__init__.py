@@ -0,0 +1 @@
+"""Offline benchmarks for the stock analysis tools."""
@@ -0,0 +1,109 @@
+"""
+Cold-start (import time) benchmark.
+
+Each target is imported in a fresh interpreter several times and the wall time
+of the import is reported, so regressions in what the package pulls in at
+import are easy to spot. Run from ``stock-analysis-system``:
+
+    python -m benchmarks.import_time
+    python -m benchmarks.import_time --top 15 --target "root agent"
+    python -m benchmarks.import_time --json imports.json
+    python -m benchmarks.import_time --compare imports.json --tolerance 25
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# name -> statement run after the interpreter has started
+TARGETS = {
+    "manager": "import manager",
+    "manager.tools": "import manager.tools",
+    "manager.workflow": "import manager.workflow",
+    "manager.pipeline": "import manager.pipeline",
+    "root agent": "import manager; manager.root_agent",
+}
+
+_TIMER = (
+    "import time; _t = time.perf_counter()\n"
+    "{statement}\n"
+    "print(time.perf_counter() - _t)\n"
+)
+
+
+def _run(code: str, *flags: str) -> subprocess.CompletedProcess:
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE='1')
+    env.setdefault('STOCKBOT_LOG_LEVEL', 'WARNING')
+    return subprocess.run([sys.executable, *flags, '-c', code], cwd=ROOT, env=env,
+                          capture_output=True, text=True, check=True)
+
+
+def measure(statement: str, repeat: int) -> dict:
+    """Import wall time (ms) of a statement over `repeat` fresh interpreters"""
+    samples = []
+    for _ in range(repeat):
+        output = _run(_TIMER.format(statement=statement)).stdout.strip().splitlines()
+        samples.append(float(output[-1]) * 1000)
+    return {"min_ms": min(samples), "median_ms": statistics.median(samples), "max_ms": max(samples)}
+
+
+def slowest_modules(statement: str, top: int) -> List[Tuple[str, int, int]]:
+    """(module, self us, cumulative us) of the slowest imports according to -X importtime"""
+    rows = []
+    for line in _run(statement, '-X', 'importtime').stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, module = (part.strip() for part in line[len('import time:'):].split('|'))
+        rows.append((module, int(self_us), int(cumulative_us)))
+    return sorted(rows, key=lambda row: row[1], reverse=True)[:top]
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Measure import (cold start) time of the manager package")
+    parser.add_argument('--repeat', type=int, default=5, help="fresh interpreters per target")
+    parser.add_argument('--target', action='append', choices=list(TARGETS), help="targets to run (default: all)")
+    parser.add_argument('--top', type=int, default=0, help="also list the N slowest modules per target")
+    parser.add_argument('--json', help="write the results to this file")
+    parser.add_argument('--compare', help="results file of an earlier run to compare against")
+    parser.add_argument('--tolerance', type=float, default=25.0, help="allowed slowdown of the median in percent")
+    args = parser.parse_args(argv)
+
+    _run("pass")  # warm the OS file cache for the interpreter itself
+    interpreter = measure("pass", args.repeat)["median_ms"]
+
+    results: Dict[str, dict] = {}
+    print(f"{'target':<20}{'min ms':>10}{'median ms':>12}{'max ms':>10}")
+    for name in args.target or list(TARGETS):
+        results[name] = measure(TARGETS[name], args.repeat)
+        r = results[name]
+        print(f"{name:<20}{r['min_ms']:>10.1f}{r['median_ms']:>12.1f}{r['max_ms']:>10.1f}")
+        for module, self_us, cumulative_us in slowest_modules(TARGETS[name], args.top) if args.top else ():
+            print(f"    {module:<50}{self_us / 1000:>8.1f} ms self{cumulative_us / 1000:>10.1f} ms total")
+    print(f"\n(empty statement: {interpreter:.2f} ms)")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            before = json.load(f)
+        regressions = [
+            f"{name} median_ms: {before[name]['median_ms']:.1f} -> {r['median_ms']:.1f}"
+            for name, r in results.items()
+            if name in before and r['median_ms'] > before[name]['median_ms'] * (1 + args.tolerance / 100)
+        ]
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,177 @@
+"""
+Offline benchmark of the agent tool functions.
+
+Starts the stub server, points the tools at it and measures throughput and
+p50/p99 latency of each tool function. Run from ``stock-analysis-system``:
+
+    python -m benchmarks.run --latency-ms 40 --iterations 200 --concurrency 8
+    python -m benchmarks.run --json results.json
+    python -m benchmarks.run --compare results.json --tolerance 20
+
+With --compare the run exits with status 1 when a tool's p50 or p99 is more
+than --tolerance percent slower than in the saved results.
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List
+
+from .stub_server import StubServer
+
+SYMBOLS = ['AAPL', 'MSFT', 'NVDA', 'TSLA', 'AMZN', 'JPM']
+QUERIES = [
+    "Why did Tesla stock drop today?",
+    "What's happening with $NVDA this week?",
+    "How has Microsoft performed this month?",
+    "Compare AAPL and AMZN",
+    "Any news on JPMorgan Chase?",
+]
+
+PRICE_DATA = "Current price: $196.45, change: -2.75 (-1.38%). Over 1month the price went down by 3.20 (1.60%)."
+NEWS_DATA = "\n".join([
+    "Apple shares slip as iPhone demand concerns weigh on outlook",
+    "Apple supplier reports record quarterly revenue on strong orders",
+    "Why Apple stock is down this week: downgrade cites valuation risk",
+    "Apple faces EU probe over App Store rules",
+    "Apple Intelligence rollout expands, boosting growth in services",
+])
+
+
+def _configure_environment(url: str, data_dir: str) -> None:
+    """Point the tools at the stub; must run before the manager package is imported"""
+    os.environ['FMP_BASE_URL'] = f"{url}/api/v3"
+    os.environ['NEWS_API_BASE_URL'] = f"{url}/v2"
+    os.environ.setdefault('FMP_API_KEY', 'benchmark')
+    os.environ.setdefault('NEWS_API_KEY', 'benchmark')
+    os.environ['STOCKBOT_DATA_DIR'] = data_dir
+    # Measure the tools, not the plan quotas
+    os.environ['STOCKBOT_RATE_FMP_PER_MINUTE'] = '0'
+    os.environ['STOCKBOT_RATE_NEWSAPI_PER_DAY'] = '0'
+
+
+def _cases() -> Dict[str, Callable[[int], dict]]:
+    from manager.sub_agents.identify_ticker.agent import identify_ticker_from_query
+    from manager.sub_agents.ticker_analysis.agent import analyze_stock_movement
+    from manager.sub_agents.ticker_news.agent import get_ticker_news
+    from manager.sub_agents.ticker_price.agent import get_current_price
+    from manager.sub_agents.ticker_price_change.agent import calculate_price_change
+
+    def symbol(i):
+        return SYMBOLS[i % len(SYMBOLS)]
+
+    return {
+        'get_current_price': lambda i: get_current_price(request=f"get price for {symbol(i)}"),
+        'calculate_price_change': lambda i: calculate_price_change(symbol(i), ('1day', '1week', '1month')[i % 3]),
+        'get_ticker_news': lambda i: get_ticker_news(symbol(i), 5),
+        'identify_ticker_from_query': lambda i: identify_ticker_from_query(QUERIES[i % len(QUERIES)]),
+        'analyze_stock_movement': lambda i: analyze_stock_movement(symbol(i), PRICE_DATA, NEWS_DATA, "1month"),
+    }
+
+
+def _percentile(values: List[float], q: float) -> float:
+    values = sorted(values)
+    return values[min(int(q * len(values)), len(values) - 1)] if values else 0.0
+
+
+def measure(fn: Callable[[int], dict], iterations: int, concurrency: int, warmup: int,
+            clear_cache: Callable[[], None] = None) -> dict:
+    """Run fn(i) `iterations` times on `concurrency` threads and summarize the latencies (ms)"""
+    for i in range(warmup):
+        fn(i)
+
+    def timed(i):
+        if clear_cache is not None:
+            clear_cache()
+        start = time.perf_counter()
+        try:
+            ok = fn(i).get("status") != "error"
+        except Exception:
+            ok = False
+        return (time.perf_counter() - start) * 1000, ok
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        samples = list(pool.map(timed, range(iterations)))
+    wall = time.perf_counter() - start
+
+    latencies = [ms for ms, _ in samples]
+    return {
+        "iterations": iterations,
+        "errors": sum(1 for _, ok in samples if not ok),
+        "throughput": iterations / wall if wall else 0.0,
+        "mean_ms": sum(latencies) / len(latencies),
+        "p50_ms": _percentile(latencies, 0.50),
+        "p99_ms": _percentile(latencies, 0.99),
+    }
+
+
+def compare(results: Dict[str, dict], baseline: Dict[str, dict], tolerance: float) -> List[str]:
+    """Regressions of more than `tolerance` percent in p50 or p99 against a baseline"""
+    regressions = []
+    for tool, result in results.items():
+        before = baseline.get(tool)
+        if not before:
+            continue
+        for metric in ('p50_ms', 'p99_ms'):
+            if before[metric] > 0 and result[metric] > before[metric] * (1 + tolerance / 100):
+                regressions.append(f"{tool} {metric}: {before[metric]:.2f} -> {result[metric]:.2f}")
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the tool functions against a local stub server")
+    parser.add_argument('--iterations', type=int, default=200)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--warmup', type=int, default=5)
+    parser.add_argument('--latency-ms', type=float, default=20.0, help="stub response latency")
+    parser.add_argument('--jitter-ms', type=float, default=5.0, help="uniform +/- jitter on the latency")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="fraction of stub responses that fail")
+    parser.add_argument('--error-status', type=int, default=503)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--no-cache', action='store_true',
+                        help="clear the in-memory response cache before every call (local stores still apply)")
+    parser.add_argument('--tools', nargs='+', help="tool functions to run (default: all)")
+    parser.add_argument('--json', help="write the results to this file")
+    parser.add_argument('--compare', help="results file of an earlier run to compare against")
+    parser.add_argument('--tolerance', type=float, default=20.0, help="allowed slowdown in percent")
+    args = parser.parse_args(argv)
+
+    stub = StubServer(latency=args.latency_ms / 1000, jitter=args.jitter_ms / 1000,
+                      error_rate=args.error_rate, error_status=args.error_status, seed=args.seed)
+    with stub as url, tempfile.TemporaryDirectory(prefix='stockbot-bench-') as data_dir:
+        _configure_environment(url, data_dir)
+        cases = _cases()
+        from manager.tools.cache import response_cache
+        clear_cache = response_cache.clear if args.no_cache else None
+
+        results = {}
+        for name in args.tools or list(cases):
+            if name not in cases:
+                parser.error(f"unknown tool {name}; choose from {', '.join(cases)}")
+            results[name] = measure(cases[name], args.iterations, args.concurrency, args.warmup, clear_cache)
+
+    print(f"\n{'tool':<28}{'ops/s':>10}{'mean ms':>10}{'p50 ms':>10}{'p99 ms':>10}{'errors':>8}")
+    for name, r in results.items():
+        print(f"{name:<28}{r['throughput']:>10.1f}{r['mean_ms']:>10.2f}{r['p50_ms']:>10.2f}{r['p99_ms']:>10.2f}{r['errors']:>8}")
+    print(f"\nstub requests: {dict(stub.requests)}, injected errors: {dict(stub.errors)}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
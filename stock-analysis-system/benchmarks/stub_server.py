@@ -0,0 +1,216 @@
+"""
+Local stand-in for the FMP and NewsAPI endpoints used by the tools.
+
+Serves the JSON fixtures in ``fixtures/`` with optional latency and error
+injection, so the tools can be benchmarked without API keys or network:
+
+    with StubServer(latency=0.05, error_rate=0.01) as url:
+        os.environ['FMP_BASE_URL'] = f"{url}/api/v3"
+        os.environ['NEWS_API_BASE_URL'] = f"{url}/v2"
+
+Fixtures were captured for AAPL; other symbols get the same data with their
+own symbol and a per-symbol price scale. Historical bars and articles are re-dated
+to end today so the price and news stores see current data.
+"""
+
+import json
+import os
+import random
+import threading
+import time
+import zlib
+from collections import Counter
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs, unquote, urlparse
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+
+def load_fixture(name: str):
+    with open(os.path.join(FIXTURES_DIR, f"{name}.json")) as f:
+        return json.load(f)
+
+
+def _recent_weekdays(count: int, end: Optional[date] = None) -> List[date]:
+    """The last `count` weekdays up to `end` (today), newest first"""
+    day = end or date.today()
+    days = []
+    while len(days) < count:
+        if day.weekday() < 5:
+            days.append(day)
+        day -= timedelta(days=1)
+    return days
+
+
+def _redate(articles: List[dict], field: str, separator: str) -> List[dict]:
+    """Shift article dates so the newest fixture article was published today"""
+    newest = max(date.fromisoformat(a[field][:10]) for a in articles)
+    shift = date.today() - newest
+    for article in articles:
+        day = date.fromisoformat(article[field][:10]) + shift
+        article[field] = f"{day.isoformat()}{separator}{article[field][11:]}"
+    return articles
+
+
+class StubServer:
+    """Threaded HTTP server answering FMP and NewsAPI requests from fixtures"""
+
+    def __init__(self, latency: float = 0.0, jitter: float = 0.0, error_rate: float = 0.0,
+                 error_status: int = 503, seed: Optional[int] = None, port: int = 0):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.port = port
+        self.requests: Counter = Counter()
+        self.errors: Counter = Counter()
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server: Optional[ThreadingHTTPServer] = None
+
+        self.quotes: Dict[str, dict] = {q['symbol']: q for q in load_fixture('quote')}
+        self.stock_list: List[dict] = load_fixture('stock-list')
+        self.search_results: List[dict] = load_fixture('search')
+        self.news: List[dict] = _redate(load_fixture('stock_news'), 'publishedDate', ' ')
+        self.everything: dict = load_fixture('everything')
+        self.everything['articles'] = _redate(self.everything['articles'], 'publishedAt', 'T')
+        history = load_fixture('historical-price-full')['historical']
+        for row, day in zip(history, _recent_weekdays(len(history))):
+            row['date'] = day.isoformat()
+        self.history: List[dict] = history
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_address[1]}"
+
+    def start(self) -> str:
+        handler = type('Handler', (_Handler,), {'stub': self})
+        self._server = ThreadingHTTPServer(('127.0.0.1', self.port), handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, name='stub-server', daemon=True).start()
+        return self.url
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self) -> str:
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    # Injection
+
+    def _delay(self) -> float:
+        with self._lock:
+            return max(0.0, self.latency + self._random.uniform(-self.jitter, self.jitter))
+
+    def _fail(self) -> bool:
+        with self._lock:
+            return self.error_rate > 0 and self._random.random() < self.error_rate
+
+    def _record(self, endpoint: str, failed: bool) -> None:
+        with self._lock:
+            self.requests[endpoint] += 1
+            if failed:
+                self.errors[endpoint] += 1
+
+    # Responses
+
+    def _scale(self, symbol: str) -> float:
+        quote = self.quotes.get(symbol)
+        if quote is not None:
+            return quote['price'] / self.quotes['AAPL']['price']
+        return 0.2 + (zlib.crc32(symbol.encode()) % 400) / 100.0
+
+    def quote(self, symbol: str) -> dict:
+        if symbol in self.quotes:
+            return self.quotes[symbol]
+        scale = self._scale(symbol)
+        template = self.quotes['AAPL']
+        return dict(template, symbol=symbol, name=f"{symbol} Inc.",
+                    **{k: round(template[k] * scale, 2) for k in ('price', 'dayLow', 'dayHigh', 'open', 'previousClose')})
+
+    def historical(self, symbol: str, params: dict) -> dict:
+        rows = self.history
+        if 'from' in params:
+            rows = [r for r in rows if r['date'] >= params['from']]
+        if 'to' in params:
+            rows = [r for r in rows if r['date'] <= params['to']]
+        if 'timeseries' in params:
+            rows = rows[:int(params['timeseries'])]
+        scale = self._scale(symbol)
+        if scale != 1.0:
+            rows = [dict(r, **{k: round(r[k] * scale, 2) for k in ('open', 'high', 'low', 'close', 'adjClose')})
+                    for r in rows]
+        return {'symbol': symbol, 'historical': rows}
+
+    def respond(self, path: str, params: dict):
+        """(status, body) for a request path and its single-valued query parameters"""
+        if '/quote/' in path:
+            symbols = unquote(path.split('/quote/', 1)[1]).split(',')
+            return 200, [self.quote(s.upper()) for s in symbols if s]
+        if '/historical-price-full/' in path:
+            symbols = [s.upper() for s in unquote(path.split('/historical-price-full/', 1)[1]).split(',') if s]
+            if len(symbols) == 1:
+                return 200, self.historical(symbols[0], params)
+            return 200, {'historicalStockList': [self.historical(s, params) for s in symbols]}
+        if path.endswith('/stock_news'):
+            symbol = params.get('tickers', 'AAPL').split(',')[0].upper()
+            articles = [dict(a, symbol=symbol, title=a['title'].replace('Apple', symbol))
+                        for a in self.news if a['publishedDate'][:10] >= params.get('from', '')]
+            return 200, articles[:int(params.get('limit', 10))]
+        if path.endswith('/search'):
+            query = params.get('query', '').lower()
+            found = [s for s in self.search_results + self.stock_list
+                     if query and (query in s['symbol'].lower() or query in s['name'].lower())]
+            return 200, list({s['symbol']: s for s in found}.values())[:int(params.get('limit', 10))]
+        if path.endswith('/stock/list'):
+            return 200, self.stock_list
+        if path.endswith('/everything'):
+            cutoff = params.get('from', '')
+            articles = [a for a in self.everything['articles'] if a['publishedAt'][:len(cutoff)] >= cutoff]
+            articles = articles[:int(params.get('pageSize', 100))]
+            return 200, dict(self.everything, totalResults=len(articles), articles=articles)
+        return 404, {'Error Message': f"Unknown endpoint {path}"}
+
+
+def _endpoint_name(path: str) -> str:
+    for endpoint in ('quote', 'historical-price-full'):
+        if f"/{endpoint}/" in path:
+            return endpoint
+    return path.rstrip('/').rsplit('/', 1)[-1]
+
+
+class _Handler(BaseHTTPRequestHandler):
+    stub: StubServer
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        parsed = urlparse(self.path)
+        params = {k: v[0] for k, v in parse_qs(parsed.query).items()}
+        endpoint = _endpoint_name(parsed.path)
+        delay = self.stub._delay()
+        if delay:
+            time.sleep(delay)
+        failed = self.stub._fail()
+        self.stub._record(endpoint, failed)
+        if failed:
+            status, body = self.stub.error_status, {'Error Message': 'Injected error'}
+        else:
+            status, body = self.stub.respond(parsed.path, params)
+
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
@@ -1,14 +1,30 @@
 """
 Stock Analysis System Manager
-This module initializes the main agent and ensures all sub-agents are properly loaded
+
+The root agent and the sub-agents are built on first access (``manager.agent``
+or ``manager.root_agent``), not when the package is imported, so processes
+that only use the tools, the pipeline functions or the watchlist do not load
+ADK or build any agent.
 """
 
-print("Loading manager module...")
+import importlib
 
-# Import the main agent - it will handle subagent imports
-from .agent import agent
+from .registry import get_agent, get_tool, lazy_attributes
 
-# Export the agent
-__all__ = ['agent']
 
-print("Manager module loaded successfully")
\ No newline at end of file
+def _agent_module():
+    module = importlib.import_module('.agent', __name__)
+    # Importing the submodule binds manager.agent to it; keep the name for the root agent
+    globals()['agent'] = module.agent
+    return module
+
+
+__getattr__ = lazy_attributes(
+    globals(),
+    agent=lambda: _agent_module().agent,
+    root_agent=lambda: _agent_module().agent,
+    manager_agent=lambda: _agent_module().manager_agent,
+)
+
+# Export the agent
+__all__ = ['agent', 'root_agent', 'manager_agent', 'get_agent', 'get_tool']
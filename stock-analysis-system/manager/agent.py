@@ -1,15 +1,8 @@
 from google.adk.agents import Agent
 from google.adk.tools.agent_tool import AgentTool
-import sys
-import logging
 
-# Set up basic logging at the beginning
-print("==========================================")
-print("STOCK ANALYSIS SYSTEM STARTING")
-print("==========================================")
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - StockBot: %(message)s')
-print(f"Python version: {sys.version}")
-print("Loading manager agent...")
+# This module builds every agent; the manager package imports it on first
+# access to manager.agent / manager.root_agent
 
 # Use relative imports with dot notation
 from .sub_agents.identify_ticker.agent import identify_ticker
@@ -17,29 +10,37 @@ from .sub_agents.ticker_news.agent import ticker_news
 from .sub_agents.ticker_price.agent import ticker_price
 from .sub_agents.ticker_price_change.agent import ticker_price_change
 from .sub_agents.ticker_analysis.agent import ticker_analysis
+from .workflow import gather_ticker_data
+from .portfolio import analyze_portfolio
+from .pipeline import FAST_PATH_ENABLED, StockAnalysisPipeline
+from .tools.telemetry import agent_callbacks, configure_logging, get_logger, start_metrics_server
 
-print(f"All sub-agents loaded successfully")
+configure_logging()
+logger = get_logger('agent')
 
-agent = Agent(
+manager_agent = Agent(
     name="stock_analysis_manager",
     model="gemini-2.0-flash",
     description="Multi-agent system for comprehensive stock analysis",
     instruction="""
     You are a stock analysis manager coordinating multiple agents for stock market insights.
     
+    PARSED QUERY: {query_intent?}
+    
     IMMEDIATE ACTION REQUIRED:
     
-    1. For ANY stock-related question, print "WORKFLOW STARTED: IDENTIFYING TICKER" and use the identify_ticker agent by calling transfer_to_agent with agent_name="identify_ticker".
+    1. If PARSED QUERY above lists tickers, do NOT transfer to identify_ticker: print "TICKER IDENTIFIED: [SYMBOL]" and continue with step 2 (step 3 when it lists several tickers), using its timeframe. Otherwise (PARSED QUERY is "none" or empty), for ANY stock-related question, print "WORKFLOW STARTED: IDENTIFYING TICKER" and use the identify_ticker agent by calling transfer_to_agent with agent_name="identify_ticker".
     
     2. When identify_ticker returns control to you with a ticker identified, print "TICKER IDENTIFIED: [SYMBOL]" and IMMEDIATELY:
-       a. Print "STEP 1: GETTING PRICE DATA" and call ticker_price with request="get price for [SYMBOL]"
-       b. Print "STEP 2: GETTING PRICE CHANGE" and call ticker_price_change with request="calculate 1day change for [SYMBOL]"
-       c. Print "STEP 3: GETTING NEWS DATA" and call ticker_news with request="get news for [SYMBOL]"
-       d. Print "STEP 4: ANALYZING DATA" and call ticker_analysis with request="analyze [SYMBOL] movement based on price and news data"
+       a. Print "STEP 1: GETTING PRICE, PRICE CHANGE AND NEWS DATA" and call gather_ticker_data with ticker="[SYMBOL]" and timeframe="1day" (or the timeframe of PARSED QUERY / the period the user asked about: 1week, 1month, 3month, 6month, ytd, 1year). It fetches the price, the price change and the news at the same time.
+       b. Only if the price, price_change or news part of that result has status "error", call the matching tool for that part: ticker_price with request="get price for [SYMBOL]", ticker_price_change with request="calculate 1day change for [SYMBOL]", or ticker_news with request="get news for [SYMBOL]"
+       c. Print "STEP 2: ANALYZING DATA" and call ticker_analysis with request="analyze [SYMBOL] movement based on price and news data"
+    
+    3. If identify_ticker returns several tickers (a comparison such as "compare NVDA, AMD and INTC this month", or a portfolio review), do NOT run step 2 per ticker. Call analyze_portfolio ONCE with tickers=[all the symbols] and the timeframe, then present its "ranked" list (best to worst) with price, change percentage and news sentiment for each, its "summary", and the likely reasons per stock.
     
-    3. You MUST complete ALL steps in sequence without stopping.
+    4. You MUST complete ALL steps in sequence without stopping.
     
-    4. After completing all steps, provide a comprehensive response. It must include:
+    5. After completing all steps, provide a comprehensive response. It must include:
     - The identified ticker symbol
     - The current price
     - The last recoprded price in the timeframe requested
@@ -64,24 +65,33 @@ agent = Agent(
      
 
     
-    IMPORTANT: When control returns from identify_ticker, IMMEDIATELY begin the analysis workflow.
+    IMPORTANT: When PARSED QUERY lists tickers, or when control returns from identify_ticker, IMMEDIATELY begin the analysis workflow.
     
     Example:
-    - If identify_ticker identifies TSLA, call ticker_price with request="get price for TSLA"
-    - Then call ticker_price_change with request="calculate 1day change for TSLA"
-    - Then call ticker_news with request="get news for TSLA"
+    - If identify_ticker identifies TSLA, call gather_ticker_data with ticker="TSLA" and timeframe="1day"
     - Then call ticker_analysis with request="analyze TSLA movement based on price and news data"
     """,
     sub_agents=[identify_ticker],
     tools=[
+        gather_ticker_data,
+        analyze_portfolio,
         AgentTool(ticker_price),
         AgentTool(ticker_news),
         AgentTool(ticker_price_change),
         AgentTool(ticker_analysis),
     ],
+    **agent_callbacks(),
 )
 
-print(f"Manager agent '{agent.name}' initialized successfully with {len(agent.tools)} tools")
-print("==========================================")
-print("STOCK ANALYSIS SYSTEM READY")
-print("==========================================")
\ No newline at end of file
+# Root agent: deterministic fast path, with the multi-agent manager as fallback
+agent = StockAnalysisPipeline(
+    name="stock_analysis_pipeline",
+    description="Fast-path stock analysis pipeline that falls back to the multi-agent manager",
+    sub_agents=[manager_agent],
+    **agent_callbacks(llm=False),
+)
+
+# Prometheus /metrics endpoint when STOCKBOT_METRICS_PORT is set
+start_metrics_server()
+
+logger.info("Stock analysis agents ready (fast path %s)", 'enabled' if FAST_PATH_ENABLED else 'disabled')
\ No newline at end of file
@@ -0,0 +1,201 @@
+"""
+Deterministic parsing of what a query asks for, before any model call.
+
+``parse_intent`` pulls the ticker(s), the timeframe and the kind of request out
+of a query with the offline symbol directory and a few regular expressions. The
+fast path uses the result directly, and the root agent hands it to the manager
+through session state, so the manager skips the identify_ticker transfer and
+re-inferring the timeframe. Only intents below CONFIDENCE_THRESHOLD go through
+identify_ticker (and the manager model) as before.
+
+    intent = parse_intent("Why did $NVDA and AMD drop this week?")
+    intent.tickers, intent.timeframe, intent.request   # ['NVDA', 'AMD'], '1week', 'comparison'
+"""
+
+import os
+import re
+from typing import List, Optional, Tuple
+
+from .tools.symbol_directory import get_symbol_directory
+
+# Intents at or above this confidence are used without the identify_ticker agent
+CONFIDENCE_THRESHOLD = float(os.getenv('STOCKBOT_INTENT_THRESHOLD', '0.75'))
+
+REQUEST_TYPES = ("analysis", "price", "price_change", "news", "indicators", "comparison")
+
+# Confidence of a ticker by how it was found
+_METHOD_CONFIDENCE = {
+    'cashtag': 0.95,
+    'direct_match': 0.95,  # uppercase word that is in the loaded listing
+    'company_name_match': 0.9,  # built-in alias
+    'directory_match': 0.8,  # name from the listing
+    'unlisted_match': 0.8,  # uppercase word, no listing loaded to check it against
+}
+
+# Uppercase words that are almost never meant as tickers unless written as $CASHTAGS
+_NOT_TICKERS = {
+    'AI', 'ATH', 'ATR', 'CEO', 'CFO', 'CPI', 'EMA', 'EOD', 'EPS', 'ETF', 'EU', 'FDA', 'FED', 'GDP',
+    'IPO', 'MACD', 'PE', 'RSI', 'SEC', 'SMA', 'UK', 'US', 'USA', 'USD', 'YTD',
+}
+
+# Spans of the engine's horizons in calendar days, for "last N days/weeks/months"
+_HORIZON_DAYS = (("1day", 1), ("1week", 7), ("1month", 30), ("3month", 91), ("6month", 182), ("1year", 365))
+# The same spans in trading sessions, for "last N days" meant as trading days
+_HORIZON_SESSIONS = (("1day", 1), ("1week", 5), ("1month", 21), ("3month", 63), ("6month", 126), ("1year", 252))
+# A span maps to a horizon only when it is within this share of the horizon's length
+_SPAN_TOLERANCE = 0.2
+# Confidence cap of a query naming a span no horizon covers ("last 10 days", "two years")
+_UNMATCHED_SPAN_CONFIDENCE = 0.5
+_UNIT_DAYS = {'day': 1, 'week': 7, 'month': 30, 'year': 365}
+_NUMBER_WORDS = {
+    'one': 1, 'two': 2, 'three': 3, 'four': 4, 'five': 5, 'six': 6, 'seven': 7, 'eight': 8,
+    'nine': 9, 'ten': 10, 'twelve': 12,
+}
+
+_SPAN_RE = re.compile(
+    r'\b(\d+|' + '|'.join(_NUMBER_WORDS) + r')[\s-]*(day|week|month|year)s?\b', re.IGNORECASE)
+
+# First match wins, so specific phrases come before the words they contain
+_TIMEFRAME_PATTERNS = [
+    (re.compile(r'\b(ytd|year[\s-]to[\s-]date|this year|since (the start of the year|january))\b', re.IGNORECASE), "ytd"),
+    (re.compile(r'\b(quarter|quarterly)\b', re.IGNORECASE), "3month"),
+    (re.compile(r'\b(year|annual|yearly)\b', re.IGNORECASE), "1year"),
+    (re.compile(r'\b(month|monthly)\b', re.IGNORECASE), "1month"),
+    (re.compile(r'\b(week|weekly)\b', re.IGNORECASE), "1week"),
+    (re.compile(r'\b(today|yesterday|daily|overnight|intraday|24 hours|this morning|this afternoon)\b', re.IGNORECASE), "1day"),
+]
+
+_REQUEST_PATTERNS = [
+    (re.compile(r'\b(rsi|macd|sma|ema|atr|moving averages?|indicators?|technicals?|overbought|oversold|'
+                r'volatility|volatile|drawdown|momentum)\b', re.IGNORECASE), "indicators"),
+    (re.compile(r'\b(compare|comparison|versus|vs\.?|portfolio|rank|ranking|outperform(ed|ing)?)\b',
+                re.IGNORECASE), "comparison"),
+    (re.compile(r'\b(why|reasons?|explain|what happened|what\'s happening|going on|driv(e|es|en|ing)|'
+                r'analy[sz](e|is)|drop(ped)?|fall|fell|falling|ris(e|en|ing)|rose|jump(ed)?|surg(e|ed)|'
+                r'plung(e|ed)|rall(y|ied)|tank(ed)?|soar(ed)?|crash(ed)?|spike[d]?|sink|sank|slump(ed)?)\b',
+                re.IGNORECASE), "analysis"),
+    (re.compile(r'\b(news|headlines?|articles?|stories|announcements?)\b', re.IGNORECASE), "news"),
+    (re.compile(r'\b(change[ds]?|perform(ed|ance)?|return(ed|s)?|gain(ed|s)?|lost|loss|moved?|how much has|'
+                r'up or down)\b', re.IGNORECASE), "price_change"),
+    (re.compile(r'\b(price|trading at|trade at|quote|worth|cost|valued|how much is)\b', re.IGNORECASE), "price"),
+]
+
+
+class Intent:
+    """Tickers, timeframe and kind of request of one query"""
+
+    __slots__ = ('query', 'tickers', 'methods', 'timeframe', 'timeframe_explicit', 'request', 'confidence')
+
+    def __init__(self, query: str, tickers: List[str], methods: List[str], timeframe: Optional[str],
+                 timeframe_explicit: bool, request: str, confidence: float):
+        self.query = query
+        self.tickers = tickers
+        self.methods = methods
+        self.timeframe = timeframe
+        self.timeframe_explicit = timeframe_explicit
+        self.request = request
+        self.confidence = confidence
+
+    @property
+    def ticker(self) -> Optional[str]:
+        return self.tickers[0] if self.tickers else None
+
+    @property
+    def confident(self) -> bool:
+        return bool(self.tickers) and self.confidence >= CONFIDENCE_THRESHOLD
+
+    def __repr__(self) -> str:
+        return (f"Intent({self.tickers}, {self.timeframe}, {self.request}, "
+                f"confidence={self.confidence:.2f})")
+
+    def describe(self) -> str:
+        """One line for the manager's instruction ("none" when not confident)"""
+        if not self.confident:
+            return "none"
+        return (f"tickers={','.join(self.tickers)}; timeframe={self.timeframe}; request={self.request}")
+
+    def to_dict(self) -> dict:
+        return {
+            "tickers": self.tickers,
+            "methods": self.methods,
+            "timeframe": self.timeframe,
+            "timeframe_explicit": self.timeframe_explicit,
+            "request": self.request,
+            "confidence": self.confidence,
+        }
+
+
+def _find_tickers(query: str) -> List[Tuple[str, str]]:
+    """(symbol, method) of every ticker mentioned, in order of mention, without duplicates"""
+    directory = get_symbol_directory()
+    matches = []
+    for match in directory.find_tickers(query):
+        if query[match.start] == '$':
+            method = 'cashtag'
+        elif match.symbol in _NOT_TICKERS:
+            continue
+        else:
+            method = 'direct_match' if directory.has_listing else 'unlisted_match'
+        matches.append((match.start, match.symbol, method))
+    matches.extend((match.start, match.symbol, match.method) for match in directory.find_names(query))
+
+    found, seen = [], set()
+    for _, symbol, method in sorted(matches):
+        if symbol not in seen:
+            seen.add(symbol)
+            found.append((symbol, method))
+    return found
+
+
+def _span_horizon(count: int, unit: str) -> Optional[str]:
+    """Horizon whose length is close to count units, if any"""
+    spans = _HORIZON_DAYS + _HORIZON_SESSIONS if unit == 'day' else _HORIZON_DAYS
+    days = count * _UNIT_DAYS[unit]
+    horizon, length = min(spans, key=lambda span: abs(span[1] - days) / span[1])
+    return horizon if abs(length - days) <= _SPAN_TOLERANCE * length else None
+
+
+def parse_timeframe(query: str) -> Tuple[Optional[str], bool]:
+    """
+    (engine horizon, whether the query named a period); "1day" when it named
+    none, None when it named a span no horizon covers
+    """
+    match = _SPAN_RE.search(query)
+    if match:
+        count = match.group(1).lower()
+        count = int(count) if count.isdigit() else _NUMBER_WORDS[count]
+        return _span_horizon(count, match.group(2).lower()), True
+    for pattern, timeframe in _TIMEFRAME_PATTERNS:
+        if pattern.search(query):
+            return timeframe, True
+    return "1day", False
+
+
+def parse_request(query: str, ticker_count: int = 1) -> str:
+    """Kind of answer the query asks for (one of REQUEST_TYPES)"""
+    for pattern, request in _REQUEST_PATTERNS:
+        if pattern.search(query):
+            # Several tickers make a comparison whatever else is asked, unless it is about indicators
+            if ticker_count > 1 and request != "indicators":
+                return "comparison"
+            return request
+    return "comparison" if ticker_count > 1 else "analysis"
+
+
+def parse_intent(query: str) -> Intent:
+    """Parse a query without network or model calls"""
+    found = _find_tickers(query)
+    timeframe, explicit = parse_timeframe(query)
+    confidence = min((_METHOD_CONFIDENCE[method] for _, method in found), default=0.0)
+    if timeframe is None:
+        # Leave the period to the manager rather than answer for a different one
+        confidence = min(confidence, _UNMATCHED_SPAN_CONFIDENCE)
+    return Intent(
+        query=query,
+        tickers=[symbol for symbol, _ in found],
+        methods=[method for _, method in found],
+        timeframe=timeframe,
+        timeframe_explicit=explicit,
+        request=parse_request(query, len(found)),
+        confidence=confidence,
+    )
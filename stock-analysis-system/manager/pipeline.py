@@ -0,0 +1,334 @@
+"""
+Deterministic fast path for the standard stock analysis workflow.
+
+Instead of letting the manager model decide on each hop (transfer to
+identify_ticker, then one AgentTool round trip per data tool), the pipeline
+parses the query (see intent.py), gathers price, price change and news, and
+runs analyze_stock_movement directly in Python. The model is called once, to write
+the final narrative. Whenever the pipeline cannot complete, the request is
+handed to the multi-agent manager unchanged.
+
+Narratives are memoized by (ticker, timeframe, digest of the price change and
+news they are written from). Identical questions over unchanged data within
+NARRATIVE_TTL are answered without a model call, and a new bar or article
+changes the digest, so the next question gets a fresh narrative.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import re
+from typing import AsyncGenerator, Dict, Tuple
+
+from google.adk.agents import BaseAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events import Event, EventActions
+from google.genai import types
+
+from .intent import Intent, parse_intent
+from .sub_agents.identify_ticker.agent import identify_ticker_from_query
+from .sub_agents.ticker_analysis.agent import analyze_stock_movement
+from .portfolio import analyze_portfolio
+from .tools.cache import TTLCache
+from .tools.telemetry import CACHE_REQUESTS, get_logger, registry, traced_tool
+from .workflow import describe_news, describe_price_change, gather_ticker_data
+
+logger = get_logger('pipeline')
+
+PIPELINE_MODEL = "gemini-2.0-flash"
+
+# Set STOCKBOT_FAST_PATH=0 to always use the multi-agent manager
+FAST_PATH_ENABLED = os.getenv('STOCKBOT_FAST_PATH', '1').lower() not in ('0', 'false', 'no')
+
+# Seconds a narrative is reused for unchanged inputs (0 disables the cache)
+NARRATIVE_TTL = float(os.getenv('STOCKBOT_NARRATIVE_TTL', '600'))
+
+narrative_cache = TTLCache(maxsize=int(os.getenv('STOCKBOT_NARRATIVE_CACHE_SIZE', '512')))
+registry.register_collector('narrative_cache', narrative_cache.stats)
+
+# Narratives being generated, so concurrent identical questions share one model call
+_narratives_in_flight: Dict[Tuple[str, str, str], asyncio.Future] = {}
+
+_PERIOD_LABELS = {
+    "1day": "1 day", "1week": "1 week", "1month": "1 month",
+    "3month": "3 months", "6month": "6 months", "ytd": "year to date", "1year": "1 year",
+}
+
+# Session state key under which the root agent hands the parsed query to the manager
+INTENT_STATE_KEY = "query_intent"
+
+
+class PipelineError(Exception):
+    """The fast path could not produce an answer and the manager should take over"""
+
+
+async def resolve_intent(query: str) -> Intent:
+    """
+    The parsed query, with identify_ticker_from_query (which may search the
+    API) filling in the tickers when the local parse is not confident
+    """
+    intent = parse_intent(query)
+    if intent.confident:
+        return intent
+    if intent.timeframe is None:
+        raise PipelineError("The query names a period none of the horizons covers")
+    identified = await asyncio.to_thread(identify_ticker_from_query, query)
+    if identified.get("status") != "success":
+        raise PipelineError(f"Could not identify a ticker: {identified.get('error')}")
+    intent.tickers = identified.get("tickers") or [identified["ticker"]]
+    intent.methods = [identified["method"]] * len(intent.tickers)
+    return intent
+
+
+async def collect_analysis_inputs(query: str) -> dict:
+    """Identify the ticker and gather everything the final narrative needs"""
+    intent = await resolve_intent(query)
+    if intent.request == "indicators":
+        # The fast path has no indicator step; the manager's ticker_price_change agent does
+        raise PipelineError("Technical indicator questions are answered by the manager")
+    if len(intent.tickers) > 1:
+        return await collect_portfolio_inputs(query, intent.tickers, intent.timeframe)
+
+    ticker, timeframe = intent.ticker, intent.timeframe
+    data = await gather_ticker_data(ticker, timeframe)
+
+    price_change = data["price_change"]
+    if price_change["status"] != "success":
+        raise PipelineError(price_change["error"])
+
+    analysis = analyze_stock_movement(
+        ticker,
+        describe_price_change(price_change),
+        describe_news(data["news"]),
+        _PERIOD_LABELS.get(timeframe, timeframe),
+    )
+    if analysis["status"] != "success":
+        raise PipelineError(analysis["error"])
+
+    return {
+        "query": query,
+        "ticker": ticker,
+        "timeframe": timeframe,
+        "price": data["price"],
+        "price_change": price_change,
+        "news": data["news"],
+        "analysis": analysis,
+    }
+
+
+async def collect_portfolio_inputs(query: str, tickers: list, timeframe: str = "1day") -> dict:
+    """Gather and rank the data of every ticker of a comparison or portfolio query"""
+    portfolio = await analyze_portfolio(tickers, timeframe)
+    if not portfolio.get("ranked"):
+        raise PipelineError(portfolio.get("error") or f"No price data for any of {', '.join(tickers)}")
+    return {
+        "query": query,
+        "mode": "portfolio",
+        "tickers": tickers,
+        "timeframe": timeframe,
+        "portfolio": portfolio,
+    }
+
+
+def build_narrative_prompt(inputs: dict) -> str:
+    """Prompt for the single model call that writes the final answer"""
+    if inputs.get("mode") == "portfolio":
+        return build_portfolio_prompt(inputs)
+    payload = {key: inputs[key] for key in ("ticker", "timeframe", "price", "price_change", "news", "analysis")}
+    return f"""
+    You are a stock analysis assistant. Answer the user's question using ONLY the data below.
+    Parts marked "stale" are the last known good data from before an upstream outage; say so and give their "as_of" date when present.
+
+    User question: {inputs['query']}
+
+    Data (JSON):
+    {json.dumps(payload, indent=2, default=str)}
+
+    The final output must be like this:
+    - Ticker Symbol: AAPL
+    - Timeframe: 1 week
+    - Current Price: $175.30
+    - Last Recorded Price (1 week ago): $170.00
+    - Latest News Headlines:
+        1. "Apple Unveils New iPhone Model"
+        2. "Apple Reports Record Quarterly Earnings"
+        3. "Analysts Upgrade Apple Stock Rating"
+    - Analysis: The stock price increased steadily over the week, driven by strong earnings and positive product announcements.
+    - Likely Reasons: Investor optimism following the new iPhone launch and better-than-expected earnings.
+    """
+
+
+def build_portfolio_prompt(inputs: dict) -> str:
+    """Prompt for the final answer to a multi-ticker query"""
+    portfolio = inputs["portfolio"]
+    payload = {key: portfolio[key] for key in ("timeframe", "period_description", "ranked", "summary", "errors")}
+    return f"""
+    You are a stock analysis assistant. Compare the stocks below to answer the user's question, using ONLY this data.
+
+    User question: {inputs['query']}
+
+    Data (JSON, "ranked" is sorted from best to worst price change):
+    {json.dumps(payload, indent=2, default=str)}
+
+    The final output must be like this:
+    - Timeframe: 1 month
+    - Ranking (best to worst):
+        1. NVDA: $135.20, +8.40% (news sentiment: positive)
+        2. AMD: $160.10, +2.10% (news sentiment: neutral)
+        3. INTC: $21.05, -4.30% (news sentiment: negative)
+    - Summary: 2 of 3 stocks rose; the average change was +2.07%.
+    - Likely Reasons: One or two sentences per stock, based on its headlines and analysis.
+    - Not Available: Tickers listed under "errors", if any.
+    - Data Notice: If any entry is marked "stale", say that its data may be out of date.
+    """
+
+
+@traced_tool
+async def generate_narrative(prompt: str, model: str = PIPELINE_MODEL) -> str:
+    """The one model call of the fast path"""
+    from google import genai
+
+    client = genai.Client()
+    response = await client.aio.models.generate_content(model=model, contents=prompt)
+    if not response.text:
+        raise PipelineError("Model returned an empty narrative")
+    return response.text
+
+
+def _news_identity(news: dict) -> list:
+    """The set of articles in a get_ticker_news result, independent of order"""
+    articles = news.get("news") if news.get("status") == "success" else None
+    if not isinstance(articles, list):
+        return []
+    return sorted((a.get("url") or a.get("title") or "", a.get("published") or "") for a in articles)
+
+
+# Markers that change on every call during an outage without the data changing
+_STALENESS_FIELDS = ("stale", "stale_seconds", "as_of")
+
+
+def _without_staleness(value):
+    if isinstance(value, dict):
+        return {key: _without_staleness(item) for key, item in value.items() if key not in _STALENESS_FIELDS}
+    if isinstance(value, list):
+        return [_without_staleness(item) for item in value]
+    return value
+
+
+_QUESTION_NOISE_RE = re.compile(r'[^a-z0-9$%.]+')
+
+
+def _normalized_question(query: str) -> str:
+    """The question without case, punctuation or spacing differences"""
+    return _QUESTION_NOISE_RE.sub(' ', query.lower()).strip(' .')
+
+
+def narrative_key(inputs: dict) -> Tuple[str, str, str, str]:
+    """
+    (ticker(s), timeframe, normalized question, digest of the price change(s)
+    and the set of news articles); the narrative answers the question, so
+    "why did AAPL drop" and "should I buy AAPL" are answered separately
+    """
+    if inputs.get("mode") == "portfolio":
+        subject = ",".join(inputs["tickers"])
+        data = {key: inputs["portfolio"][key] for key in ("ranked", "errors")}
+    else:
+        # The price change already holds the latest close; the live quote would change the key every TTL
+        subject = inputs["ticker"]
+        data = {
+            "price_change": inputs["price_change"],
+            "news": _news_identity(inputs["news"]),
+        }
+    data = _without_staleness(data)
+    digest = hashlib.sha256(json.dumps(data, sort_keys=True, default=str).encode()).hexdigest()
+    return (subject, inputs["timeframe"], _normalized_question(inputs["query"]), digest)
+
+
+async def cached_narrative(inputs: dict) -> Tuple[str, bool]:
+    """
+    The narrative for inputs, from the cache when the same data was answered recently
+
+    Returns:
+        (narrative, cached) where cached is True when no model call was made for it
+    """
+    key = narrative_key(inputs)
+    narrative = narrative_cache.get(key)
+    CACHE_REQUESTS.inc(kind='narrative', result="miss" if narrative is None else "hit")
+    if narrative is not None:
+        return narrative, True
+
+    pending = _narratives_in_flight.get(key)
+    if pending is not None and pending.get_loop() is asyncio.get_running_loop():
+        return await asyncio.shield(pending), True
+
+    task = asyncio.ensure_future(generate_narrative(build_narrative_prompt(inputs)))
+    _narratives_in_flight[key] = task
+    try:
+        # Shielded so that waiters still get the narrative if this caller is cancelled
+        narrative = await asyncio.shield(task)
+    finally:
+        if _narratives_in_flight.get(key) is task:
+            del _narratives_in_flight[key]
+    narrative_cache.set(key, narrative, NARRATIVE_TTL)
+    return narrative, False
+
+
+@traced_tool
+async def run_pipeline(query: str) -> dict:
+    """
+    Run the whole analysis for a query without agent hops
+
+    Returns:
+        Dictionary with the collected inputs, the final "response" text and
+        whether it came from the narrative cache ("cached"), or status "error"
+        when the multi-agent manager should handle the query
+    """
+    logger.info("running fast path for query: %s", query)
+    try:
+        inputs = await collect_analysis_inputs(query)
+        inputs["response"], inputs["cached"] = await cached_narrative(inputs)
+        if inputs["cached"]:
+            logger.info("narrative for %s served from cache", narrative_key(inputs)[0])
+    except Exception as e:
+        logger.warning("falling back to multi-agent manager: %s", e)
+        return {"status": "error", "error": str(e)}
+    return {"status": "success", **inputs}
+
+
+def _query_text(ctx: InvocationContext) -> str:
+    content = ctx.user_content
+    if not content or not content.parts:
+        return ""
+    return " ".join(part.text for part in content.parts if part.text).strip()
+
+
+class StockAnalysisPipeline(BaseAgent):
+    """
+    Root agent that answers with the fast path and otherwise delegates to its
+    first sub-agent (the multi-agent stock_analysis_manager).
+    """
+
+    async def _run_async_impl(self, ctx: InvocationContext) -> AsyncGenerator[Event, None]:
+        query = _query_text(ctx)
+        if FAST_PATH_ENABLED and query:
+            result = await run_pipeline(query)
+            if result["status"] == "success":
+                yield Event(
+                    invocation_id=ctx.invocation_id,
+                    author=self.name,
+                    branch=ctx.branch,
+                    content=types.Content(role="model", parts=[types.Part(text=result["response"])]),
+                )
+                return
+
+        # Set on every turn, so the manager never acts on an earlier question's intent
+        intent = parse_intent(query) if query else None
+        yield Event(
+            invocation_id=ctx.invocation_id,
+            author=self.name,
+            branch=ctx.branch,
+            actions=EventActions(state_delta={INTENT_STATE_KEY: intent.describe() if intent else "none"}),
+        )
+        async for event in self.sub_agents[0].run_async(ctx):
+            yield event
@@ -0,0 +1,161 @@
+"""
+Portfolio mode: the standard analysis for many tickers at once.
+
+Price changes for every ticker come from batched history requests (several
+symbols per upstream call) and one vectorized pass of the price change engine.
+News is fetched per ticker, with at most PORTFOLIO_CONCURRENCY requests in
+flight, through the same pooled session, caches and news store as single-ticker
+queries. The per-ticker analyses then run as one batch, and the result is
+ranked by price change.
+
+    result = await analyze_portfolio(["NVDA", "AMD", "INTC"], timeframe="1month")
+"""
+
+import asyncio
+import os
+from typing import Dict, List
+
+from .sub_agents.ticker_analysis.agent import analyze_stock_movements
+from .sub_agents.ticker_news.agent import get_ticker_news_async
+from .sub_agents.ticker_price_change.engine import PERIOD_DESCRIPTIONS, bars_needed, compute_price_changes, normalize_timeframe
+from .tools import AsyncFMPTools
+from .tools.models import PriceChange
+from .tools.telemetry import get_logger, traced_tool
+from .workflow import describe_news, describe_price_change
+
+logger = get_logger('portfolio')
+
+# News requests in flight at once
+PORTFOLIO_CONCURRENCY = int(os.getenv('STOCKBOT_PORTFOLIO_CONCURRENCY', '16'))
+# Tickers analyzed per call; the rest are reported under "errors"
+MAX_TICKERS = int(os.getenv('STOCKBOT_PORTFOLIO_MAX_TICKERS', '500'))
+
+
+async def _price_changes(tickers: List[str], horizon: str) -> Dict[str, dict]:
+    """Per-ticker calculate_price_change-style results from batched history requests"""
+    bulk = await AsyncFMPTools().get_historical_prices_bulk(tickers, bars_needed([horizon]))
+    changes = compute_price_changes(bulk.get("data", {}), [horizon])
+    stale = set(bulk.get("stale", ()))
+    results = {}
+    for ticker in tickers:
+        change = changes.get(ticker, {}).get(horizon)
+        if isinstance(change, PriceChange):
+            results[ticker] = {"status": "success", "ticker": ticker, **change.to_dict()}
+            if ticker in stale:
+                results[ticker]["stale"] = True
+        else:
+            error = bulk.get("errors", {}).get(ticker) or (change or changes.get(ticker) or {}).get("error")
+            results[ticker] = {"status": "error", "error": error or f"No historical data available for {ticker}"}
+    return results
+
+
+async def _news(tickers: List[str], limit: int) -> Dict[str, dict]:
+    """get_ticker_news results for every ticker, with bounded concurrency"""
+    if limit <= 0:
+        return {ticker: {"status": "success", "ticker": ticker, "news": []} for ticker in tickers}
+    semaphore = asyncio.Semaphore(PORTFOLIO_CONCURRENCY)
+
+    async def fetch(ticker):
+        async with semaphore:
+            return await get_ticker_news_async(ticker, limit)
+
+    results = await asyncio.gather(*(fetch(t) for t in tickers), return_exceptions=True)
+    return {
+        ticker: result if not isinstance(result, BaseException)
+        else {"status": "error", "error": f"Error retrieving news for {ticker}: {str(result)}"}
+        for ticker, result in zip(tickers, results)
+    }
+
+
+def _summary(ranked: List[dict]) -> dict:
+    if not ranked:
+        return {"count": 0}
+    percents = [entry["change_percent"] for entry in ranked]
+    sentiments = [entry["news_sentiment"] for entry in ranked]
+    return {
+        "count": len(ranked),
+        "advancers": sum(p > 0 for p in percents),
+        "decliners": sum(p < 0 for p in percents),
+        "average_change_percent": sum(percents) / len(percents),
+        "best": ranked[0]["ticker"],
+        "worst": ranked[-1]["ticker"],
+        "news_sentiment": {label: sentiments.count(label) for label in ("positive", "negative", "neutral")},
+    }
+
+
+@traced_tool
+async def analyze_portfolio(tickers: List[str], timeframe: str = "1day", news_limit: int = 3) -> dict:
+    """
+    Compare many stocks: price change, news and analysis for each, ranked by price change
+
+    Args:
+        tickers: Stock ticker symbols
+        timeframe: Time period (1day, 1week, 1month, 3month, 6month, ytd, 1year)
+        news_limit: News articles per ticker (0 skips news)
+
+    Returns:
+        Dictionary with the entries under "ranked" (best performer first),
+        an overall "summary" and per-ticker failures under "errors"
+    """
+    seen = []
+    for ticker in tickers:
+        ticker = ticker.strip().upper()
+        if ticker and ticker not in seen:
+            seen.append(ticker)
+    if not seen:
+        return {"status": "error", "error": "No tickers given"}
+    tickers, skipped = seen[:MAX_TICKERS], seen[MAX_TICKERS:]
+    horizon = normalize_timeframe(timeframe) or "1day"
+    logger.info("analyze_portfolio called for %s tickers, timeframe: %s", len(tickers), horizon)
+
+    try:
+        changes, news = await asyncio.gather(_price_changes(tickers, horizon), _news(tickers, news_limit))
+    except Exception as e:
+        return {"status": "error", "error": f"Error gathering portfolio data: {str(e)}"}
+
+    errors = {ticker: f"Portfolio limit of {MAX_TICKERS} tickers reached" for ticker in skipped}
+    errors.update({ticker: change["error"] for ticker, change in changes.items() if change["status"] != "success"})
+    priced = [ticker for ticker in tickers if changes[ticker]["status"] == "success"]
+
+    batch = analyze_stock_movements([
+        {
+            "ticker": ticker,
+            "price_data": describe_price_change(changes[ticker]),
+            "news_data": describe_news(news[ticker]),
+            "timeframe": PERIOD_DESCRIPTIONS[horizon],
+        }
+        for ticker in priced
+    ])
+    analyses = batch.get("analyses", {})
+
+    ranked = []
+    for ticker in priced:
+        change, analysis = changes[ticker], analyses.get(ticker, {})
+        headlines = news[ticker].get("news") if news[ticker]["status"] == "success" else None
+        ranked.append({
+            "ticker": ticker,
+            "current_price": change["current_price"],
+            "previous_price": change["previous_price"],
+            "change": change["change"],
+            "change_percent": change["change_percent"],
+            "direction": change["direction"],
+            "stale": change.get("stale", False) or bool(news[ticker].get("stale")),
+            "news_sentiment": analysis.get("news_sentiment", "neutral"),
+            "sentiment_score": analysis.get("sentiment_score"),
+            "correlation": analysis.get("correlation"),
+            "explanation": analysis.get("explanation"),
+            "headlines": [a["title"] for a in headlines] if isinstance(headlines, list) else [],
+        })
+    ranked.sort(key=lambda entry: entry["change_percent"], reverse=True)
+    for rank, entry in enumerate(ranked, 1):
+        entry["rank"] = rank
+
+    return {
+        "status": "success" if not errors else "partial" if ranked else "error",
+        "timeframe": horizon,
+        "period_description": PERIOD_DESCRIPTIONS[horizon],
+        "ranked": ranked,
+        "summary": _summary(ranked),
+        "errors": errors,
+    }
+
@@ -0,0 +1,78 @@
+"""
+Lazy registry of the agents and their tool functions.
+
+Every agent and tool is declared here by module and attribute, but nothing is
+imported until it is first requested. Importing ``manager`` (or just its tools)
+therefore does not load ADK or build any Agent; the sub-agent modules build
+their Agent on first attribute access through ``lazy_attributes``.
+"""
+
+import importlib
+import threading
+from typing import Any, Callable, Dict, Tuple
+
+# name -> (module, attribute)
+AGENTS: Dict[str, Tuple[str, str]] = {
+    "stock_analysis_pipeline": ("manager.agent", "agent"),
+    "stock_analysis_manager": ("manager.agent", "manager_agent"),
+    "identify_ticker": ("manager.sub_agents.identify_ticker.agent", "identify_ticker"),
+    "ticker_price": ("manager.sub_agents.ticker_price.agent", "ticker_price"),
+    "ticker_price_change": ("manager.sub_agents.ticker_price_change.agent", "ticker_price_change"),
+    "ticker_news": ("manager.sub_agents.ticker_news.agent", "ticker_news"),
+    "ticker_analysis": ("manager.sub_agents.ticker_analysis.agent", "ticker_analysis"),
+}
+
+TOOLS: Dict[str, Tuple[str, str]] = {
+    "identify_ticker_from_query": ("manager.sub_agents.identify_ticker.agent", "identify_ticker_from_query"),
+    "get_current_price": ("manager.sub_agents.ticker_price.agent", "get_current_price"),
+    "calculate_price_change": ("manager.sub_agents.ticker_price_change.agent", "calculate_price_change"),
+    "calculate_price_changes": ("manager.sub_agents.ticker_price_change.agent", "calculate_price_changes"),
+    "calculate_indicators": ("manager.sub_agents.ticker_price_change.agent", "calculate_indicators"),
+    "get_ticker_news": ("manager.sub_agents.ticker_news.agent", "get_ticker_news"),
+    "analyze_stock_movement": ("manager.sub_agents.ticker_analysis.agent", "analyze_stock_movement"),
+    "analyze_stock_movements": ("manager.sub_agents.ticker_analysis.agent", "analyze_stock_movements"),
+    "gather_ticker_data": ("manager.workflow", "gather_ticker_data"),
+    "analyze_portfolio": ("manager.portfolio", "analyze_portfolio"),
+}
+
+
+def _resolve(table: Dict[str, Tuple[str, str]], kind: str, name: str) -> Any:
+    try:
+        module, attribute = table[name]
+    except KeyError:
+        raise KeyError(f"Unknown {kind} {name!r}; known: {', '.join(table)}") from None
+    return getattr(importlib.import_module(module), attribute)
+
+
+def get_agent(name: str):
+    """The agent registered under name, imported and built on first use"""
+    return _resolve(AGENTS, "agent", name)
+
+
+def get_tool(name: str) -> Callable:
+    """The tool function registered under name, imported on first use"""
+    return _resolve(TOOLS, "tool", name)
+
+
+def lazy_attributes(namespace: dict, **builders: Callable[[], Any]) -> Callable[[str], Any]:
+    """
+    Module ``__getattr__`` that builds each named attribute on first access
+
+    The built value is stored in the module namespace (replacing a submodule of
+    the same name, if importing it bound one), so later lookups are plain
+    attribute reads.
+    """
+    lock = threading.RLock()
+    built: Dict[str, Any] = {}
+
+    def __getattr__(name: str) -> Any:
+        builder = builders.get(name)
+        if builder is None:
+            raise AttributeError(f"module {namespace['__name__']!r} has no attribute {name!r}")
+        with lock:
+            if name not in built:
+                built[name] = builder()
+            namespace[name] = built[name]
+            return built[name]
+
+    return __getattr__
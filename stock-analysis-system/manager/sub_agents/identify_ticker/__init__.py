@@ -1,3 +1,8 @@
-from .agent import identify_ticker
+import importlib
 
-__all__ = ['identify_ticker']
\ No newline at end of file
+from manager.registry import lazy_attributes
+
+# The agent is built on first access; importing the package's tool modules does not load ADK
+__getattr__ = lazy_attributes(globals(), identify_ticker=lambda: importlib.import_module('.agent', __name__).identify_ticker)
+
+__all__ = ['identify_ticker']
@@ -1,10 +1,11 @@
-import re
-import os
-import sys
-from google.adk.agents import Agent
 from manager.tools.tools import FMPTools
-import logging
+from manager.registry import lazy_attributes
+from manager.tools.telemetry import agent_callbacks, get_logger, traced_tool
+from manager.tools.symbol_directory import get_symbol_directory
 
+logger = get_logger('identify_ticker')
+
+@traced_tool
 def identify_ticker_from_query(query: str) -> dict:
     """
     Identify stock ticker from user query
@@ -13,56 +14,32 @@ def identify_ticker_from_query(query: str) -> dict:
         query: User's natural language query about a stock
         
     Returns:
-        Dictionary with ticker information
+        Dictionary with ticker information; "tickers" lists every ticker
+        when the query mentions more than one
     """
-    print(f"[DEBUG] identify_ticker_from_query called for query: {query}")
+    logger.debug("identify_ticker_from_query called for query: %s", query)
     
     fmp_tools = FMPTools()
     query_lower = query.lower()
+    directory = get_symbol_directory()
     
-    # Common company name to ticker mappings
-    ticker_map = {
-        'tesla': 'TSLA',
-        'apple': 'AAPL',
-        'microsoft': 'MSFT',
-        'google': 'GOOGL',
-        'alphabet': 'GOOGL',
-        'amazon': 'AMZN',
-        'meta': 'META',
-        'facebook': 'META',
-        'nvidia': 'NVDA',
-        'palantir': 'PLTR',
-        'netflix': 'NFLX',
-        'spotify': 'SPOT',
-        'uber': 'UBER',
-        'lyft': 'LYFT',
-        'airbnb': 'ABNB'
-    }
-    
-    # First, check for direct ticker mentions (2-5 uppercase letters)
-    ticker_pattern = r'\b[A-Z]{2,5}\b'
-    direct_tickers = re.findall(ticker_pattern, query)
-    if direct_tickers:
+    # First, check for direct ticker mentions (2-5 uppercase letters), then
+    # company names and aliases, all from the local symbol directory
+    resolved = directory.resolve(query)
+    if resolved:
+        ticker, method = resolved[0]
         result = {
             "status": "success",
-            "ticker": direct_tickers[0],
-            "method": "direct_match"
+            "ticker": ticker,
+            "method": method
         }
-        print(f"[DEBUG] Identified ticker: {result['ticker']} via {result['method']}")
+        if len(resolved) > 1:
+            # Several companies mentioned (comparisons, portfolios): keep all of them
+            result["tickers"] = [symbol for symbol, _ in resolved]
+        logger.debug("Identified ticker: %s via %s", result['ticker'], result['method'])
         return result
     
-    # Check our predefined mapping
-    for company, ticker in ticker_map.items():
-        if company in query_lower:
-            result = {
-                "status": "success",
-                "ticker": ticker,
-                "method": "company_name_match"
-            }
-            print(f"[DEBUG] Identified ticker: {result['ticker']} via {result['method']}")
-            return result
-    
-    # Extract potential company names and search via API
+    # Extract potential company names and search via API (directory misses only)
     words = query_lower.split()
     for word in words:
         if len(word) > 3 and word not in ['stock', 'price', 'why', 'what', 'how', 'today', 'recently']:
@@ -73,39 +50,44 @@ def identify_ticker_from_query(query: str) -> dict:
                     "ticker": search_result["data"][0]["symbol"],
                     "method": "api_search"
                 }
-                print(f"[DEBUG] Identified ticker: {result['ticker']} via {result['method']}")
+                logger.debug("Identified ticker: %s via %s", result['ticker'], result['method'])
                 return result
     
-    print("[DEBUG] No ticker found")
+    logger.debug("No ticker found")
     return {
         "status": "error",
         "error": "TICKER_NOT_FOUND"
     }
 
-identify_ticker = Agent(
-    name="identify_ticker",
-    model="gemini-2.0-flash",
-    description="Agent to identify stock ticker symbols from natural language queries",
-    instruction="""
-    You are a specialized agent that identifies stock ticker symbols from user queries.
+def _build_agent():
+    from google.adk.agents import Agent
+
+    return Agent(
+        name="identify_ticker",
+        model="gemini-2.0-flash",
+        description="Agent to identify stock ticker symbols from natural language queries",
+        instruction="""
+        You are a specialized agent that identifies stock ticker symbols from user queries.
     
-    CRITICAL WORKFLOW:
-    1. Print: "PROCESSING QUERY TO IDENTIFY TICKER"
-    2. Use the identify_ticker_from_query tool to extract the ticker symbol
-    3. When you find a ticker, print: "FOUND TICKER: [TICKER_SYMBOL]" 
-    4. IMMEDIATELY call transfer_to_agent(agent_name="stock_analysis_manager") without ANY other text
+        CRITICAL WORKFLOW:
+        1. Print: "PROCESSING QUERY TO IDENTIFY TICKER"
+        2. Use the identify_ticker_from_query tool to extract the ticker symbol
+        3. When you find a ticker, print: "FOUND TICKER: [TICKER_SYMBOL]" 
+        4. IMMEDIATELY call transfer_to_agent(agent_name="stock_analysis_manager") without ANY other text
     
-    Your ONLY response should be:
-    1. "PROCESSING QUERY TO IDENTIFY TICKER"
-    2. Call identify_ticker_from_query
-    3. "FOUND TICKER: XXXX"
-    4. Call transfer_to_agent
+        Your ONLY response should be:
+        1. "PROCESSING QUERY TO IDENTIFY TICKER"
+        2. Call identify_ticker_from_query
+        3. "FOUND TICKER: XXXX"
+        4. Call transfer_to_agent
     
-    DO NOT add any additional text, explanations, or responses.
-    DO NOT acknowledge or answer the user's question directly.
-    ALWAYS transfer control back to stock_analysis_manager immediately after printing the ticker.
-    """,
-    tools=[identify_ticker_from_query],
-)
+        DO NOT add any additional text, explanations, or responses.
+        DO NOT acknowledge or answer the user's question directly.
+        ALWAYS transfer control back to stock_analysis_manager immediately after printing the ticker.
+        """,
+        tools=[identify_ticker_from_query],
+        **agent_callbacks(),
+    )
 
-print(f"Initialized {identify_ticker.name} agent")
\ No newline at end of file
+# Built on first access so that importing the tool functions does not load ADK
+__getattr__ = lazy_attributes(globals(), identify_ticker=_build_agent)
@@ -1,9 +1,73 @@
-from google.adk.agents import Agent
-from typing import Dict, Any, Union
-import logging
+from manager.registry import lazy_attributes
+from manager.tools.telemetry import agent_callbacks, get_logger, traced_tool
+from typing import Dict, Any, List, Union
 
-print("Loading ticker_analysis module...")
+from .sentiment import score_articles, score_batch
 
+logger = get_logger('ticker_analysis')
+
+# Most strongly scored articles returned with an analysis, so the answer can cite them
+TOP_ARTICLES = 5
+# Characters of an article line kept in top_articles
+_ARTICLE_CHARS = 200
+
+def _news_lines(news_data: Union[str, None]) -> list:
+    """One article per non-empty line of news_data"""
+    if news_data is None:
+        logger.debug("No news data provided for analysis")
+        return []
+    return [line for line in news_data.splitlines() if line.strip()]
+
+def _top_articles(lines: List[str], scores: List[dict]) -> List[dict]:
+    """The articles that moved the sentiment most (largest absolute compound score first)"""
+    scored = sorted((pair for pair in zip(lines, scores) if pair[1]["hits"]),
+                    key=lambda pair: abs(pair[1]["compound"]), reverse=True)
+    return [
+        {"article": line.strip()[:_ARTICLE_CHARS], "score": score["score"], "label": score["label"]}
+        for line, score in scored[:TOP_ARTICLES]
+    ]
+
+def _movement_analysis(ticker: str, price_data: str, sentiment: dict, timeframe: str) -> dict:
+    """Correlate the price direction in price_data with an aggregate news sentiment"""
+    news_sentiment = sentiment["label"]
+    
+    # Determine price movement direction
+    if "increased" in price_data.lower():
+        price_direction = "upward"
+    elif "decreased" in price_data.lower():
+        price_direction = "downward"
+    else:
+        price_direction = "sideways"
+        
+    # Generate analysis based on correlation
+    if price_direction == "upward" and news_sentiment == "positive":
+        correlation = "aligned"
+        explanation = "The positive news sentiment aligns with the stock's upward movement, suggesting the market is responding favorably to recent developments."
+    elif price_direction == "downward" and news_sentiment == "negative":
+        correlation = "aligned"
+        explanation = "The negative news sentiment correlates with the stock's decline, indicating market concerns about recent events or fundamentals."
+    elif price_direction == "upward" and news_sentiment == "negative":
+        correlation = "contrarian"
+        explanation = "Despite negative news, the stock is rising. This could indicate oversold conditions, contrarian buying, or other market factors outweighing the news."
+    elif price_direction == "downward" and news_sentiment == "positive":
+        correlation = "contrarian"
+        explanation = "Despite positive news, the stock is declining. This might suggest broader market pressures, profit-taking, or that positive news was already priced in."
+    else:
+        correlation = "neutral"
+        explanation = "Analysis unavailable"
+    
+    return {
+        "status": "success",
+        "ticker": ticker,
+        "price_direction": price_direction,
+        "news_sentiment": news_sentiment,
+        "sentiment_score": sentiment["score"],
+        "correlation": correlation,
+        "explanation": explanation,
+        "timeframe": timeframe
+    }
+
+@traced_tool
 def analyze_stock_movement(ticker: str, price_data: str, news_data: Union[str, None] = None, timeframe: str = "recent") -> dict:
     """
     Analyze stock movement using price and news data
@@ -15,108 +79,94 @@ def analyze_stock_movement(ticker: str, price_data: str, news_data: Union[str, N
         timeframe: Analysis timeframe
         
     Returns:
-        Dictionary with analysis
+        Dictionary with the analysis, including "top_articles": the articles
+        that drove the sentiment most, each with its 0-10 score and label
     """
-    print(f"[DEBUG] analyze_stock_movement called for {ticker}")
+    logger.debug("analyze_stock_movement called for %s", ticker)
     
     try:
-        # Extract sentiment indicators from news
-        positive_keywords = [
-            'growth', 'profit', 'beat', 'strong', 'positive', 'up', 'gain', 'bull',
-            'revenue', 'earnings', 'expansion', 'success', 'outperform', 'upgrade',
-            'buy', 'optimistic', 'record', 'milestone', 'breakthrough'
-        ]
-        
-        negative_keywords = [
-            'loss', 'decline', 'weak', 'negative', 'down', 'fall', 'bear', 'concern',
-            'miss', 'disappointing', 'cut', 'downgrade', 'sell', 'pessimistic',
-            'lawsuit', 'investigation', 'scandal', 'crisis', 'warning', 'risk'
-        ]
-        
-        # Analyze news sentiment - safely handle None
-        if news_data is None:
-            news_lower = ""
-            print("[DEBUG] No news data provided for analysis")
-        else:
-            news_lower = news_data.lower()
-            
-        positive_count = sum(1 for word in positive_keywords if word in news_lower)
-        negative_count = sum(1 for word in negative_keywords if word in news_lower)
-        
-        if positive_count > negative_count:
-            news_sentiment = "positive"
-        elif negative_count > positive_count:
-            news_sentiment = "negative"
-        else:
-            news_sentiment = "neutral"
-        
-        # Determine price movement direction
-        if "increased" in price_data.lower():
-            price_direction = "upward"
-        elif "decreased" in price_data.lower():
-            price_direction = "downward"
-        else:
-            price_direction = "sideways"
-            
-        # Generate analysis based on correlation
-        if price_direction == "upward" and news_sentiment == "positive":
-            correlation = "aligned"
-            explanation = "The positive news sentiment aligns with the stock's upward movement, suggesting the market is responding favorably to recent developments."
-        elif price_direction == "downward" and news_sentiment == "negative":
-            correlation = "aligned"
-            explanation = "The negative news sentiment correlates with the stock's decline, indicating market concerns about recent events or fundamentals."
-        elif price_direction == "upward" and news_sentiment == "negative":
-            correlation = "contrarian"
-            explanation = "Despite negative news, the stock is rising. This could indicate oversold conditions, contrarian buying, or other market factors outweighing the news."
-        elif price_direction == "downward" and news_sentiment == "positive":
-            correlation = "contrarian"
-            explanation = "Despite positive news, the stock is declining. This might suggest broader market pressures, profit-taking, or that positive news was already priced in."
-        else:
-            correlation = "neutral"
-            explanation = "Analysis unavailable"
-        
-        print(f"[DEBUG] Analysis completed for {ticker}")
+        # Analyze news sentiment - safely handle None; one article per line
+        lines = _news_lines(news_data)
+        scores = score_articles(lines)
+        result = _movement_analysis(ticker, price_data, scores["aggregate"], timeframe)
+        result["top_articles"] = _top_articles(lines, scores["articles"])
+        logger.debug("Analysis completed for %s", ticker)
+        return result
         
+    except Exception as e:
+        logger.error("Error in analyze_stock_movement: %s", e)
         return {
-            "status": "success",
-            "ticker": ticker,
-            "price_direction": price_direction,
-            "news_sentiment": news_sentiment,
-            "correlation": correlation,
-            "explanation": explanation,
-            "timeframe": timeframe
+            "status": "error",
+            "error": f"Error analyzing stock movement for {ticker}: {str(e)}"
         }
+
+@traced_tool
+def analyze_stock_movements(items: List[Dict[str, Any]]) -> dict:
+    """
+    Analyze the movement of many stocks in one call
+    
+    Args:
+        items: One dict per stock with the analyze_stock_movement arguments
+            (ticker, price_data, and optionally news_data and timeframe)
+        
+    Returns:
+        Dictionary with one analysis per ticker (with its "top_articles") under "analyses"
+    """
+    logger.debug("analyze_stock_movements called for %s stocks", len(items))
+    
+    try:
+        lines = {item["ticker"]: _news_lines(item.get("news_data")) for item in items}
+        sentiments = score_batch(lines)
+        analyses = {}
+        for item in items:
+            ticker = item["ticker"]
+            try:
+                analyses[ticker] = _movement_analysis(
+                    ticker, item["price_data"], sentiments[ticker]["aggregate"], item.get("timeframe") or "recent")
+                analyses[ticker]["top_articles"] = _top_articles(lines[ticker], sentiments[ticker]["articles"])
+            except Exception as e:
+                analyses[item["ticker"]] = {
+                    "status": "error",
+                    "error": f"Error analyzing stock movement for {item['ticker']}: {str(e)}"
+                }
+        return {"status": "success", "count": len(analyses), "analyses": analyses}
         
     except Exception as e:
-        print(f"[ERROR] Error in analyze_stock_movement: {str(e)}")
+        logger.error("Error in analyze_stock_movements: %s", e)
         return {
             "status": "error",
-            "error": f"Error analyzing stock movement for {ticker}: {str(e)}"
+            "error": f"Error analyzing stock movements: {str(e)}"
         }
 
-ticker_analysis = Agent(
-    name="ticker_analysis",
-    model="gemini-2.0-flash",
-    description="Agent to analyze stock movements using news and price data",
-    instruction="""
-    You are a specialized agent that analyzes stock movements by correlating price data with news sentiment.
+def _build_agent():
+    from google.adk.agents import Agent
+
+    return Agent(
+        name="ticker_analysis",
+        model="gemini-2.0-flash",
+        description="Agent to analyze stock movements using news and price data",
+        instruction="""
+        You are a specialized agent that analyzes stock movements by correlating price data with news sentiment.
     
-    When given ticker, price_data, and news_data parameters:
-    1. Print "STARTING ANALYSIS FOR [TICKER]"
-    2. Call analyze_stock_movement with the EXACT parameters provided:
-       - ticker: The stock symbol (e.g., "TSLA")
-       - price_data: String containing price information
-       - news_data: String containing news information (may be None)
-       - timeframe: Use "recent" if not specified
-    3. Present the correlation between price movement and news
-    4. Provide clear explanation of likely reasons for the stock movement
-    5. Print "COMPLETED ANALYSIS FOR [TICKER]"
+        When given ticker, price_data, and news_data parameters:
+        1. Print "STARTING ANALYSIS FOR [TICKER]"
+        2. Call analyze_stock_movement with the EXACT parameters provided:
+           - ticker: The stock symbol (e.g., "TSLA")
+           - price_data: String containing price information
+           - news_data: String containing news information, one article per line (may be None)
+           - timeframe: Use "recent" if not specified
+        3. Present the correlation between price movement and news
+        4. Provide clear explanation of likely reasons for the stock movement, citing the headlines
+           in the result's top_articles (with their sentiment scores) that drove the sentiment
+        5. Print "COMPLETED ANALYSIS FOR [TICKER]"
     
-    Example:
-    - When called with ticker="TSLA", price_data="stock decreased by 2.5%", news_data="Negative earnings report"
-    - Call analyze_stock_movement(ticker="TSLA", price_data="stock decreased by 2.5%", news_data="Negative earnings report")
-    """,
-    tools=[analyze_stock_movement],
-)
+        Example:
+        - When called with ticker="TSLA", price_data="stock decreased by 2.5%", news_data="Negative earnings report"
+        - Call analyze_stock_movement(ticker="TSLA", price_data="stock decreased by 2.5%", news_data="Negative earnings report")
+        """,
+        tools=[analyze_stock_movement],
+        **agent_callbacks(),
+    )
 
-print(f"Initialized ticker_analysis agent")
\ No newline at end of file
+# Built on first access so that importing the tool functions does not load ADK
+__getattr__ = lazy_attributes(globals(), ticker_analysis=_build_agent)
@@ -0,0 +1,173 @@
+"""
+Lexicon-based news sentiment scoring.
+
+Text is tokenized once with a compiled word regex and every token is looked up
+in a weighted lexicon, so keywords only match whole words ("up" does not match
+"update") and are counted as often as they occur. A negation word ("not",
+"no", "didn't", ...) flips the polarity of the next few words of its clause. The lexicon and
+regex are built once at import.
+"""
+
+import math
+import re
+from typing import Dict, Iterable, List, Union
+
+# Base words and their weights; inflected forms are added below
+_POSITIVE = {
+    'growth': 1.5, 'grow': 1.0, 'profit': 1.5, 'profitable': 1.5, 'beat': 2.0, 'strong': 1.5,
+    'positive': 1.0, 'up': 0.5, 'gain': 1.5, 'bull': 1.5, 'bullish': 2.0, 'rally': 2.0,
+    'surge': 2.0, 'soar': 2.5, 'jump': 1.5, 'rise': 1.0, 'climb': 1.0, 'revenue': 0.5,
+    'earnings': 0.5, 'expansion': 1.0, 'expand': 1.0, 'success': 1.5, 'successful': 1.5,
+    'outperform': 2.0, 'upgrade': 2.0, 'buy': 1.0, 'optimistic': 1.5, 'optimism': 1.5,
+    'record': 1.0, 'milestone': 1.0, 'breakthrough': 2.0, 'exceed': 1.5, 'top': 0.5,
+    'boost': 1.5, 'win': 1.5, 'approval': 1.5, 'approve': 1.5, 'partnership': 1.0,
+    'dividend': 0.5, 'buyback': 1.0, 'raise': 1.0, 'upbeat': 1.5, 'robust': 1.5,
+}
+
+_NEGATIVE = {
+    'loss': 1.5, 'lose': 1.5, 'decline': 1.5, 'weak': 1.5, 'weakness': 1.5, 'negative': 1.0,
+    'down': 0.5, 'fall': 1.5, 'drop': 1.5, 'plunge': 2.5, 'slump': 2.0, 'tumble': 2.0,
+    'sink': 1.5, 'slide': 1.0, 'bear': 1.5, 'bearish': 2.0, 'concern': 1.0, 'miss': 2.0,
+    'disappointing': 2.0, 'disappoint': 2.0, 'cut': 1.0, 'downgrade': 2.0, 'sell': 1.0,
+    'selloff': 2.0, 'pessimistic': 1.5, 'lawsuit': 1.5, 'sue': 1.5, 'investigation': 1.5,
+    'probe': 1.5, 'scandal': 2.0, 'crisis': 2.0, 'warning': 1.5, 'warn': 1.5, 'risk': 0.5,
+    'recall': 1.5, 'layoff': 1.5, 'fraud': 2.5, 'bankruptcy': 3.0, 'default': 2.0,
+    'underperform': 2.0, 'halt': 1.5, 'delay': 1.0, 'fear': 1.5,
+}
+
+NEGATIONS = {
+    'not', 'no', 'never', 'without', 'neither', 'nor', 'hardly', 'barely',
+    "isn't", "wasn't", "aren't", "weren't", "don't", "doesn't", "didn't",
+    "won't", "wouldn't", "can't", "cannot", "couldn't", "shouldn't", "hasn't", "haven't",
+}
+
+# Tokens after a negation whose polarity is flipped (clause punctuation ends it early)
+NEGATION_SCOPE = 3
+_CLAUSE_BREAKS = set('.,;:!?')
+
+# Normalization constant for squashing raw scores into [-1, 1]
+_ALPHA = 15.0
+
+# Compound score above/below which a text counts as positive/negative
+NEUTRAL_BAND = 0.05
+
+_TOKEN_RE = re.compile(r"[a-z]+(?:'[a-z]+)?|[.,;:!?]")
+
+
+def _inflections(word: str) -> List[str]:
+    forms = [word, word + 's', word + 'ed', word + 'ing']
+    if word.endswith('e'):
+        forms += [word + 'd', word[:-1] + 'ing']
+    if word.endswith('y'):
+        forms += [word[:-1] + 'ies', word[:-1] + 'ied']
+    if len(word) > 2 and word[-1] not in 'aeiouwxy' and word[-2] in 'aeiou' and word[-3] not in 'aeiou':
+        forms += [word + word[-1] + 'ed', word + word[-1] + 'ing']
+    return forms
+
+
+def _build_lexicon() -> Dict[str, float]:
+    lexicon: Dict[str, float] = {}
+    for words, sign in ((_POSITIVE, 1.0), (_NEGATIVE, -1.0)):
+        for word, weight in words.items():
+            for form in _inflections(word):
+                lexicon.setdefault(form, sign * weight)
+    # Irregular forms
+    lexicon.update({'rose': 1.0, 'fell': -1.5, 'sank': -1.5, 'sold': -1.0, 'won': 1.5, 'lost': -1.5,
+                    'grew': 1.0, 'beats': 2.0, 'topped': 0.5, 'misses': -2.0})
+    return lexicon
+
+
+LEXICON = _build_lexicon()
+
+
+def _squash(raw: float) -> float:
+    return raw / math.sqrt(raw * raw + _ALPHA)
+
+
+def label(compound: float) -> str:
+    if compound > NEUTRAL_BAND:
+        return "positive"
+    if compound < -NEUTRAL_BAND:
+        return "negative"
+    return "neutral"
+
+
+def to_scale(compound: float) -> float:
+    """Map a compound score in [-1, 1] onto the 0-10 sentiment scale"""
+    return round((compound + 1.0) * 5.0, 1)
+
+
+def score_text(text: str) -> dict:
+    """Score one text in a single pass over its tokens"""
+    raw = positive = negative = 0.0
+    hits = 0
+    negated_until = -1
+    for i, match in enumerate(_TOKEN_RE.finditer((text or "").lower().replace('\u2019', "'"))):
+        token = match.group()
+        if token in _CLAUSE_BREAKS:
+            negated_until = -1
+            continue
+        if token in NEGATIONS:
+            negated_until = i + NEGATION_SCOPE
+            continue
+        weight = LEXICON.get(token)
+        if weight is None:
+            continue
+        if i <= negated_until:
+            weight = -weight
+        hits += 1
+        raw += weight
+        if weight > 0:
+            positive += weight
+        else:
+            negative -= weight
+    compound = _squash(raw)
+    return {
+        "compound": compound,
+        "score": to_scale(compound),
+        "label": label(compound),
+        "positive": positive,
+        "negative": negative,
+        "hits": hits,
+    }
+
+
+def _article_text(article: Union[str, dict]) -> str:
+    if isinstance(article, str):
+        return article
+    return " ".join(str(article.get(key) or "") for key in ("title", "summary", "text", "description"))
+
+
+def score_articles(articles: Iterable[Union[str, dict]]) -> dict:
+    """
+    Score any number of articles (strings or news dicts)
+
+    Returns:
+        Dictionary with per-article scores and an aggregate, where the
+        aggregate compound is the mean over articles that hit the lexicon
+    """
+    per_article = []
+    for article in articles:
+        result = score_text(_article_text(article))
+        if isinstance(article, dict) and article.get("title"):
+            result["title"] = article["title"]
+        per_article.append(result)
+
+    scored = [a for a in per_article if a["hits"]]
+    compound = sum(a["compound"] for a in scored) / len(scored) if scored else 0.0
+    return {
+        "articles": per_article,
+        "aggregate": {
+            "compound": compound,
+            "score": to_scale(compound),
+            "label": label(compound),
+            "positive": sum(a["positive"] for a in per_article),
+            "negative": sum(a["negative"] for a in per_article),
+            "article_count": len(per_article),
+        },
+    }
+
+
+def score_batch(articles_by_ticker: Dict[str, Iterable[Union[str, dict]]]) -> Dict[str, dict]:
+    """score_articles for several tickers at once"""
+    return {ticker: score_articles(articles) for ticker, articles in articles_by_ticker.items()}
@@ -1,3 +1,8 @@
-from .agent import ticker_news
+import importlib
 
-__all__ = ['ticker_news']
\ No newline at end of file
+from manager.registry import lazy_attributes
+
+# The agent is built on first access; importing the package's tool modules does not load ADK
+__getattr__ = lazy_attributes(globals(), ticker_news=lambda: importlib.import_module('.agent', __name__).ticker_news)
+
+__all__ = ['ticker_news']
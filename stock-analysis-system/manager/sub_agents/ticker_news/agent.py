@@ -1,8 +1,47 @@
-import os
-import sys
-from google.adk.agents import Agent
 from manager.tools.tools import FMPTools
+from manager.registry import lazy_attributes
+from manager.tools.telemetry import agent_callbacks, get_logger, traced_tool
+from manager.tools.async_tools import AsyncFMPTools
+from manager.tools.cache import staleness
 
+logger = get_logger('ticker_news')
+
+def _news_result(ticker: str, news_result: dict, limit: int) -> dict:
+    """Build the get_ticker_news response from a get_stock_news result"""
+    if news_result["status"] == "error":
+        return {
+            "status": "error",
+            "error": f"Failed to fetch news for {ticker}: {news_result['error']}"
+        }
+    
+    news_data = news_result["data"]
+    
+    if not news_data:
+        return {
+            "status": "success",
+            "ticker": ticker,
+            "news": f"No recent news found for {ticker}",
+            **staleness(news_result)
+        }
+    
+    formatted_news = []
+    for article in news_data[:limit]:
+        formatted_news.append({
+            "title": article.title,
+            "summary": article.text[:200] + "..." if article.text else 'No summary',
+            "published": article.published_date or 'Unknown date',
+            "url": article.url
+        })
+    
+    return {
+        "status": "success",
+        "ticker": ticker,
+        "news": formatted_news,
+        "count": len(formatted_news),
+        **staleness(news_result)
+    }
+
+@traced_tool
 def get_ticker_news(ticker: str, limit: int = 5) -> dict:
     """
     Get recent news for a stock ticker
@@ -14,43 +53,30 @@ def get_ticker_news(ticker: str, limit: int = 5) -> dict:
     Returns:
         Dictionary with news information
     """
-    print(f"--- Tool: get_ticker_news called for ticker: {ticker} ---")
+    logger.info("get_ticker_news called for ticker: %s", ticker)
     
     fmp_tools = FMPTools()
     
     try:
         news_result = fmp_tools.get_stock_news(ticker, limit)
+        return _news_result(ticker, news_result, limit)
         
-        if news_result["status"] == "error":
-            return {
-                "status": "error",
-                "error": f"Failed to fetch news for {ticker}: {news_result['error']}"
-            }
-        
-        news_data = news_result["data"]
-        
-        if not news_data:
-            return {
-                "status": "success",
-                "ticker": ticker,
-                "news": f"No recent news found for {ticker}"
-            }
-        
-        formatted_news = []
-        for article in news_data[:limit]:
-            formatted_news.append({
-                "title": article.get('title', 'No title'),
-                "summary": article.get('text', '')[:200] + "..." if article.get('text') else 'No summary',
-                "published": article.get('publishedDate', 'Unknown date'),
-                "url": article.get('url', '')
-            })
-        
+    except Exception as e:
         return {
-            "status": "success",
-            "ticker": ticker,
-            "news": formatted_news,
-            "count": len(formatted_news)
+            "status": "error",
+            "error": f"Error retrieving news for {ticker}: {str(e)}"
         }
+
+@traced_tool
+async def get_ticker_news_async(ticker: str, limit: int = 5) -> dict:
+    """Async variant of get_ticker_news for concurrent data gathering."""
+    logger.info("get_ticker_news_async called for ticker: %s", ticker)
+    
+    fmp_tools = AsyncFMPTools()
+    
+    try:
+        news_result = await fmp_tools.get_stock_news(ticker, limit)
+        return _news_result(ticker, news_result, limit)
         
     except Exception as e:
         return {
@@ -58,18 +84,25 @@ def get_ticker_news(ticker: str, limit: int = 5) -> dict:
             "error": f"Error retrieving news for {ticker}: {str(e)}"
         }
 
-ticker_news = Agent(
-    name="ticker_news",
-    model="gemini-2.0-flash",
-    description="Agent to retrieve recent news about a stock ticker",
-    instruction="""
-    You are a specialized agent that retrieves and summarizes recent news for stock tickers.
+def _build_agent():
+    from google.adk.agents import Agent
+
+    return Agent(
+        name="ticker_news",
+        model="gemini-2.0-flash",
+        description="Agent to retrieve recent news about a stock ticker",
+        instruction="""
+        You are a specialized agent that retrieves and summarizes recent news for stock tickers.
     
-    When asked for news about a stock:
-    1. Use the get_ticker_news tool to fetch recent articles
-    2. Present the news in a clear, organized format
-    3. Include article titles, summaries, and publication dates
-    4. If no news is found, inform the user appropriately
-    """,
-    tools=[get_ticker_news],
-)
\ No newline at end of file
+        When asked for news about a stock:
+        1. Use the get_ticker_news tool to fetch recent articles
+        2. Present the news in a clear, organized format
+        3. Include article titles, summaries, and publication dates
+        4. If no news is found, inform the user appropriately
+        """,
+        tools=[get_ticker_news],
+        **agent_callbacks(),
+    )
+
+# Built on first access so that importing the tool functions does not load ADK
+__getattr__ = lazy_attributes(globals(), ticker_news=_build_agent)
@@ -1,3 +1,8 @@
-from .agent import ticker_price
+import importlib
 
-__all__ = ['ticker_price']
\ No newline at end of file
+from manager.registry import lazy_attributes
+
+# The agent is built on first access; importing the package's tool modules does not load ADK
+__getattr__ = lazy_attributes(globals(), ticker_price=lambda: importlib.import_module('.agent', __name__).ticker_price)
+
+__all__ = ['ticker_price']
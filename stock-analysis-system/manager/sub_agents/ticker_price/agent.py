@@ -1,59 +1,101 @@
-import os
-from google.adk.agents import Agent
 from manager.tools.tools import FMPTools
+from manager.registry import lazy_attributes
+from manager.tools.telemetry import agent_callbacks, get_logger, traced_tool
+from manager.tools.async_tools import AsyncFMPTools
+from manager.tools.cache import staleness
 
+logger = get_logger('ticker_price')
+
+def _parse_price_request(request: str):
+    """Extract the ticker from a request like 'get price for TSLA' (None if malformed)"""
+    parts = request.strip().split()
+    if len(parts) < 4:
+        return None
+    return parts[-1].upper()
+
+def _current_price_result(ticker: str, result: dict) -> dict:
+    """Build the get_current_price response from a get_price_history result"""
+    if result["status"] == "error":
+        return {
+            "status": "error",
+            "error": f"Failed to fetch price for {ticker}: {result['error']}"
+        }
+    series = result["data"]
+    if series is None or not len(series):
+        return {
+            "status": "error",
+            "error": f"No price data available for {ticker}"
+        }
+    current_price = series.latest_close
+    if current_price is None or current_price != current_price:
+        return {
+            "status": "error",
+            "error": f"Could not parse current price for {ticker}"
+        }
+    return {
+        "status": "success",
+        "ticker": ticker,
+        "current_price": current_price,
+        **staleness(result)
+    }
+
+@traced_tool
 def get_current_price(*, request: str) -> dict:
     """
     Fetch the current price for the given ticker from a request string like 'get price for TSLA'.
     Returns a dict with status and current_price.
     """
-    print(f"--- Tool: get_current_price called with request: {request} ---")
+    logger.info("get_current_price called with request: %s", request)
     fmp_tools = FMPTools()
     try:
-        parts = request.strip().split()
-        if len(parts) < 4:
+        ticker = _parse_price_request(request)
+        if ticker is None:
             return {
                 "status": "error",
                 "error": "Invalid request format. Expected 'get price for [SYMBOL]'."
             }
-        ticker = parts[-1].upper()
-        result = fmp_tools.get_historical_prices(ticker, 1)
-        if result["status"] == "error":
-            return {
-                "status": "error",
-                "error": f"Failed to fetch price for {ticker}: {result['error']}"
-            }
-        data = result["data"]
-        if not data or "historical" not in data or not data["historical"]:
-            return {
-                "status": "error",
-                "error": f"No price data available for {ticker}"
-            }
-        try:
-            current_price = float(data["historical"][0]["close"])
-        except (KeyError, ValueError, TypeError):
+        result = fmp_tools.get_price_history(ticker, 1)
+        return _current_price_result(ticker, result)
+    except Exception as e:
+        return {
+            "status": "error",
+            "error": f"Error fetching price: {str(e)}"
+        }
+
+@traced_tool
+async def get_current_price_async(*, request: str) -> dict:
+    """Async variant of get_current_price for concurrent data gathering."""
+    logger.info("get_current_price_async called with request: %s", request)
+    fmp_tools = AsyncFMPTools()
+    try:
+        ticker = _parse_price_request(request)
+        if ticker is None:
             return {
                 "status": "error",
-                "error": f"Could not parse current price for {ticker}"
+                "error": "Invalid request format. Expected 'get price for [SYMBOL]'."
             }
-        return {
-            "status": "success",
-            "ticker": ticker,
-            "current_price": current_price
-        }
+        result = await fmp_tools.get_price_history(ticker, 1)
+        return _current_price_result(ticker, result)
     except Exception as e:
         return {
             "status": "error",
             "error": f"Error fetching price: {str(e)}"
         }
 
-ticker_price = Agent(
-    name="ticker_price",
-    model="gemini-2.0-flash",
-    description="Agent to fetch the current stock price for a given ticker symbol.",
-    instruction="""
-    You are a specialized agent that fetches the current stock price for a given ticker symbol.
-    When given a request like 'get price for TSLA', call get_current_price(request=[REQUEST]) and return the result.
-    """,
-    tools=[get_current_price],
-)
\ No newline at end of file
+def _build_agent():
+    from google.adk.agents import Agent
+
+    return Agent(
+        name="ticker_price",
+        model="gemini-2.0-flash",
+        description="Agent to fetch the current stock price for a given ticker symbol.",
+        instruction="""
+        You are a specialized agent that fetches the current stock price for a given ticker symbol.
+        When given a request like 'get price for TSLA', call get_current_price(request=[REQUEST]) and return the result.
+        """,
+        tools=[get_current_price],
+        **agent_callbacks(),
+    )
+
+# Built on first access so that importing the tool functions does not load ADK
+__getattr__ = lazy_attributes(globals(), ticker_price=_build_agent)
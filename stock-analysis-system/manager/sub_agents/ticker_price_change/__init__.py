@@ -1,3 +1,8 @@
-from .agent import ticker_price_change
+import importlib
 
-__all__ = ['ticker_price_change']
\ No newline at end of file
+from manager.registry import lazy_attributes
+
+# The agent is built on first access; importing the package's tool modules does not load ADK
+__getattr__ = lazy_attributes(globals(), ticker_price_change=lambda: importlib.import_module('.agent', __name__).ticker_price_change)
+
+__all__ = ['ticker_price_change']
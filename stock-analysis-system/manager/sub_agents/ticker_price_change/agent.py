@@ -1,123 +1,213 @@
-import os
-import sys
-from datetime import datetime, timedelta
-from google.adk.agents import Agent
+from typing import List, Optional
 from manager.tools.tools import FMPTools
+from manager.registry import lazy_attributes
+from manager.tools.telemetry import agent_callbacks, get_logger, traced_tool
+from manager.tools.async_tools import AsyncFMPTools
+from manager.tools.cache import staleness
+from manager.tools.models import to_plain
+from .engine import bars_needed, compute_price_change, normalize_timeframe, resolve_horizons
+from .indicators import HISTORY_BARS, compute_indicators
 
+logger = get_logger('ticker_price_change')
+
+def _horizon(timeframe: str) -> str:
+    """Engine horizon for a timeframe; unknown timeframes compare with the previous day"""
+    return normalize_timeframe(timeframe) or "1day"
+
+def _days_needed(timeframe: str) -> int:
+    """How many days of history a timeframe needs"""
+    return bars_needed([_horizon(timeframe)])
+
+def _price_change_result(ticker: str, timeframe: str, history_result: dict) -> dict:
+    """Build the calculate_price_change response from a get_price_history result"""
+    if history_result["status"] == "error":
+        return {
+            "status": "error",
+            "error": f"Failed to fetch historical data for {ticker}: {history_result['error']}"
+        }
+    
+    bars = history_result["data"]
+    
+    if bars is None or not len(bars):
+        return {
+            "status": "error",
+            "error": f"No historical data available for {ticker}"
+        }
+    
+    horizon = _horizon(timeframe)
+    change = compute_price_change(bars, [horizon], ticker)
+    if "error" in change:
+        return {"status": "error", "error": change["error"]}
+    if isinstance(change[horizon], dict):
+        return {"status": "error", "error": change[horizon]["error"]}
+    
+    return {
+        "status": "success",
+        "ticker": ticker,
+        **change[horizon].to_dict(),
+        "timeframe": timeframe,
+        **staleness(history_result),
+    }
+
+def _price_changes_result(ticker: str, horizons: list, history_result: dict) -> dict:
+    """Build the calculate_price_changes response from a get_price_history result"""
+    if history_result["status"] == "error":
+        return {
+            "status": "error",
+            "error": f"Failed to fetch historical data for {ticker}: {history_result['error']}"
+        }
+    changes = compute_price_change(history_result["data"], horizons, ticker)
+    if "error" in changes:
+        return {"status": "error", "error": changes["error"]}
+    return {"status": "success", "ticker": ticker, "changes": to_plain(changes), **staleness(history_result)}
+
+@traced_tool
 def calculate_price_change(ticker: str, timeframe: str = "1day") -> dict:
     """
     Calculate price change over specified timeframe
     
     Args:
         ticker: Stock ticker symbol
-        timeframe: Time period (1day, 1week, 1month)
+        timeframe: Time period (1day, 1week, 1month, 3month, 6month, ytd, 1year)
         
     Returns:
         Dictionary with price change analysis
     """
-    print(f"--- Tool: calculate_price_change called for {ticker}, timeframe: {timeframe} ---")
+    logger.info("calculate_price_change called for %s, timeframe: %s", ticker, timeframe)
     
     fmp_tools = FMPTools()
     
     try:
-        # Determine how many days of data we need
-        if timeframe == "1day":
-            days_needed = 5  # Get a few days to account for weekends
-        elif timeframe == "1week":
-            days_needed = 10
-        elif timeframe == "1month":
-            days_needed = 35
-        else:
-            days_needed = 5
+        historical_result = fmp_tools.get_price_history(ticker, _days_needed(timeframe))
+        return _price_change_result(ticker, timeframe, historical_result)
         
-        historical_result = fmp_tools.get_historical_prices(ticker, days_needed)
-        
-        if historical_result["status"] == "error":
-            return {
-                "status": "error",
-                "error": f"Failed to fetch historical data for {ticker}: {historical_result['error']}"
-            }
-        
-        historical_data = historical_result["data"]
-        
-        if not historical_data or "historical" not in historical_data:
-            return {
-                "status": "error",
-                "error": f"No historical data available for {ticker}"
-            }
-        
-        prices = historical_data["historical"]
-        
-        if len(prices) < 2:
-            return {
-                "status": "error",
-                "error": f"Insufficient historical data for {ticker}"
-            }
-        
-        # Prices are sorted by date (newest first)
-        current_price = float(prices[0]["close"])
+    except Exception as e:
+        return {
+            "status": "error",
+            "error": f"Error calculating price change for {ticker}: {str(e)}"
+        }
+
+@traced_tool
+async def calculate_price_change_async(ticker: str, timeframe: str = "1day") -> dict:
+    """Async variant of calculate_price_change for concurrent data gathering."""
+    logger.info("calculate_price_change_async called for %s, timeframe: %s", ticker, timeframe)
+    
+    fmp_tools = AsyncFMPTools()
+    
+    try:
+        historical_result = await fmp_tools.get_price_history(ticker, _days_needed(timeframe))
+        return _price_change_result(ticker, timeframe, historical_result)
         
-        # Find comparison price based on timeframe
-        if timeframe == "1day":
-            compare_price = float(prices[1]["close"])
-            period_desc = "previous trading day"
-        elif timeframe == "1week":
-            # Find price from approximately 7 days ago
-            compare_idx = min(7, len(prices) - 1)
-            compare_price = float(prices[compare_idx]["close"])
-            period_desc = "1 week ago"
-        elif timeframe == "1month":
-            # Find price from approximately 30 days ago
-            compare_idx = min(30, len(prices) - 1)
-            compare_price = float(prices[compare_idx]["close"])
-            period_desc = "1 month ago"
-        else:
-            compare_price = float(prices[1]["close"])
-            period_desc = "previous period"
+    except Exception as e:
+        return {
+            "status": "error",
+            "error": f"Error calculating price change for {ticker}: {str(e)}"
+        }
+
+@traced_tool
+def calculate_price_changes(ticker: str, timeframes: Optional[List[str]] = None) -> dict:
+    """
+    Calculate price changes over several timeframes from a single history fetch
+    
+    Args:
+        ticker: Stock ticker symbol
+        timeframes: Time periods (1day, 1week, 1month, 3month, 6month, ytd, 1year); all of them if omitted
         
-        change = current_price - compare_price
-        change_percent = (change / compare_price) * 100 if compare_price != 0 else 0
+    Returns:
+        Dictionary with one price change entry per timeframe
+    """
+    logger.info("calculate_price_changes called for %s, timeframes: %s", ticker, timeframes)
+    
+    fmp_tools = FMPTools()
+    
+    try:
+        horizons = resolve_horizons(timeframes)
+        if not horizons:
+            return {"status": "error", "error": f"Unknown timeframes: {timeframes}"}
+        history_result = fmp_tools.get_price_history(ticker, bars_needed(horizons))
+        return _price_changes_result(ticker.strip().upper(), horizons, history_result)
         
-        direction = "increased" if change > 0 else "decreased" if change < 0 else "remained flat"
+    except Exception as e:
+        return {
+            "status": "error",
+            "error": f"Error calculating price changes for {ticker}: {str(e)}"
+        }
+
+@traced_tool
+def calculate_indicators(tickers: List[str]) -> dict:
+    """
+    Calculate technical indicators for one or many tickers
+    
+    Args:
+        tickers: Stock ticker symbols (hundreds at once are fine, e.g. for screening)
         
+    Returns:
+        Dictionary with per-ticker indicators under "indicators" (SMA 20/50,
+        EMA 12/26, RSI 14, ATR 14, annualized volatility, drawdown from the
+        1-year high, volume versus its 20-day average, and screening "signals"
+        such as overbought, oversold or volume_spike) and per-ticker failures
+        under "errors"
+    """
+    logger.info("calculate_indicators called for %s tickers", len(tickers))
+    
+    fmp_tools = FMPTools()
+    
+    try:
+        histories = fmp_tools.get_price_histories(tickers, HISTORY_BARS)
+        indicators, errors = {}, dict(histories["errors"])
+        for symbol, entry in compute_indicators(histories["data"]).items():
+            if "error" in entry:
+                errors[symbol] = entry["error"]
+            else:
+                indicators[symbol] = entry
         return {
-            "status": "success",
-            "ticker": ticker,
-            "current_price": current_price,
-            "previous_price": compare_price,
-            "change": change,
-            "change_percent": change_percent,
-            "direction": direction,
-            "timeframe": timeframe,
-            "period_description": period_desc
+            "status": "success" if not errors else "partial" if indicators else "error",
+            "indicators": indicators,
+            "errors": errors,
+            **({"stale": histories["stale"]} if histories.get("stale") else {}),
         }
         
     except Exception as e:
         return {
             "status": "error",
-            "error": f"Error calculating price change for {ticker}: {str(e)}"
+            "error": f"Error calculating indicators: {str(e)}"
         }
 
-ticker_price_change = Agent(
-    name="ticker_price_change",
-    model="gemini-2.0-flash",
-    description="Agent to calculate price changes over different timeframes",
-    instruction="""
-    You are a specialized agent that calculates and analyzes stock price changes over various timeframes.
-    
-    When given a ticker symbol and timeframe:
-    1. Print "CALCULATING PRICE CHANGE FOR [SYMBOL] OVER [TIMEFRAME]"
-    2. Use the calculate_price_change tool with the exact ticker and timeframe parameters
-    3. Present the analysis clearly showing:
-       - Current price vs comparison price
-       - Absolute change in dollars
-       - Percentage change
-       - Direction of movement (increased/decreased)
-    4. Print "PRICE CHANGE ANALYSIS COMPLETE FOR [SYMBOL]"
-    
-    Example:
-    - When called with ticker="TSLA", timeframe="1day"
-    - You should call calculate_price_change(ticker="TSLA", timeframe="1day")
-    """,
-    tools=[calculate_price_change],
-)
\ No newline at end of file
+def _build_agent():
+    from google.adk.agents import Agent
+
+    return Agent(
+        name="ticker_price_change",
+        model="gemini-2.0-flash",
+        description="Agent to calculate price changes over different timeframes",
+        instruction="""
+        You are a specialized agent that calculates and analyzes stock price changes over various timeframes.
+    
+        When given a ticker symbol and timeframe:
+        1. Print "CALCULATING PRICE CHANGE FOR [SYMBOL] OVER [TIMEFRAME]"
+        2. Use the calculate_price_change tool with the exact ticker and timeframe parameters
+        3. Present the analysis clearly showing:
+           - Current price vs comparison price
+           - Absolute change in dollars
+           - Percentage change
+           - Direction of movement (increased/decreased)
+        4. Print "PRICE CHANGE ANALYSIS COMPLETE FOR [SYMBOL]"
+    
+        When asked how a stock did in general or over several periods, call calculate_price_changes
+        once with the ticker (and the timeframes, if specific ones were asked for) instead of calling
+        calculate_price_change repeatedly.
+    
+        Example:
+        - When called with ticker="TSLA", timeframe="1day"
+        - You should call calculate_price_change(ticker="TSLA", timeframe="1day")
+    
+        For questions about trend, momentum, volatility, drawdown, unusual volume or overbought/oversold
+        levels, or to screen a list of stocks, call calculate_indicators once with all the tickers and
+        report the relevant indicator values and signals.
+        """,
+        tools=[calculate_price_change, calculate_price_changes, calculate_indicators],
+        **agent_callbacks(),
+    )
+
+# Built on first access so that importing the tool functions does not load ADK
+__getattr__ = lazy_attributes(globals(), ticker_price_change=_build_agent)
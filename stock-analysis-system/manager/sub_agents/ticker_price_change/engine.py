@@ -0,0 +1,166 @@
+"""
+Vectorized multi-timeframe price change engine.
+
+Comparison bars are chosen by calendar date, not by row offset: for each horizon
+the engine looks up the last bar on or before the target date with a binary
+search over the date column. All (symbol, horizon) lookups of a call happen in a
+single ``np.searchsorted`` over the concatenated series.
+"""
+
+import math
+from datetime import date
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+from manager.tools.models import PriceChange
+
+HORIZONS = ("1day", "1week", "1month", "3month", "6month", "ytd", "1year")
+
+ALIASES = {
+    "1d": "1day", "day": "1day", "today": "1day",
+    "1w": "1week", "week": "1week",
+    "1m": "1month", "month": "1month",
+    "3m": "3month", "3months": "3month", "quarter": "3month",
+    "6m": "6month", "6months": "6month", "halfyear": "6month",
+    "1y": "1year", "year": "1year", "12month": "1year",
+}
+
+PERIOD_DESCRIPTIONS = {
+    "1day": "previous trading day",
+    "1week": "1 week ago",
+    "1month": "1 month ago",
+    "3month": "3 months ago",
+    "6month": "6 months ago",
+    "ytd": "end of last year",
+    "1year": "1 year ago",
+}
+
+# Spacing between symbols when their dates are packed into one sorted axis
+_SYMBOL_STRIDE = 1_000_000
+
+
+def normalize_timeframe(timeframe: str) -> Optional[str]:
+    """Canonical horizon name for a timeframe or alias (None if unknown)"""
+    key = timeframe.strip().lower().replace(" ", "").replace("_", "")
+    key = ALIASES.get(key, key)
+    return key if key in HORIZONS else None
+
+
+def _shift_months(day: date, months: int) -> date:
+    month_index = day.year * 12 + day.month - 1 - months
+    year, month = divmod(month_index, 12)
+    month += 1
+    # Clamp e.g. March 31 -> February 28/29
+    next_month = date(year + (month == 12), month % 12 + 1, 1)
+    last_day = (np.datetime64(next_month, 'D') - 1).astype(object).day
+    return date(year, month, min(day.day, last_day))
+
+
+def target_date(horizon: str, as_of: date) -> date:
+    """Calendar date whose closing price a horizon compares against"""
+    if horizon == "1day":
+        return date.fromordinal(as_of.toordinal() - 1)
+    if horizon == "1week":
+        return date.fromordinal(as_of.toordinal() - 7)
+    if horizon == "1month":
+        return _shift_months(as_of, 1)
+    if horizon == "3month":
+        return _shift_months(as_of, 3)
+    if horizon == "6month":
+        return _shift_months(as_of, 6)
+    if horizon == "1year":
+        return _shift_months(as_of, 12)
+    if horizon == "ytd":
+        return date(as_of.year - 1, 12, 31)
+    raise ValueError(f"Unknown horizon: {horizon}")
+
+
+def bars_needed(horizons: Iterable[str], as_of: Optional[date] = None) -> int:
+    """Number of daily bars that cover the longest horizon (weekdays, plus slack for the lookup bar)"""
+    as_of = as_of or date.today()
+    longest = max((as_of - target_date(h, as_of)).days for h in horizons)
+    return int(math.ceil(longest * 5 / 7)) + 5
+
+
+def compute_price_changes(series: Dict[str, np.ndarray], horizons: Iterable[str] = HORIZONS) -> Dict[str, dict]:
+    """
+    Price changes for every (symbol, horizon) pair in one vectorized pass
+
+    Args:
+        series: Symbol -> PriceSeries (or BAR_DTYPE array) sorted oldest first
+        horizons: Canonical horizon names (see HORIZONS)
+
+    Returns:
+        Symbol -> horizon -> PriceChange; horizons the history does not reach
+        map to an {"error": ...} dict, symbols without data to {"error": ...}
+    """
+    horizons = list(horizons)
+    symbols = [s for s, bars in series.items() if len(bars) >= 2]
+    results: Dict[str, dict] = {s: {"error": f"Insufficient historical data for {s}"}
+                                for s, bars in series.items() if len(bars) < 2}
+    if not symbols or not horizons:
+        return results
+
+    dates = [np.asarray(series[s]['date']).astype('datetime64[D]').astype(np.int64) for s in symbols]
+    closes = np.concatenate([np.asarray(series[s]['close'], dtype=np.float64) for s in symbols])
+    lengths = np.array([len(d) for d in dates])
+    ends = np.cumsum(lengths)
+    starts = ends - lengths
+    offsets = np.arange(len(symbols), dtype=np.int64) * _SYMBOL_STRIDE
+    packed = np.concatenate([d + off for d, off in zip(dates, offsets)])
+
+    # Targets for every (symbol, horizon) pair, relative to each symbol's latest bar
+    latest = packed[ends - 1] - offsets
+    # (symbols usually share their latest date, so calendar math runs once per distinct date)
+    latest_days, inverse = np.unique(latest, return_inverse=True)
+    target_table = np.array([
+        [np.datetime64(target_date(h, day.astype(object)), 'D').astype(np.int64) for h in horizons]
+        for day in latest_days.astype('datetime64[D]')
+    ], dtype=np.int64)
+    targets = target_table[inverse.ravel()]
+    idx = np.searchsorted(packed, (targets + offsets[:, None]).ravel(), side='right').reshape(targets.shape) - 1
+    found = idx >= starts[:, None]
+    idx = np.where(found, idx, starts[:, None])
+
+    current = closes[ends - 1][:, None]
+    previous = closes[idx]
+    change = current - previous
+    with np.errstate(divide='ignore', invalid='ignore'):
+        change_percent = np.where(previous != 0, change / previous * 100, 0.0)
+    previous_dates = (packed[idx] - offsets[:, None]).astype('datetime64[D]')
+
+    for i, symbol in enumerate(symbols):
+        per_horizon = {}
+        for j, horizon in enumerate(horizons):
+            if not found[i, j]:
+                per_horizon[horizon] = {"error": f"Not enough history for {horizon} change of {symbol}"}
+                continue
+            per_horizon[horizon] = PriceChange(
+                current_price=float(current[i, 0]),
+                current_date=str(latest[i].astype('datetime64[D]')),
+                previous_price=float(previous[i, j]),
+                previous_date=str(previous_dates[i, j]),
+                change=float(change[i, j]),
+                change_percent=float(change_percent[i, j]),
+                period_description=PERIOD_DESCRIPTIONS[horizon],
+            )
+        results[symbol] = per_horizon
+    return results
+
+
+def compute_price_change(bars: np.ndarray, horizons: Iterable[str] = HORIZONS, symbol: str = "ticker") -> dict:
+    """Single-symbol convenience wrapper around compute_price_changes"""
+    return compute_price_changes({symbol: bars}, horizons)[symbol]
+
+
+def resolve_horizons(timeframes: Optional[List[str]]) -> List[str]:
+    """Canonical horizons for a list of timeframes, defaulting to all of them"""
+    if not timeframes:
+        return list(HORIZONS)
+    resolved = []
+    for timeframe in timeframes:
+        horizon = normalize_timeframe(timeframe)
+        if horizon and horizon not in resolved:
+            resolved.append(horizon)
+    return resolved
@@ -0,0 +1,273 @@
+"""
+Vectorized technical indicators over daily price history.
+
+Indicators for many symbols are computed together: the series are right-aligned
+into (symbols x bars) matrices (shorter histories are padded with NaN on the
+left) and every step works on whole columns, so screening hundreds of symbols
+costs one pass over the bars rather than one per symbol.
+
+Two kinds of indicator are computed:
+
+- Recursive ones (EMA, RSI and ATR with Wilder smoothing) are advanced one bar
+  at a time by ``_advance``. Their state is kept per symbol, so when a new bar
+  arrives only that bar is applied instead of recomputing the window. The
+  newest bar of a series is never committed to the state, because today's bar
+  keeps changing while the market is open.
+- Window ones (SMA, realized volatility, volume anomaly) only look at the last
+  few bars, which are kept with the state. Peak and maximum drawdown look at
+  the last HISTORY_BARS closes of the series passed in, so a peak from more
+  than a year ago does not linger in a long-lived state.
+"""
+
+import math
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from manager.tools.price_store import BAR_DTYPE
+
+SMA_WINDOWS = (20, 50)
+EMA_SPANS = (12, 26)
+RSI_PERIOD = 14
+ATR_PERIOD = 14
+VOLATILITY_WINDOW = 20
+VOLUME_WINDOW = 20
+# Latest volume this many standard deviations above the trailing mean is an anomaly
+VOLUME_ANOMALY_Z = 2.0
+RSI_OVERBOUGHT = 70.0
+RSI_OVERSOLD = 30.0
+TRADING_DAYS = 252
+
+# Bars of history indicators are computed from (a year, for the drawdown)
+HISTORY_BARS = 260
+# Bars kept with each state for the window indicators
+_TAIL = max(max(SMA_WINDOWS), VOLATILITY_WINDOW + 1, VOLUME_WINDOW + 1)
+
+_RECURSIVE = tuple(f"ema_{span}" for span in EMA_SPANS) + ("close", "avg_gain", "avg_loss", "atr")
+
+
+def _ewm_step(previous: np.ndarray, value: np.ndarray, alpha: float) -> np.ndarray:
+    """One exponential smoothing step, seeded with the first value and skipping NaN"""
+    stepped = np.where(np.isnan(value), previous, previous + alpha * (value - previous))
+    return np.where(np.isnan(previous), value, stepped)
+
+
+def _advance(state: Dict[str, np.ndarray], close: np.ndarray, high: np.ndarray, low: np.ndarray) -> None:
+    """Apply one bar per symbol to the recursive indicators (NaN bars leave a symbol unchanged)"""
+    previous = state["close"]
+    seeded = ~np.isnan(previous)
+    with np.errstate(invalid='ignore'):
+        # A symbol's first bar has no previous close: its true range is just high - low
+        true_range = np.where(
+            seeded, np.fmax(high - low, np.fmax(np.abs(high - previous), np.abs(low - previous))), high - low)
+        change = close - previous
+        gain = np.where(seeded, np.maximum(change, 0.0), np.nan)
+        loss = np.where(seeded, np.maximum(-change, 0.0), np.nan)
+        for span in EMA_SPANS:
+            state[f"ema_{span}"] = _ewm_step(state[f"ema_{span}"], close, 2.0 / (span + 1))
+        state["avg_gain"] = _ewm_step(state["avg_gain"], gain, 1.0 / RSI_PERIOD)
+        state["avg_loss"] = _ewm_step(state["avg_loss"], loss, 1.0 / RSI_PERIOD)
+        state["atr"] = _ewm_step(state["atr"], true_range, 1.0 / ATR_PERIOD)
+        state["close"] = np.where(np.isnan(close), previous, close)
+
+
+def _right_aligned(columns: List[np.ndarray], width: int) -> np.ndarray:
+    """Stack 1-D arrays into a (len(columns), width) matrix, keeping the last `width` values, NaN-padded left"""
+    matrix = np.full((len(columns), width), np.nan)
+    for row, values in enumerate(columns):
+        values = np.asarray(values, dtype=np.float64)[-width:]
+        if len(values):
+            matrix[row, width - len(values):] = values
+    return matrix
+
+
+class IndicatorState:
+    """Committed recursive indicator values of one symbol, plus its last few bars"""
+
+    __slots__ = ('symbol', 'last_date', 'values', 'tail')
+
+    def __init__(self, symbol: str):
+        self.symbol = symbol
+        self.last_date: Optional[np.datetime64] = None
+        self.values: Dict[str, float] = {name: math.nan for name in _RECURSIVE}
+        self.tail = np.empty(0, dtype=BAR_DTYPE)
+
+
+def _commit(states: List[IndicatorState], new_bars: List[np.ndarray]) -> None:
+    """
+    Commit each state's new bars, for all states in one vectorized pass
+
+    Shorter lists of new bars are NaN-padded on the left, which _advance skips,
+    so a fresh state (committing its whole history) and a cached one (committing
+    the bars that arrived since) go through the same steps.
+    """
+    width = max((len(bars) for bars in new_bars), default=0)
+    if not width:
+        return
+    state = {name: np.array([s.values[name] for s in states]) for name in _RECURSIVE}
+    columns = {field: _right_aligned([bars[field] for bars in new_bars], width) for field in ('close', 'high', 'low')}
+    for t in range(width):
+        _advance(state, columns['close'][:, t], columns['high'][:, t], columns['low'][:, t])
+    for i, (s, bars) in enumerate(zip(states, new_bars)):
+        s.values = {name: float(values[i]) for name, values in state.items()}
+        if len(bars):
+            s.last_date = bars['date'][-1]
+            s.tail = np.concatenate([s.tail, np.asarray(bars)])[-_TAIL:]
+
+
+def _nan_to_none(value: float, digits: int = 2) -> Optional[float]:
+    return None if value is None or math.isnan(value) else round(float(value), digits)
+
+
+def _indicators(states: List[IndicatorState], latest: List[np.ndarray], history: np.ndarray) -> List[dict]:
+    """
+    Indicator values of each symbol: its committed state advanced by its newest
+    bar, and the drawdowns over its row of history (closes, right-aligned)
+    """
+    count = len(states)
+    state = {name: np.array([s.values[name] for s in states]) for name in _RECURSIVE}
+    last = {field: np.array([bar[field] for bar in latest], dtype=np.float64) for field in ('close', 'high', 'low', 'volume')}
+    _advance(state, last['close'], last['high'], last['low'])
+
+    closes = _right_aligned([np.append(s.tail['close'], last['close'][i]) for i, s in enumerate(states)], _TAIL)
+    volumes = _right_aligned([np.append(s.tail['volume'], last['volume'][i]) for i, s in enumerate(states)], _TAIL)
+    bar_counts = np.array([len(s.tail) + 1 for s in states])
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sma = {w: np.where(bar_counts >= w, closes[:, -w:].mean(axis=1), np.nan) for w in SMA_WINDOWS}
+        returns = np.diff(np.log(closes[:, -(VOLATILITY_WINDOW + 1):]), axis=1)
+        volatility = np.where(bar_counts > VOLATILITY_WINDOW,
+                              returns.std(axis=1, ddof=1) * math.sqrt(TRADING_DAYS) * 100, np.nan)
+        trailing = volumes[:, -(VOLUME_WINDOW + 1):-1]
+        volume_mean = trailing.mean(axis=1)
+        volume_std = trailing.std(axis=1, ddof=1)
+        volume_z = np.where((bar_counts > VOLUME_WINDOW) & (volume_std > 0), (volumes[:, -1] - volume_mean) / volume_std, np.nan)
+        volume_ratio = np.where((bar_counts > VOLUME_WINDOW) & (volume_mean > 0), volumes[:, -1] / volume_mean, np.nan)
+        rsi = np.where(state["avg_loss"] == 0, 100.0, 100.0 - 100.0 / (1.0 + state["avg_gain"] / state["avg_loss"]))
+        peaks = np.fmax.accumulate(history, axis=1)
+        max_drawdown = np.nanmin(history / peaks - 1.0, axis=1)
+        drawdown = state["close"] / peaks[:, -1] - 1.0
+
+    results = []
+    for i in range(count):
+        close = float(state["close"][i])
+        entry = {
+            "close": _nan_to_none(close),
+            "sma": {str(w): _nan_to_none(sma[w][i]) for w in SMA_WINDOWS},
+            "ema": {str(span): _nan_to_none(state[f"ema_{span}"][i]) for span in EMA_SPANS},
+            "rsi": _nan_to_none(rsi[i]),
+            "atr": _nan_to_none(state["atr"][i]),
+            "atr_percent": _nan_to_none(state["atr"][i] / close * 100 if close else np.nan),
+            "volatility_percent": _nan_to_none(volatility[i]),
+            "drawdown_percent": _nan_to_none(drawdown[i] * 100),
+            "max_drawdown_percent": _nan_to_none(max_drawdown[i] * 100),
+            "volume": _nan_to_none(last['volume'][i], 0),
+            "volume_ratio": _nan_to_none(volume_ratio[i]),
+            "volume_zscore": _nan_to_none(volume_z[i]),
+        }
+        entry["signals"] = _signals(entry)
+        results.append(entry)
+    return results
+
+
+def _signals(entry: dict) -> List[str]:
+    """Screening flags derived from the indicator values"""
+    signals = []
+    rsi, close = entry["rsi"], entry["close"]
+    if rsi is not None and rsi >= RSI_OVERBOUGHT:
+        signals.append("overbought")
+    if rsi is not None and rsi <= RSI_OVERSOLD:
+        signals.append("oversold")
+    longest = entry["sma"][str(max(SMA_WINDOWS))]
+    if longest is not None and close is not None:
+        signals.append(f"above_sma_{max(SMA_WINDOWS)}" if close > longest else f"below_sma_{max(SMA_WINDOWS)}")
+    fast, slow = (entry["ema"][str(span)] for span in EMA_SPANS)
+    if fast is not None and slow is not None:
+        signals.append("ema_bullish" if fast > slow else "ema_bearish")
+    if entry["volume_zscore"] is not None and entry["volume_zscore"] >= VOLUME_ANOMALY_Z:
+        signals.append("volume_spike")
+    return signals
+
+
+class IndicatorEngine:
+    """Indicator states per symbol, advanced incrementally as new bars arrive"""
+
+    def __init__(self, maxsize: int = 4096):
+        self.maxsize = maxsize
+        self._states: "OrderedDict[str, IndicatorState]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.rebuilt = 0
+        self.advanced = 0
+
+    def _reusable(self, state: Optional[IndicatorState], bars: np.ndarray) -> Optional[np.ndarray]:
+        """Bars to commit on top of a cached state, or None when it has to be rebuilt"""
+        if state is None or state.last_date is None:
+            return None
+        committed = bars[:-1]
+        position = np.searchsorted(committed['date'], state.last_date)
+        if position >= len(committed) or committed['date'][position] != state.last_date:
+            return None
+        return committed[position + 1:]
+
+    def compute(self, series: Dict[str, np.ndarray]) -> Dict[str, dict]:
+        """
+        Indicators for every symbol
+
+        Args:
+            series: Symbol -> PriceSeries (or BAR_DTYPE array) sorted oldest first
+
+        Returns:
+            Symbol -> indicator dict; symbols with fewer than two bars map to {"error": ...}
+        """
+        results: Dict[str, dict] = {}
+        usable = {}
+        for symbol, bars in series.items():
+            bars = getattr(bars, 'bars', bars)
+            if len(bars) < 2:
+                results[symbol] = {"error": f"Insufficient historical data for {symbol}"}
+            else:
+                usable[symbol] = bars
+        if not usable:
+            return results
+
+        with self._lock:
+            states, pending = {}, []
+            for symbol, bars in usable.items():
+                state = self._states.get(symbol)
+                new_bars = self._reusable(state, bars)
+                if new_bars is None:
+                    # Unknown symbol, or history that no longer lines up: commit it all from scratch
+                    state, new_bars = IndicatorState(symbol), bars[:-1]
+                    self.rebuilt += 1
+                else:
+                    self.advanced += len(new_bars)
+                states[symbol] = state
+                pending.append(new_bars)
+            _commit(list(states.values()), pending)
+            for symbol, state in states.items():
+                self._states[symbol] = state
+                self._states.move_to_end(symbol)
+            while len(self._states) > self.maxsize:
+                self._states.popitem(last=False)
+
+            symbols = list(usable)
+            history = _right_aligned([usable[s]['close'] for s in symbols], HISTORY_BARS)
+            values = _indicators([states[s] for s in symbols], [usable[s][-1] for s in symbols], history)
+
+        for symbol, entry in zip(symbols, values):
+            results[symbol] = {"as_of": str(usable[symbol]['date'][-1]), "bars": len(usable[symbol]), **entry}
+        return results
+
+    def clear(self) -> None:
+        with self._lock:
+            self._states.clear()
+
+
+indicator_engine = IndicatorEngine()
+
+
+def compute_indicators(series: Dict[str, np.ndarray]) -> Dict[str, dict]:
+    """Indicators for every symbol, reusing the shared engine's cached states"""
+    return indicator_engine.compute(series)
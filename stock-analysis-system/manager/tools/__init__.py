@@ -1 +1,2 @@
-from .tools import FMPTools
\ No newline at end of file
+from .tools import FMPTools
+from .async_tools import AsyncFMPTools
@@ -0,0 +1,70 @@
+"""
+asyncio interface to FMPTools.
+
+Each coroutine runs the corresponding FMPTools call on a bounded worker pool
+sized to the shared HTTP connection pool, so independent calls awaited together
+(e.g. with ``asyncio.gather``) overlap on the wire while still going through the
+same pooled session, timeouts, retries and response cache as the sync client.
+"""
+
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
+
+from .rate_limit import in_context
+from .session import POOL_MAXSIZE
+from .tools import FMPTools
+
+_executor: Optional[ThreadPoolExecutor] = None
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=POOL_MAXSIZE, thread_name_prefix='fmp-io')
+    return _executor
+
+
+class AsyncFMPTools:
+    """Awaitable counterpart of FMPTools with the same methods and return values"""
+
+    def __init__(self, tools: Optional[FMPTools] = None):
+        self._tools = tools or FMPTools()
+
+    async def _run(self, func, *args, **kwargs) -> dict:
+        loop = asyncio.get_running_loop()
+        # Carry the caller's context (request priority) into the worker thread
+        return await loop.run_in_executor(_get_executor(), in_context(functools.partial(func, *args, **kwargs)))
+
+    async def get_stock_quote(self, symbol: str) -> dict:
+        """Get current stock quote"""
+        return await self._run(self._tools.get_stock_quote, symbol)
+
+    async def get_historical_prices(self, symbol: str, days: int = 30) -> dict:
+        """Get historical price data"""
+        return await self._run(self._tools.get_historical_prices, symbol, days)
+
+    async def get_price_history(self, symbol: str, days: int = 30):
+        """Get daily bars as a PriceSeries (oldest first)"""
+        return await self._run(self._tools.get_price_history, symbol, days)
+
+    async def get_price_histories(self, symbols: List[str], days: int = 30) -> dict:
+        """Get daily bars for many symbols through the local price store"""
+        return await self._run(self._tools.get_price_histories, symbols, days)
+
+    async def get_stock_quotes(self, symbols: List[str]) -> dict:
+        """Get current quotes for many symbols"""
+        return await self._run(self._tools.get_stock_quotes, symbols)
+
+    async def get_historical_prices_bulk(self, symbols: List[str], days: int = 30) -> dict:
+        """Get historical price data for many symbols"""
+        return await self._run(self._tools.get_historical_prices_bulk, symbols, days)
+
+    async def get_stock_news(self, symbol: str, limit: int = 10) -> dict:
+        """Get news for a specific stock"""
+        return await self._run(self._tools.get_stock_news, symbol, limit)
+
+    async def search_symbol(self, query: str) -> dict:
+        """Search for stock symbols"""
+        return await self._run(self._tools.search_symbol, query)
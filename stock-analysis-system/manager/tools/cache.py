@@ -0,0 +1,225 @@
+"""
+Bounded in-process response cache for FMPTools.
+
+Entries are keyed on (endpoint, normalized params) and evicted least recently
+used first once ``maxsize`` is reached. Each entry carries its own expiry, chosen
+by the TTL policy of the data type it holds (see ``ttl_for``). Expired entries
+are kept for another ``stale_ttl`` seconds (until LRU eviction pushes them out),
+so ``get_stale`` can still answer with the last known good value when the
+upstream is failing. With ``STOCKBOT_SHARED_CACHE`` set, the response cache is
+backed by a SQLite file shared by all worker processes (see shared_cache.py).
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from .market_hours import is_market_open, seconds_until_next_open
+
+# Parameters that never change the response and must not split cache entries
+_IGNORED_PARAMS = {'apikey', 'apiKey'}
+
+QUOTE_TTL_OPEN = 15.0
+HISTORY_TTL_OPEN = 60.0
+NEWS_TTL = 5 * 60.0
+SEARCH_TTL = 3 * 24 * 3600.0
+
+# How long past its TTL an entry can still be served as stale during upstream outages
+STALE_TTL = float(os.getenv('STOCKBOT_STALE_TTL', str(24 * 3600)))
+
+
+def make_key(endpoint: str, params: Optional[dict] = None) -> Tuple:
+    """Build a cache key from an endpoint name and its request params"""
+    items = []
+    for name, value in (params or {}).items():
+        if name in _IGNORED_PARAMS or value is None:
+            continue
+        if isinstance(value, str):
+            value = value.strip()
+        items.append((name, str(value)))
+    return (endpoint, tuple(sorted(items)))
+
+
+def quote_ttl() -> float:
+    """Seconds during the session; until the next open once the market is closed"""
+    if is_market_open():
+        return QUOTE_TTL_OPEN
+    return max(seconds_until_next_open(), QUOTE_TTL_OPEN)
+
+
+def history_ttl() -> float:
+    """Today's bar moves during the session; closed-day history holds until the next open"""
+    if is_market_open():
+        return HISTORY_TTL_OPEN
+    return max(seconds_until_next_open(), HISTORY_TTL_OPEN)
+
+
+def news_ttl() -> float:
+    return NEWS_TTL
+
+
+def search_ttl() -> float:
+    return SEARCH_TTL
+
+
+TTL_POLICIES: Dict[str, Callable[[], float]] = {
+    'quote': quote_ttl,
+    'history': history_ttl,
+    'news': news_ttl,
+    'search': search_ttl,
+}
+
+
+def ttl_for(kind: str) -> float:
+    """TTL in seconds for a data type (quote, history, news, search)"""
+    return TTL_POLICIES[kind]()
+
+
+class TTLCache:
+    """
+    Thread-safe LRU cache with a per-entry expiry time
+
+    With a ``backing`` store (see shared_cache.py) every set is written through
+    to it and a local miss is looked up there, so processes sharing the store
+    share their entries.
+    """
+
+    def __init__(self, maxsize: int = 1024, clock: Callable[[], float] = time.monotonic,
+                 stale_ttl: float = 0.0, backing=None):
+        self.maxsize = maxsize
+        self.stale_ttl = stale_ttl
+        self.backing = backing
+        self._clock = clock
+        self._data: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.stale_hits = 0
+        self.shared_hits = 0
+
+    def _lookup(self, key: Hashable) -> Optional[Tuple[float, Any]]:
+        """Local (expires_at, value) of an entry within its stale period, dropping it once past that"""
+        entry = self._data.get(key)
+        if entry is not None and entry[0] + self.stale_ttl <= self._clock():
+            del self._data[key]
+            self.expirations += 1
+            return None
+        return entry
+
+    def _load_shared(self, key: Hashable, stale: bool) -> Optional[Tuple[float, Any]]:
+        """
+        Copy an entry of the backing store into the local cache; its (expires_at, value)
+
+        With stale=False only an unexpired entry is read, so a hot key whose
+        shared row has expired costs one indexed lookup rather than an unpickle.
+        """
+        found = self.backing.get(key, stale=stale)
+        if found is None:
+            return None
+        value, expires_in, _ = found
+        with self._lock:
+            entry = (self._clock() + expires_in, value)
+            self._store(key, entry)
+        return entry
+
+    def _store(self, key: Hashable, entry: Tuple[float, Any]) -> None:
+        self._data[key] = entry
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._lookup(key)
+            if entry is not None and entry[0] > self._clock():
+                self._data.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+        if self.backing is not None:
+            # Another process may have fetched it since
+            entry = self._load_shared(key, stale=False)
+            if entry is not None and entry[0] > self._clock():
+                with self._lock:
+                    self.hits += 1
+                    self.shared_hits += 1
+                return entry[1]
+        with self._lock:
+            self.misses += 1
+        return default
+
+    def get_stale(self, key: Hashable) -> Optional[Tuple[Any, float]]:
+        """(value, seconds past its expiry) of an entry within its stale period, else None"""
+        with self._lock:
+            entry = self._lookup(key)
+        if entry is None and self.backing is not None:
+            entry = self._load_shared(key, stale=True)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        with self._lock:
+            self.stale_hits += 1
+        return value, max(self._clock() - expires_at, 0.0)
+
+    def set(self, key: Hashable, value: Any, ttl: float) -> None:
+        if ttl <= 0:
+            return
+        if self.maxsize > 0:
+            with self._lock:
+                self._store(key, (self._clock() + ttl, value))
+        if self.backing is not None:
+            self.backing.set(key, value, ttl, self.stale_ttl)
+
+    def invalidate(self, key: Hashable) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+        if self.backing is not None:
+            self.backing.delete(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+        if self.backing is not None:
+            self.backing.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> dict:
+        """Counters for sizing the cache"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "stale_hits": self.stale_hits,
+                "shared_hits": self.shared_hits,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+def _shared_cache():
+    """The cross-process store when STOCKBOT_SHARED_CACHE enables it (sqlite3 is only imported then)"""
+    if os.getenv('STOCKBOT_SHARED_CACHE', '').strip().lower() in ('', '0', 'false', 'no'):
+        return None
+    from .shared_cache import open_shared_cache
+    return open_shared_cache()
+
+
+# Shared by every FMPTools instance in the process
+# (and, with STOCKBOT_SHARED_CACHE, by every process using the same SQLite file)
+response_cache = TTLCache(maxsize=int(os.getenv('STOCKBOT_CACHE_SIZE', '2048')), stale_ttl=STALE_TTL,
+                          backing=_shared_cache())
+
+
+def staleness(result: dict) -> dict:
+    """The staleness marker of a tool result ("stale" plus "stale_seconds"/"as_of"), empty when fresh"""
+    return {key: result[key] for key in ("stale", "stale_seconds", "as_of") if key in result}
@@ -0,0 +1,187 @@
+"""
+Per-endpoint circuit breakers for upstream APIs.
+
+Each (provider, endpoint) pair has a breaker that watches the outcomes of its
+calls over a sliding time window. When at least CIRCUIT_MIN_CALLS calls fell in
+the window and the share of failures (errors, timeouts and calls slower than
+CIRCUIT_SLOW_CALL seconds) reaches CIRCUIT_FAILURE_RATE, the breaker opens and
+calls are rejected immediately instead of waiting on a struggling upstream.
+After CIRCUIT_OPEN_SECONDS one probe call is let through (half-open): success
+closes the breaker, failure opens it again.
+
+Settings come from the environment (``STOCKBOT_CIRCUIT_*``, see below); a
+failure rate above 1 disables the breakers.
+"""
+
+import os
+import threading
+import time
+from collections import deque
+from typing import Callable, Deque, Dict, Tuple
+
+import requests
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+# Numeric state for the metrics gauge
+_STATE_CODES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+CIRCUIT_FAILURE_RATE = float(os.getenv('STOCKBOT_CIRCUIT_FAILURE_RATE', '0.5'))
+CIRCUIT_MIN_CALLS = int(os.getenv('STOCKBOT_CIRCUIT_MIN_CALLS', '5'))
+CIRCUIT_WINDOW = float(os.getenv('STOCKBOT_CIRCUIT_WINDOW', '30'))
+CIRCUIT_OPEN_SECONDS = float(os.getenv('STOCKBOT_CIRCUIT_OPEN_SECONDS', '30'))
+CIRCUIT_SLOW_CALL = float(os.getenv('STOCKBOT_CIRCUIT_SLOW_CALL', '5'))
+
+
+def is_upstream_failure(error: BaseException) -> bool:
+    """
+    Whether an exception says the upstream is unhealthy
+
+    Connection errors, timeouts, 5xx and 429 responses count; other 4xx
+    responses (unknown symbol, bad parameters) and parse errors of a body
+    that did arrive do not.
+    """
+    if isinstance(error, ValueError):
+        # Includes requests.JSONDecodeError, which is also a RequestException
+        return False
+    if isinstance(error, requests.HTTPError):
+        status = error.response.status_code if error.response is not None else None
+        return status is None or status >= 500 or status == 429
+    return isinstance(error, (requests.RequestException, OSError))
+
+
+class CircuitBreaker:
+    """Closed/open/half-open breaker over a sliding window of call outcomes"""
+
+    def __init__(self, failure_rate: float = CIRCUIT_FAILURE_RATE, min_calls: int = CIRCUIT_MIN_CALLS,
+                 window: float = CIRCUIT_WINDOW, open_seconds: float = CIRCUIT_OPEN_SECONDS,
+                 slow_call: float = CIRCUIT_SLOW_CALL, clock: Callable[[], float] = time.monotonic):
+        self.failure_rate = failure_rate
+        self.min_calls = max(1, min_calls)
+        self.window = window
+        self.open_seconds = open_seconds
+        self.slow_call = slow_call
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._outcomes: Deque[Tuple[float, bool]] = deque()  # (time, failed)
+        self._failures = 0
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._probing = False
+        self.calls = 0
+        self.rejected = 0
+        self.opened = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state(self._clock())
+
+    @property
+    def closed(self) -> bool:
+        return self.state == CLOSED
+
+    def _current_state(self, now: float) -> str:
+        if self._state == OPEN and now - self._opened_at >= self.open_seconds:
+            self._state = HALF_OPEN
+        return self._state
+
+    def _trim(self, now: float) -> None:
+        while self._outcomes and now - self._outcomes[0][0] > self.window:
+            _, failed = self._outcomes.popleft()
+            self._failures -= failed
+
+    def retry_in(self) -> float:
+        """Seconds until an open breaker lets a probe through"""
+        with self._lock:
+            if self._state != OPEN:
+                return 0.0
+            return max(0.0, self._opened_at + self.open_seconds - self._clock())
+
+    def allow(self) -> bool:
+        """Whether a call may go upstream now; every allowed call must be followed by record() or cancel()"""
+        with self._lock:
+            state = self._current_state(self._clock())
+            if state == CLOSED or (state == HALF_OPEN and not self._probing):
+                self._probing = state == HALF_OPEN
+                return True
+            self.rejected += 1
+            return False
+
+    def cancel(self) -> None:
+        """An allowed call did not go upstream after all (e.g. it was rate limited)"""
+        with self._lock:
+            self._probing = False
+
+    def record(self, ok: bool, seconds: float = 0.0) -> None:
+        """Outcome of an allowed call; calls slower than slow_call count as failures"""
+        failed = not ok or seconds > self.slow_call
+        now = self._clock()
+        with self._lock:
+            self.calls += 1
+            if self._current_state(now) == HALF_OPEN:
+                self._probing = False
+                if failed:
+                    self._open(now)
+                else:
+                    self._state = CLOSED
+                    self._outcomes.clear()
+                    self._failures = 0
+                return
+            self._outcomes.append((now, failed))
+            self._failures += failed
+            self._trim(now)
+            if (self._state == CLOSED and len(self._outcomes) >= self.min_calls
+                    and self._failures / len(self._outcomes) >= self.failure_rate):
+                self._open(now)
+
+    def _open(self, now: float) -> None:
+        self._state = OPEN
+        self._opened_at = now
+        self.opened += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            now = self._clock()
+            state = self._current_state(now)
+            self._trim(now)
+            return {
+                "state": _STATE_CODES[state],
+                "window_calls": len(self._outcomes),
+                "window_failures": self._failures,
+                "calls": self.calls,
+                "rejected": self.rejected,
+                "opened": self.opened,
+            }
+
+
+class CircuitBreakers:
+    """One breaker per (provider, endpoint), created on first use"""
+
+    def __init__(self, **settings):
+        self._settings = settings
+        self._breakers: Dict[Tuple[str, str], CircuitBreaker] = {}
+        self._lock = threading.Lock()
+
+    def get(self, provider: str, endpoint: str) -> CircuitBreaker:
+        key = (provider, endpoint)
+        breaker = self._breakers.get(key)
+        if breaker is None:
+            with self._lock:
+                breaker = self._breakers.setdefault(key, CircuitBreaker(**self._settings))
+        return breaker
+
+    def reset(self) -> None:
+        with self._lock:
+            self._breakers.clear()
+
+    def stats(self) -> Dict[str, dict]:
+        with self._lock:
+            breakers = list(self._breakers.items())
+        return {f"{provider}/{endpoint}": breaker.stats() for (provider, endpoint), breaker in breakers}
+
+
+# Shared by every upstream call in the process
+circuit_breakers = CircuitBreakers()
@@ -0,0 +1,157 @@
+"""
+Hedged requests across interchangeable providers.
+
+The first provider is called right away; each further provider is started when
+the previous ones have failed, or when none has answered within the hedge delay.
+The first successful answer wins. Providers still running at that point are
+cancelled if they have not started, or otherwise left to finish in the
+background, where their result is handed to an optional ``on_late`` callback
+(e.g. to merge extra news into the store) instead of being waited for.
+Per-provider latency and win counts are tracked so the hedge delay can be tuned.
+"""
+
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, wait
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .rate_limit import in_context
+
+# Latency samples kept per provider
+_SAMPLES = 500
+
+
+class ProviderStats:
+    """Latency and win-rate counters per provider"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._providers: Dict[str, dict] = {}
+
+    def _entry(self, name: str) -> dict:
+        return self._providers.setdefault(name, {
+            "calls": 0, "successes": 0, "failures": 0, "wins": 0, "latencies": deque(maxlen=_SAMPLES),
+        })
+
+    def record(self, name: str, latency: float, ok: bool) -> None:
+        with self._lock:
+            entry = self._entry(name)
+            entry["calls"] += 1
+            entry["successes" if ok else "failures"] += 1
+            entry["latencies"].append(latency)
+
+    def record_win(self, name: str) -> None:
+        with self._lock:
+            self._entry(name)["wins"] += 1
+
+    def snapshot(self) -> Dict[str, dict]:
+        """Per-provider calls, success/win rates and latency percentiles (seconds)"""
+        with self._lock:
+            total_wins = sum(e["wins"] for e in self._providers.values())
+            result = {}
+            for name, entry in self._providers.items():
+                latencies = sorted(entry["latencies"])
+                result[name] = {
+                    "calls": entry["calls"],
+                    "successes": entry["successes"],
+                    "failures": entry["failures"],
+                    "wins": entry["wins"],
+                    "win_rate": entry["wins"] / total_wins if total_wins else 0.0,
+                    "p50": _percentile(latencies, 0.50),
+                    "p90": _percentile(latencies, 0.90),
+                    "p99": _percentile(latencies, 0.99),
+                }
+            return result
+
+
+def _percentile(values: List[float], q: float) -> Optional[float]:
+    if not values:
+        return None
+    return values[min(int(q * len(values)), len(values) - 1)]
+
+
+def hedged_call(
+    providers: List[Tuple[str, Callable[[], dict]]],
+    executor: Executor,
+    hedge_delay: float,
+    deadline: float,
+    stats: Optional[ProviderStats] = None,
+    on_late: Optional[Callable[[str, dict], None]] = None,
+) -> Tuple[Optional[str], dict]:
+    """
+    Call providers with hedging and return (winner name, result)
+
+    Each provider returns a result dict with a "status" key; "success" counts
+    as a good answer. When nobody succeeds before the deadline the result is an
+    error combining the providers' errors and the winner is None.
+    """
+    start = time.monotonic()
+    pending: Dict[Future, str] = {}
+    errors: List[str] = []
+    next_index = 0
+    next_launch = 0.0
+
+    def launch() -> None:
+        nonlocal next_index, next_launch
+        name, fn = providers[next_index]
+        next_index += 1
+        next_launch = time.monotonic() - start + hedge_delay
+
+        def timed():
+            began = time.monotonic()
+            try:
+                result = fn()
+            except Exception as e:
+                result = {"status": "error", "error": str(e)}
+            if stats is not None:
+                stats.record(name, time.monotonic() - began, result.get("status") == "success")
+            return result
+
+        pending[executor.submit(in_context(timed))] = name
+
+    launch()
+    while pending or next_index < len(providers):
+        elapsed = time.monotonic() - start
+        if elapsed >= deadline:
+            break
+        if not pending:
+            launch()
+            continue
+        timeout = deadline - elapsed
+        if next_index < len(providers):
+            timeout = min(timeout, max(next_launch - elapsed, 0.0))
+        done, _ = wait(list(pending), timeout=timeout, return_when=FIRST_COMPLETED)
+        for future in done:
+            name = pending.pop(future)
+            result = future.result()
+            if result.get("status") == "success":
+                if stats is not None:
+                    stats.record_win(name)
+                _abandon(pending, on_late)
+                return name, result
+            errors.append(f"{name}: {result.get('error')}")
+        if next_index < len(providers) and (not pending or time.monotonic() - start >= next_launch):
+            launch()
+
+    _abandon(pending, on_late)
+    if pending:
+        errors.append(f"deadline of {deadline:.1f}s exceeded")
+    return None, {"status": "error", "error": "; ".join(errors) or "No provider answered"}
+
+
+def _abandon(pending: Dict[Future, str], on_late: Optional[Callable[[str, dict], None]]) -> None:
+    """Cancel losers that have not started and hand results of running ones to on_late"""
+    for future, name in pending.items():
+        if future.cancel() or on_late is None:
+            continue
+        future.add_done_callback(lambda f, name=name: _deliver_late(f, name, on_late))
+
+
+def _deliver_late(future: Future, name: str, on_late: Callable[[str, dict], None]) -> None:
+    try:
+        result = future.result()
+        if result.get("status") == "success":
+            on_late(name, result)
+    except Exception:
+        pass
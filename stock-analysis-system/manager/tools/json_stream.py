@@ -0,0 +1,114 @@
+"""
+Incremental parsing of large JSON responses.
+
+``iter_array`` reads a response body chunk by chunk and yields the elements of
+one array of the top-level object as soon as each is complete, so a caller can
+process rows while the body is still arriving and stop reading once it has
+what it needs. Only the element being decoded (plus one network chunk) is held
+in memory, however long the array is.
+"""
+
+import codecs
+import json
+from typing import Any, Iterable, Iterator
+
+# Bytes read from the socket at a time
+CHUNK_SIZE = 16 * 1024
+# Drop consumed text from the buffer once this much has accumulated
+_COMPACT_AT = 64 * 1024
+_WHITESPACE = ' \t\n\r'
+_NUMBER_CHARS = '0123456789.eE+-'
+
+_decoder = json.JSONDecoder()
+
+
+class _Reader:
+    """Text buffer over a stream of byte chunks with a read position"""
+
+    def __init__(self, chunks: Iterable[bytes]):
+        self._chunks = iter(chunks)
+        self._decode = codecs.getincrementaldecoder('utf-8')().decode
+        self.buf = ''
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self) -> bool:
+        """Append the next chunk of text; False once the stream is exhausted"""
+        while not self.eof:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                self.eof = True
+                text = self._decode(b'', final=True)
+            else:
+                text = self._decode(chunk)
+            if text:
+                if self.pos > _COMPACT_AT:
+                    self.buf, self.pos = self.buf[self.pos:], 0
+                self.buf += text
+                return True
+        return False
+
+    def peek(self) -> str:
+        """Next non-whitespace character, without consuming it"""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                raise ValueError("Unexpected end of JSON document")
+
+    def expect(self, char: str) -> None:
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"Expected {char!r} at offset {self.pos}, found {found!r}")
+        self.pos += 1
+
+    def value(self) -> Any:
+        """Decode the JSON value at the read position (after peek())"""
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+                continue
+            # A number that runs to the end of the buffer may continue in the next
+            # chunk, including after a prefix that is a number itself ("6." + "0625")
+            if (isinstance(value, (int, float)) and (end == len(self.buf) or self.buf[end] in _NUMBER_CHARS)
+                    and self._fill()):
+                continue
+            self.pos = end
+            return value
+
+
+def iter_array(chunks: Iterable[bytes], key: str) -> Iterator[Any]:
+    """
+    Yield the elements of the array under `key` in a top-level JSON object
+
+    Nothing is yielded when the key is missing (or not an array). Reading stops
+    at the end of that array; closing the generator early stops it sooner.
+    """
+    reader = _Reader(chunks)
+    reader.expect('{')
+    while True:
+        char = reader.peek()
+        if char == '}':
+            return
+        if char == ',':
+            reader.pos += 1
+            continue
+        name = reader.value()
+        reader.expect(':')
+        if name == key and reader.peek() == '[':
+            reader.pos += 1
+            while True:
+                char = reader.peek()
+                if char == ']':
+                    return
+                if char == ',':
+                    reader.pos += 1
+                    continue
+                yield reader.value()
+        reader.peek()
+        reader.value()
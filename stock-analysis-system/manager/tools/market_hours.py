@@ -0,0 +1,64 @@
+"""
+US equity market session helpers (NYSE/Nasdaq regular hours, 9:30-16:00 ET).
+
+Exchange holidays are not modelled: a holiday is treated as a regular session,
+which only means cached data is refreshed a little more often than necessary.
+"""
+
+from datetime import datetime, time, timedelta, timezone, tzinfo
+from typing import Optional
+
+try:
+    from zoneinfo import ZoneInfo
+    MARKET_TZ: tzinfo = ZoneInfo('America/New_York')
+except Exception:  # Python < 3.9 or no tz database available
+    MARKET_TZ = timezone(timedelta(hours=-5), 'EST')
+
+MARKET_OPEN = time(9, 30)
+MARKET_CLOSE = time(16, 0)
+
+
+def market_now(now: Optional[datetime] = None) -> datetime:
+    """Current time (or ``now``) expressed in the exchange time zone"""
+    if now is None:
+        return datetime.now(MARKET_TZ)
+    if now.tzinfo is None:
+        now = now.astimezone()
+    return now.astimezone(MARKET_TZ)
+
+
+def is_trading_day(now: Optional[datetime] = None) -> bool:
+    return market_now(now).weekday() < 5
+
+
+def is_market_open(now: Optional[datetime] = None) -> bool:
+    """True during the regular trading session"""
+    local = market_now(now)
+    return local.weekday() < 5 and MARKET_OPEN <= local.time() < MARKET_CLOSE
+
+
+def next_session_open(now: Optional[datetime] = None) -> datetime:
+    """Start of the next regular session strictly after ``now``"""
+    local = market_now(now)
+    candidate = local.replace(hour=MARKET_OPEN.hour, minute=MARKET_OPEN.minute, second=0, microsecond=0)
+    if candidate <= local:
+        candidate += timedelta(days=1)
+    while candidate.weekday() >= 5:
+        candidate += timedelta(days=1)
+    return candidate
+
+
+def seconds_until_next_open(now: Optional[datetime] = None) -> float:
+    local = market_now(now)
+    return max((next_session_open(local) - local).total_seconds(), 0.0)
+
+
+def last_completed_session(now: Optional[datetime] = None):
+    """Date of the most recent session whose daily bar is final"""
+    local = market_now(now)
+    day = local.date()
+    if local.weekday() >= 5 or local.time() < MARKET_CLOSE:
+        day -= timedelta(days=1)
+    while day.weekday() >= 5:
+        day -= timedelta(days=1)
+    return day
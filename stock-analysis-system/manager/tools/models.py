@@ -0,0 +1,231 @@
+"""
+Compact typed representations of the market data FMPTools returns.
+
+Upstream JSON is parsed into these once, when it is fetched, and the parsed
+form is what the response cache holds: daily bars become a ``PriceSeries``
+backed by a ``BAR_DTYPE`` structured array (six numbers per day instead of a
+dict of a dozen-plus fields), and quotes, price changes and news articles
+become ``__slots__`` objects. Tool functions convert them back to plain dicts
+with ``to_dict`` (or ``to_plain`` for nested results) before handing them to ADK.
+"""
+
+from typing import Any, Iterable, Optional
+
+import numpy as np
+
+from .price_store import BAR_DTYPE, bars_from_rows, rows_from_bars
+
+_EMPTY = np.empty(0, dtype=BAR_DTYPE)
+
+
+def _float(value) -> Optional[float]:
+    try:
+        return None if value is None else float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class PriceSeries:
+    """Daily OHLCV bars of one symbol, oldest first"""
+
+    __slots__ = ('symbol', 'bars')
+
+    def __init__(self, symbol: str, bars: Optional[np.ndarray] = None):
+        self.symbol = symbol
+        self.bars = _EMPTY if bars is None else bars
+
+    @classmethod
+    def from_rows(cls, symbol: str, rows: Iterable[dict]) -> "PriceSeries":
+        """Parse FMP ``historical`` rows (any order)"""
+        return cls(symbol, bars_from_rows(rows))
+
+    def __len__(self) -> int:
+        return len(self.bars)
+
+    def __getitem__(self, key):
+        # A field name returns that column; anything else selects bars
+        if isinstance(key, str):
+            return self.bars[key]
+        return PriceSeries(self.symbol, self.bars[key])
+
+    def __repr__(self) -> str:
+        if not len(self):
+            return f"PriceSeries({self.symbol!r}, empty)"
+        return f"PriceSeries({self.symbol!r}, {len(self)} bars {self.bars['date'][0]}..{self.bars['date'][-1]})"
+
+    @property
+    def dates(self) -> np.ndarray:
+        return self.bars['date']
+
+    @property
+    def closes(self) -> np.ndarray:
+        return self.bars['close']
+
+    @property
+    def latest_close(self) -> Optional[float]:
+        return float(self.bars['close'][-1]) if len(self) else None
+
+    @property
+    def latest_date(self) -> Optional[str]:
+        return str(self.bars['date'][-1]) if len(self) else None
+
+    def to_rows(self) -> list:
+        """FMP-style ``historical`` rows, newest first"""
+        return rows_from_bars(self.bars)
+
+    def to_dict(self) -> dict:
+        return {"symbol": self.symbol, "historical": self.to_rows()}
+
+
+class Quote:
+    """The fields of an FMP quote the tools use"""
+
+    __slots__ = ('symbol', 'name', 'price', 'change', 'change_percent', 'open', 'day_low', 'day_high',
+                 'previous_close', 'volume', 'timestamp')
+
+    def __init__(self, symbol: str, price: Optional[float], name: Optional[str] = None,
+                 change: Optional[float] = None, change_percent: Optional[float] = None,
+                 open: Optional[float] = None, day_low: Optional[float] = None, day_high: Optional[float] = None,
+                 previous_close: Optional[float] = None, volume: Optional[float] = None,
+                 timestamp: Optional[int] = None):
+        self.symbol = symbol
+        self.name = name
+        self.price = price
+        self.change = change
+        self.change_percent = change_percent
+        self.open = open
+        self.day_low = day_low
+        self.day_high = day_high
+        self.previous_close = previous_close
+        self.volume = volume
+        self.timestamp = timestamp
+
+    @classmethod
+    def from_fmp(cls, row: dict) -> "Quote":
+        return cls(
+            symbol=str(row.get('symbol', '')).upper(),
+            name=row.get('name'),
+            price=_float(row.get('price')),
+            change=_float(row.get('change')),
+            change_percent=_float(row.get('changesPercentage')),
+            open=_float(row.get('open')),
+            day_low=_float(row.get('dayLow')),
+            day_high=_float(row.get('dayHigh')),
+            previous_close=_float(row.get('previousClose')),
+            volume=_float(row.get('volume')),
+            timestamp=row.get('timestamp'),
+        )
+
+    def __repr__(self) -> str:
+        return f"Quote({self.symbol!r}, price={self.price})"
+
+    def to_dict(self) -> dict:
+        """FMP field names, so the dict reads like the upstream quote"""
+        return {
+            "symbol": self.symbol,
+            "name": self.name,
+            "price": self.price,
+            "change": self.change,
+            "changesPercentage": self.change_percent,
+            "open": self.open,
+            "dayLow": self.day_low,
+            "dayHigh": self.day_high,
+            "previousClose": self.previous_close,
+            "volume": self.volume,
+            "timestamp": self.timestamp,
+        }
+
+
+class PriceChange:
+    """Change of the closing price over one horizon"""
+
+    __slots__ = ('current_price', 'current_date', 'previous_price', 'previous_date', 'change',
+                 'change_percent', 'period_description')
+
+    def __init__(self, current_price: float, current_date: str, previous_price: float, previous_date: str,
+                 change: float, change_percent: float, period_description: str):
+        self.current_price = current_price
+        self.current_date = current_date
+        self.previous_price = previous_price
+        self.previous_date = previous_date
+        self.change = change
+        self.change_percent = change_percent
+        self.period_description = period_description
+
+    @property
+    def direction(self) -> str:
+        return "increased" if self.change > 0 else "decreased" if self.change < 0 else "remained flat"
+
+    def __repr__(self) -> str:
+        return f"PriceChange({self.previous_date} -> {self.current_date}: {self.change_percent:+.2f}%)"
+
+    def to_dict(self) -> dict:
+        return {
+            "current_price": self.current_price,
+            "current_date": self.current_date,
+            "previous_price": self.previous_price,
+            "previous_date": self.previous_date,
+            "change": self.change,
+            "change_percent": self.change_percent,
+            "direction": self.direction,
+            "period_description": self.period_description,
+        }
+
+
+class NewsItem:
+    """A news article as kept by the news store"""
+
+    __slots__ = ('id', 'title', 'text', 'published_date', 'url', 'source', 'image')
+
+    def __init__(self, title: str, text: str = '', published_date: str = '', url: str = '',
+                 source: str = '', image: str = '', id: str = ''):
+        self.id = id
+        self.title = title
+        self.text = text
+        self.published_date = published_date
+        self.url = url
+        self.source = source
+        self.image = image
+
+    @classmethod
+    def from_dict(cls, article: dict) -> "NewsItem":
+        """From a stored article (FMP stock_news fields; NewsAPI articles are stored the same way)"""
+        return cls(
+            id=article.get('id') or '',
+            title=article.get('title') or 'No title',
+            text=article.get('text') or '',
+            published_date=article.get('publishedDate') or '',
+            url=article.get('url') or '',
+            source=article.get('source') or article.get('site') or '',
+            image=article.get('image') or '',
+        )
+
+    @property
+    def key(self) -> str:
+        """Stable identity of the article (store id, else URL, else title)"""
+        return self.id or self.url or self.title
+
+    def __repr__(self) -> str:
+        return f"NewsItem({self.published_date!r}, {self.title!r})"
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "title": self.title,
+            "text": self.text,
+            "publishedDate": self.published_date,
+            "url": self.url,
+            "source": self.source,
+            "image": self.image,
+        }
+
+
+def to_plain(value: Any) -> Any:
+    """Recursively replace model objects in dicts/lists with their dicts (the ADK tool boundary)"""
+    if hasattr(value, 'to_dict'):
+        return value.to_dict()
+    if isinstance(value, dict):
+        return {key: to_plain(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [to_plain(item) for item in value]
+    return value
@@ -0,0 +1,203 @@
+"""
+Local per-ticker news store with deduplication.
+
+Articles from NewsAPI and FMP are merged into one JSON file per ticker
+(``<data dir>/news/<SYMBOL>.json``), newest first. An article is a duplicate when
+its normalized URL matches a stored one, or when its headline is nearly identical
+to a stored headline (the same wire story syndicated by several outlets).
+Upstreams are only asked for articles newer than the newest stored one, and not
+at all while the last check is younger than the news TTL. Publication times are
+stored in UTC, whatever time zone the provider reports them in.
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone, tzinfo
+from typing import List, Optional
+from urllib.parse import urlsplit
+
+from .storage import data_dir
+
+# Articles kept per ticker
+MAX_ARTICLES = 200
+
+# Articles older than this are not served by latest() unless asked for
+MAX_AGE = timedelta(days=float(os.getenv('STOCKBOT_NEWS_MAX_AGE_DAYS', '7')))
+
+# Tickers whose files are kept parsed in memory (least recently used are dropped)
+MAX_LOADED = int(os.getenv('STOCKBOT_NEWS_LOADED_TICKERS', '512'))
+
+# Headline token-set similarity above which two articles are the same story
+TITLE_SIMILARITY = 0.8
+
+_TITLE_WORD_RE = re.compile(r'[a-z0-9]+')
+# " - Reuters", " | Yahoo Finance" style source suffixes added by aggregators
+_TITLE_SOURCE_RE = re.compile(r'\s+[-|–—]\s+[^-|–—]{2,40}$')
+
+
+_DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+
+def normalize_date(value: Optional[str], tz: tzinfo = timezone.utc) -> str:
+    """
+    Normalize NewsAPI (ISO 8601) and FMP ('YYYY-MM-DD HH:MM:SS') dates to the
+    FMP form in UTC; times without an offset are taken to be in tz
+    """
+    if not value:
+        return ""
+    text = str(value).strip()
+    if text.endswith('Z'):
+        text = text[:-1] + '+00:00'
+    try:
+        parsed = datetime.fromisoformat(text)
+    except ValueError:
+        return ""
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=tz)
+    return parsed.astimezone(timezone.utc).strftime(_DATE_FORMAT)
+
+
+def url_key(url: str) -> str:
+    """Hash of a URL without scheme, query string, fragment or trailing slash"""
+    parts = urlsplit((url or "").strip().lower())
+    netloc = parts.netloc[4:] if parts.netloc.startswith('www.') else parts.netloc
+    normalized = f"{netloc}{parts.path.rstrip('/')}"
+    return hashlib.sha1(normalized.encode()).hexdigest() if normalized else ""
+
+
+def title_tokens(title: str) -> frozenset:
+    title = _TITLE_SOURCE_RE.sub('', title or '')
+    return frozenset(_TITLE_WORD_RE.findall(title.lower()))
+
+
+def content_key(article: dict) -> str:
+    """Hash of the normalized headline, used as the id of articles without a URL"""
+    return hashlib.sha1(' '.join(sorted(title_tokens(article.get('title', '')))).encode()).hexdigest()
+
+
+def _similar(a: frozenset, b: frozenset) -> bool:
+    if not a or not b:
+        return False
+    return len(a & b) / len(a | b) >= TITLE_SIMILARITY
+
+
+class NewsStore:
+    """Per-ticker article files under ``<data dir>/news``"""
+
+    def __init__(self, root: Optional[str] = None, max_loaded: int = MAX_LOADED):
+        self._root = root
+        self._lock = threading.Lock()
+        self.max_loaded = max_loaded
+        self._loaded: "OrderedDict[str, dict]" = OrderedDict()
+
+    @property
+    def root(self) -> str:
+        if self._root is None:
+            self._root = data_dir('news')
+        return self._root
+
+    def path(self, symbol: str) -> str:
+        return os.path.join(self.root, f"{symbol.upper()}.json")
+
+    def _load(self, symbol: str) -> dict:
+        symbol = symbol.upper()
+        path = self.path(symbol)
+        cached = self._loaded.get(symbol)
+        try:
+            mtime = os.path.getmtime(path)
+        except OSError:
+            if cached is None or cached.get("mtime") is not None:
+                cached = {"articles": [], "checked_at": 0.0, "mtime": None}
+            return self._remember(symbol, cached)
+        if cached is not None and cached.get("mtime") == mtime:
+            return self._remember(symbol, cached)
+        try:
+            with open(path) as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            state = {"articles": [], "checked_at": 0.0}
+        state["mtime"] = mtime
+        return self._remember(symbol, state)
+
+    def _remember(self, symbol: str, state: dict) -> dict:
+        self._loaded[symbol] = state
+        self._loaded.move_to_end(symbol)
+        while len(self._loaded) > self.max_loaded:
+            self._loaded.popitem(last=False)
+        return state
+
+    def _save(self, symbol: str, state: dict) -> None:
+        path = self.path(symbol)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, 'w') as f:
+            json.dump({"articles": state["articles"], "checked_at": state["checked_at"]}, f)
+        os.replace(tmp, path)
+        state["mtime"] = os.path.getmtime(path)
+
+    def latest(self, symbol: str, limit: int = 10, max_age: Optional[timedelta] = MAX_AGE) -> List[dict]:
+        """Newest stored articles published within max_age (None for any age)"""
+        with self._lock:
+            articles = self._load(symbol)["articles"]
+        if max_age is not None:
+            cutoff = (datetime.now(timezone.utc) - max_age).strftime(_DATE_FORMAT)
+            articles = [a for a in articles if a.get("publishedDate", "") >= cutoff]
+        return articles[:limit]
+
+    def newest_published(self, symbol: str) -> Optional[str]:
+        """publishedDate of the newest stored article ('YYYY-MM-DD HH:MM:SS', UTC)"""
+        with self._lock:
+            articles = self._load(symbol)["articles"]
+            return articles[0]["publishedDate"] if articles else None
+
+    def checked_since(self, symbol: str, seconds: float) -> bool:
+        """Whether upstreams were checked for this ticker within the last `seconds`"""
+        with self._lock:
+            return time.time() - self._load(symbol).get("checked_at", 0.0) < seconds
+
+    def merge(self, symbol: str, articles: List[dict], checked: bool = True, tz: tzinfo = timezone.utc) -> int:
+        """
+        Add new articles, skipping duplicates; returns how many were added
+
+        tz is the time zone of the provider's publication times when they carry
+        no offset. When checked is True the ticker is also marked as freshly
+        checked.
+        """
+        with self._lock:
+            state = self._load(symbol)
+            stored = state["articles"]
+            seen_ids = {a["id"] for a in stored}
+            seen_titles = [title_tokens(a.get("title", "")) for a in stored]
+            added = []
+            for article in articles:
+                article = dict(article)
+                article["publishedDate"] = normalize_date(article.get("publishedDate"), tz)
+                article["id"] = url_key(article.get("url", "")) or content_key(article)
+                tokens = title_tokens(article.get("title", ""))
+                if article["id"] in seen_ids or any(_similar(tokens, other) for other in seen_titles):
+                    continue
+                seen_ids.add(article["id"])
+                seen_titles.append(tokens)
+                added.append(article)
+            if added:
+                stored = sorted(stored + added, key=lambda a: a.get("publishedDate", ""), reverse=True)
+                state["articles"] = stored[:MAX_ARTICLES]
+            if checked:
+                state["checked_at"] = time.time()
+            if added or checked:
+                self._save(symbol, state)
+            return len(added)
+
+
+def since_param(published: Optional[str], fmt: str, tz: tzinfo = timezone.utc) -> Optional[str]:
+    """Format a stored publishedDate for an upstream 'from' parameter in the upstream's time zone"""
+    if not published:
+        return None
+    return datetime.strptime(published, _DATE_FORMAT).replace(tzinfo=timezone.utc).astimezone(tz).strftime(fmt)
+
+
+news_store = NewsStore()
@@ -0,0 +1,229 @@
+"""
+Append-only on-disk store of daily OHLCV bars, one file per symbol.
+
+Each file is a flat array of fixed-size ``BAR_DTYPE`` records sorted by date
+(oldest first). New bars are appended to the end; reads memory-map the file, so
+slicing the most recent N bars does not copy anything. Only bars of completed
+sessions are stored, because past daily bars never change.
+
+Writes take an exclusive ``flock`` on a per-symbol lock file (where the
+platform has ``fcntl``), so several worker processes can share the data dir.
+"""
+
+import os
+import threading
+from contextlib import contextmanager
+from typing import Iterable, Optional
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows: writes are only serialized within a process
+    fcntl = None
+
+from .storage import data_dir
+
+BAR_DTYPE = np.dtype([
+    ('date', 'datetime64[D]'),
+    ('open', 'f8'),
+    ('high', 'f8'),
+    ('low', 'f8'),
+    ('close', 'f8'),
+    ('volume', 'f8'),
+])
+
+_EMPTY = np.empty(0, dtype=BAR_DTYPE)
+
+
+def _number(value) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return float('nan')
+
+
+def bars_from_array(bars: np.ndarray) -> np.ndarray:
+    """Sort bars by date and drop duplicated dates (keeping the last one)"""
+    if len(bars) > 1:
+        bars = bars[np.argsort(bars['date'], kind='stable')]
+        keep = np.append(bars['date'][1:] != bars['date'][:-1], True)
+        bars = bars[keep]
+    return bars
+
+
+def bars_from_rows(rows: Iterable[dict]) -> np.ndarray:
+    """Convert FMP ``historical`` rows (any order) into a date-sorted bar array"""
+    records = [
+        (np.datetime64(str(row['date'])[:10], 'D'), _number(row.get('open')), _number(row.get('high')),
+         _number(row.get('low')), _number(row.get('close')), _number(row.get('volume')))
+        for row in rows if row.get('date')
+    ]
+    return bars_from_array(np.array(records, dtype=BAR_DTYPE))
+
+
+def bars_from_row_stream(rows: Iterable[dict], limit: Optional[int] = None,
+                         stop_at: Optional[np.datetime64] = None, block: int = 256) -> np.ndarray:
+    """
+    Fill a bar array from rows as they are parsed, newest first (as FMP sends them)
+
+    Rows are written into fixed-size blocks as they arrive and not kept, so
+    memory grows with the bars kept rather than the response. Reading stops
+    after `limit` bars or at the first row dated on or before `stop_at`.
+    """
+    blocks, current, filled = [], np.empty(block, dtype=BAR_DTYPE), 0
+    count = 0
+    for row in rows:
+        if not isinstance(row, dict) or not row.get('date'):
+            continue
+        day = np.datetime64(str(row['date'])[:10], 'D')
+        if stop_at is not None and day <= stop_at:
+            break
+        current[filled] = (day, _number(row.get('open')), _number(row.get('high')), _number(row.get('low')),
+                           _number(row.get('close')), _number(row.get('volume')))
+        filled += 1
+        count += 1
+        if filled == block:
+            blocks.append(current)
+            current, filled = np.empty(block, dtype=BAR_DTYPE), 0
+        if limit is not None and count >= limit:
+            break
+    blocks.append(current[:filled])
+    return bars_from_array(np.concatenate(blocks))
+
+
+def rows_from_bars(bars: np.ndarray) -> list:
+    """Convert a bar array into FMP-style ``historical`` rows, newest first"""
+    return [
+        {
+            'date': str(bar['date']),
+            'open': float(bar['open']),
+            'high': float(bar['high']),
+            'low': float(bar['low']),
+            'close': float(bar['close']),
+            'volume': float(bar['volume']),
+        }
+        for bar in bars[::-1]
+    ]
+
+
+class PriceStore:
+    """Per-symbol append-only bar files under ``<data dir>/prices``"""
+
+    def __init__(self, root: Optional[str] = None):
+        self._root = root
+        self._lock = threading.Lock()
+
+    @property
+    def root(self) -> str:
+        if self._root is None:
+            self._root = data_dir('prices')
+        return self._root
+
+    def path(self, symbol: str) -> str:
+        return os.path.join(self.root, f"{symbol.upper()}.bin")
+
+    def load(self, symbol: str) -> np.ndarray:
+        """All stored bars for a symbol as a read-only memory map (oldest first)"""
+        path = self.path(symbol)
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            return _EMPTY
+        count = size // BAR_DTYPE.itemsize
+        if count == 0:
+            return _EMPTY
+        # Ignore a partially written trailing record
+        return np.memmap(path, dtype=BAR_DTYPE, mode='r', shape=(count,))
+
+    def tail(self, symbol: str, n: int) -> np.ndarray:
+        """The most recent n stored bars, without copying"""
+        bars = self.load(symbol)
+        return bars[-n:] if n > 0 else bars[:0]
+
+    def last_date(self, symbol: str) -> Optional[np.datetime64]:
+        bars = self.load(symbol)
+        return bars['date'][-1] if len(bars) else None
+
+    @contextmanager
+    def _writing(self, symbol: str):
+        """Serialize writes to a symbol's file across threads and processes"""
+        with self._lock:
+            if fcntl is None:
+                yield
+                return
+            with open(f"{self.path(symbol)}.lock", 'a') as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def append(self, symbol: str, bars: np.ndarray) -> int:
+        """Append bars newer than the last stored date; returns how many were written"""
+        if not len(bars):
+            return 0
+        with self._writing(symbol):
+            return self._append(symbol, bars)
+
+    def _append(self, symbol: str, bars: np.ndarray) -> int:
+        last = self.last_date(symbol)
+        if last is not None:
+            bars = bars[bars['date'] > last]
+        if not len(bars):
+            return 0
+        path = self.path(symbol)
+        with open(path, 'ab') as f:
+            # Truncate a torn record left by an interrupted write before appending
+            f.truncate(os.path.getsize(path) // BAR_DTYPE.itemsize * BAR_DTYPE.itemsize)
+            f.write(np.ascontiguousarray(bars, dtype=BAR_DTYPE).tobytes())
+        return len(bars)
+
+    def replace(self, symbol: str, bars: np.ndarray) -> None:
+        """Atomically rewrite a symbol's file (used when backfilling older history)"""
+        with self._writing(symbol):
+            self._replace(symbol, bars)
+
+    def _replace(self, symbol: str, bars: np.ndarray) -> None:
+        path = self.path(symbol)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, 'wb') as f:
+            f.write(np.ascontiguousarray(bars, dtype=BAR_DTYPE).tobytes())
+        os.replace(tmp, path)
+
+    def merge(self, symbol: str, bars: np.ndarray) -> None:
+        """
+        Add bars that may be older and/or newer than what is stored
+
+        The stored bars must stay one contiguous run of sessions. When the new
+        bars do not touch the stored range (a recent window fetched for a symbol
+        whose stored history ended long ago), only the more recent run is kept.
+        """
+        if not len(bars):
+            return
+        with self._writing(symbol):
+            stored = self.load(symbol)
+            if not len(stored):
+                self._replace(symbol, bars)
+            elif bars['date'][0] > _next_session(stored['date'][-1]):
+                # Gap after the stored bars: appending would hide it from readers
+                self._replace(symbol, bars)
+            elif bars['date'][-1] < _previous_session(stored['date'][0]):
+                # Gap before the stored bars: the stored run is the more recent one
+                return
+            elif bars['date'][0] >= stored['date'][0]:
+                self._append(symbol, bars)
+            else:
+                self._replace(symbol, bars_from_array(np.concatenate([np.asarray(stored), bars])))
+
+
+def _next_session(day: np.datetime64) -> np.datetime64:
+    """Weekday after day (exchange holidays make a gap look one session longer, which is the safe side)"""
+    return np.busday_offset(day, 1, roll='forward')
+
+
+def _previous_session(day: np.datetime64) -> np.datetime64:
+    return np.busday_offset(day, -1, roll='backward')
+
+
+price_store = PriceStore()
@@ -0,0 +1,213 @@
+"""
+Quota-aware rate limiting for upstream APIs.
+
+Every upstream request takes a token from the buckets of its provider (e.g. the
+plan's requests per minute and per day) and of its endpoint, when one is
+configured. When a bucket is empty the request waits for a refill instead of
+failing, up to a priority-dependent limit. Waiters for an endpoint are served in
+priority order, and a waiter also lets through higher-priority waiters on the
+provider's other endpoints that only wait for the shared provider buckets, so
+interactive queries get capacity before background work such as prefetching and
+watchlist refreshes. An endpoint out of quota does not hold up the others.
+
+Quotas come from the environment:
+``STOCKBOT_RATE_<PROVIDER>_PER_MINUTE`` / ``_PER_DAY`` for a provider and
+``STOCKBOT_RATE_<PROVIDER>_<ENDPOINT>_PER_MINUTE`` / ``_PER_DAY`` for a single
+endpoint (endpoint upper-cased, '-' as '_'), e.g. ``STOCKBOT_RATE_FMP_PER_DAY=250``
+or ``STOCKBOT_RATE_FMP_HISTORICAL_PRICE_FULL_PER_MINUTE=60``. A value of 0 disables that limit.
+"""
+
+import contextvars
+import heapq
+import itertools
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional, Tuple
+
+# Request priorities, lower is served first
+INTERACTIVE = 0
+BACKGROUND = 1
+
+# Longest time a request of each priority waits for capacity before failing
+MAX_WAIT = {
+    INTERACTIVE: float(os.getenv('STOCKBOT_RATE_MAX_WAIT', '2')),
+    BACKGROUND: float(os.getenv('STOCKBOT_RATE_MAX_WAIT_BACKGROUND', '30')),
+}
+
+# Quotas used when the environment sets none (FMP Starter and NewsAPI Developer plans)
+DEFAULT_QUOTAS = {
+    ('fmp', None): {'per_minute': 300},
+    ('newsapi', None): {'per_day': 100},
+}
+
+request_priority: contextvars.ContextVar = contextvars.ContextVar('request_priority', default=INTERACTIVE)
+
+
+@contextmanager
+def priority(level: int):
+    """Run the enclosed upstream calls at the given priority"""
+    token = request_priority.set(level)
+    try:
+        yield
+    finally:
+        request_priority.reset(token)
+
+
+def in_context(fn: Callable) -> Callable:
+    """Bind fn to the caller's context (and so its priority) before handing it to worker threads"""
+    context = contextvars.copy_context()
+
+    def run(*args, **kwargs):
+        # A context can only be entered by one thread at a time, so each call gets its own copy
+        return context.copy().run(fn, *args, **kwargs)
+
+    return run
+
+
+class TokenBucket:
+    """Holds up to `capacity` tokens, refilled continuously over `period` seconds"""
+
+    def __init__(self, capacity: float, period: float, clock: Callable[[], float] = time.monotonic):
+        self.capacity = float(capacity)
+        self.rate = self.capacity / period
+        self.tokens = self.capacity
+        self._clock = clock
+        self._updated = clock()
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def wait_time(self) -> float:
+        """Seconds until a token is available"""
+        self._refill()
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+    def take(self) -> None:
+        self.tokens -= 1
+
+
+def _env_quota(provider: str, endpoint: Optional[str]) -> Dict[str, float]:
+    name = provider if endpoint is None else f"{provider}_{endpoint}"
+    prefix = 'STOCKBOT_RATE_' + name.upper().replace('-', '_').replace('/', '_')
+    quota = dict(DEFAULT_QUOTAS.get((provider, endpoint), {}))
+    for unit in ('per_minute', 'per_day'):
+        value = os.getenv(f"{prefix}_{unit.upper()}")
+        if value is not None:
+            quota[unit] = float(value)
+    return quota
+
+
+class RateLimiter:
+    """Token buckets per provider and endpoint with a priority queue per endpoint"""
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        self._clock = clock
+        self._cond = threading.Condition()
+        self._buckets: Dict[Tuple[str, Optional[str]], List[TokenBucket]] = {}
+        self._queues: Dict[Tuple[str, Optional[str]], list] = {}
+        self._seq = itertools.count()
+        self._stats: Dict[str, dict] = {}
+
+    def configure(self, provider: str, endpoint: Optional[str] = None,
+                  per_minute: Optional[float] = None, per_day: Optional[float] = None) -> None:
+        """Set the quotas of a provider (endpoint None) or of one of its endpoints"""
+        buckets = []
+        if per_minute:
+            buckets.append(TokenBucket(per_minute, 60, self._clock))
+        if per_day:
+            buckets.append(TokenBucket(per_day, 86400, self._clock))
+        with self._cond:
+            self._buckets[(provider, endpoint)] = buckets
+            self._cond.notify_all()
+
+    def _buckets_for(self, provider: str, endpoint: Optional[str]) -> List[TokenBucket]:
+        buckets = []
+        for key in ((provider, None), (provider, endpoint)) if endpoint else ((provider, None),):
+            if key not in self._buckets:
+                quota = _env_quota(*key)
+                self._buckets[key] = [TokenBucket(quota[unit], period, self._clock)
+                                      for unit, period in (('per_minute', 60), ('per_day', 86400))
+                                      if quota.get(unit)]
+            buckets.extend(self._buckets[key])
+        return buckets
+
+    def _outranked(self, provider: str, endpoint: Optional[str], level: int) -> bool:
+        """
+        Whether a higher-priority request on another endpoint of the provider
+        could go now but for the provider's own buckets
+        """
+        for (other_provider, other_endpoint), queue in self._queues.items():
+            if other_provider != provider or other_endpoint == endpoint or not queue or queue[0][0] >= level:
+                continue
+            self._buckets_for(provider, other_endpoint)
+            own = self._buckets[(provider, other_endpoint)] if other_endpoint else []
+            if max((b.wait_time() for b in own), default=0.0) <= 0:
+                return True
+        return False
+
+    def acquire(self, provider: str, endpoint: Optional[str] = None,
+                level: Optional[int] = None, max_wait: Optional[float] = None) -> bool:
+        """
+        Take a token for one request, waiting for capacity if needed
+
+        Returns False when no token becomes available within max_wait (by
+        default MAX_WAIT for the request's priority); the caller should then
+        report the provider as rate limited rather than send the request.
+        """
+        level = request_priority.get() if level is None else level
+        if max_wait is None:
+            max_wait = MAX_WAIT.get(level, MAX_WAIT[BACKGROUND])
+        start = self._clock()
+        deadline = start + max_wait
+        with self._cond:
+            stats = self._stats.setdefault(provider, {"granted": 0, "waited": 0, "rejected": 0, "wait_seconds": 0.0})
+            entry = (level, next(self._seq))
+            queue = self._queues.setdefault((provider, endpoint), [])
+            heapq.heappush(queue, entry)
+            waited = False
+            try:
+                while True:
+                    now = self._clock()
+                    if queue[0] == entry and not self._outranked(provider, endpoint, level):
+                        buckets = self._buckets_for(provider, endpoint)
+                        wait = max((b.wait_time() for b in buckets), default=0.0)
+                        if wait <= 0:
+                            for bucket in buckets:
+                                bucket.take()
+                            stats["granted"] += 1
+                            if waited:
+                                stats["waited"] += 1
+                                stats["wait_seconds"] += now - start
+                            return True
+                        if now + wait > deadline:
+                            stats["rejected"] += 1
+                            return False
+                        waited = True
+                        self._cond.wait(wait)
+                    else:
+                        if now >= deadline:
+                            stats["rejected"] += 1
+                            return False
+                        waited = True
+                        self._cond.wait(deadline - now)
+            finally:
+                queue.remove(entry)
+                heapq.heapify(queue)
+                if not queue:
+                    self._queues.pop((provider, endpoint), None)
+                self._cond.notify_all()
+
+    def stats(self) -> Dict[str, dict]:
+        with self._cond:
+            queued: Dict[str, int] = {}
+            for (provider, _), queue in self._queues.items():
+                queued[provider] = queued.get(provider, 0) + len(queue)
+            return {provider: dict(stats, queued=queued.get(provider, 0)) for provider, stats in self._stats.items()}
+
+
+# Shared by every upstream call in the process
+rate_limiter = RateLimiter()
@@ -0,0 +1,139 @@
+"""
+Shared HTTP transport for all upstream API calls (FMP and NewsAPI).
+
+A single pooled ``requests.Session`` is created lazily per process and reused by
+every ``FMPTools`` instance, so tool calls keep TCP/TLS connections alive instead
+of opening a new one for each request.
+
+The adapter only retries failed connects, which never reach the upstream.
+Requests that did reach it (5xx responses, read timeouts) are retried by
+``get_with_retries``, which takes a rate-limit token for every attempt, so
+retries during an outage are counted against the quota like any other call.
+"""
+
+import os
+import random
+import threading
+import time
+from typing import Callable, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# (connect, read) timeouts in seconds
+CONNECT_TIMEOUT = float(os.getenv('STOCKBOT_HTTP_CONNECT_TIMEOUT', '3.05'))
+READ_TIMEOUT = float(os.getenv('STOCKBOT_HTTP_READ_TIMEOUT', '10'))
+DEFAULT_TIMEOUT: Tuple[float, float] = (CONNECT_TIMEOUT, READ_TIMEOUT)
+
+# Connection pool sizing: number of hosts kept and connections per host
+POOL_CONNECTIONS = int(os.getenv('STOCKBOT_HTTP_POOL_HOSTS', '4'))
+POOL_MAXSIZE = int(os.getenv('STOCKBOT_HTTP_POOL_MAXSIZE', '20'))
+
+# Retry policy for transient upstream failures
+MAX_RETRIES = int(os.getenv('STOCKBOT_HTTP_MAX_RETRIES', '3'))
+BACKOFF_FACTOR = 0.5
+BACKOFF_JITTER = 0.25
+# Not 429: retrying would only spend more of an exhausted quota
+RETRY_STATUSES = (500, 502, 503, 504)
+
+USER_AGENT = 'StockBot/1.0'
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+
+def _build_retry() -> Retry:
+    """Retry failed connects with jittered backoff; anything that reached the upstream is left to get_with_retries"""
+    return Retry(
+        total=MAX_RETRIES,
+        connect=MAX_RETRIES,
+        read=0,
+        status=0,
+        other=0,
+        backoff_factor=BACKOFF_FACTOR,
+        backoff_jitter=BACKOFF_JITTER,
+        allowed_methods=frozenset(['GET']),
+        raise_on_status=False,
+    )
+
+
+def _build_session() -> requests.Session:
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=POOL_CONNECTIONS,
+        pool_maxsize=POOL_MAXSIZE,
+        # Block instead of opening throwaway connections once a host's pool is full
+        pool_block=True,
+        max_retries=_build_retry(),
+    )
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    session.headers.update({'User-Agent': USER_AGENT, 'Accept': 'application/json'})
+    return session
+
+
+def get_session() -> requests.Session:
+    """Return the process-wide pooled session, creating it on first use"""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = _build_session()
+    return _session
+
+
+def http_get(url: str, params: Optional[dict] = None, timeout: Optional[Tuple[float, float]] = None,
+             **kwargs) -> requests.Response:
+    """GET through the shared session with the default connect/read timeouts"""
+    return get_session().get(url, params=params, timeout=timeout or DEFAULT_TIMEOUT, **kwargs)
+
+
+def _retry_delay(attempt: int, response: Optional[requests.Response]) -> float:
+    """Backoff before retry number attempt (from 1), or the upstream's Retry-After when longer"""
+    delay = BACKOFF_FACTOR * 2 ** (attempt - 1) + random.uniform(0, BACKOFF_JITTER)
+    retry_after = response.headers.get('Retry-After') if response is not None else None
+    if retry_after and retry_after.isdigit():
+        delay = max(delay, float(retry_after))
+    return delay
+
+
+def get_with_retries(url: str, params: Optional[dict] = None, acquire: Callable[[], bool] = lambda: True,
+                     timeout: Optional[Tuple[float, float]] = None, sleep: Callable[[float], None] = time.sleep,
+                     **kwargs) -> requests.Response:
+    """
+    http_get, retrying 5xx responses and read timeouts up to MAX_RETRIES times
+
+    The caller has taken the first attempt's rate-limit token; every retry
+    takes its own with acquire() after the backoff. When acquire() refuses,
+    the last response is returned (or its error raised) without retrying.
+    """
+    attempt = 0
+    while True:
+        response, error = None, None
+        try:
+            response = http_get(url, params=params, timeout=timeout, **kwargs)
+            if response.status_code not in RETRY_STATUSES:
+                return response
+        except requests.ReadTimeout as e:
+            error = e
+        attempt += 1
+        if attempt > MAX_RETRIES:
+            break
+        sleep(_retry_delay(attempt, response))
+        if not acquire():
+            break
+        if response is not None:
+            response.close()
+    if error is not None:
+        raise error
+    return response
+
+
+def close_session() -> None:
+    """Close pooled connections (e.g. on worker shutdown or after fork)"""
+    global _session
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+            _session = None
@@ -0,0 +1,227 @@
+"""
+Cross-process response cache on SQLite.
+
+When several worker processes serve queries (e.g. behind a load balancer), each
+keeps its own in-process ``response_cache``. This store sits underneath it: every
+entry written to the in-process cache is also written to one SQLite file in WAL
+mode, and an in-process miss is looked up there before going upstream. A quote,
+search or news page fetched by one worker is then reused by all of them, and
+survives restarts.
+
+Rows carry their expiry and the end of their stale period as wall-clock times
+(processes do not share a monotonic clock). Once the file grows past
+``max_bytes``, rows whose stale period ends soonest are evicted first. Values
+are pickled, so the file must only be writable by the workers themselves.
+
+Enable it with ``STOCKBOT_SHARED_CACHE=1`` (``<data dir>/cache/responses.sqlite3``)
+or ``STOCKBOT_SHARED_CACHE=/path/to/file.sqlite3``.
+"""
+
+import json
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from typing import Any, Hashable, Optional, Tuple
+
+from .storage import data_dir
+from .telemetry import get_logger
+
+logger = get_logger('shared_cache')
+
+# Size of the stored values above which rows are evicted
+SHARED_CACHE_MAX_BYTES = int(float(os.getenv('STOCKBOT_SHARED_CACHE_MB', '256')) * 1024 * 1024)
+# Seconds a writer waits for a lock held by another process
+BUSY_TIMEOUT = float(os.getenv('STOCKBOT_SHARED_CACHE_BUSY_TIMEOUT', '2'))
+# Check the size of the file every this many writes of a process
+_EVICT_EVERY = 256
+# Eviction brings the size down to this share of max_bytes, so it does not run on every write
+_EVICT_TO = 0.9
+_EVICT_BATCH = 64
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    value BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    expires_at REAL NOT NULL,
+    stale_until REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_stale_until ON entries (stale_until);
+"""
+
+
+def _key_text(key: Hashable) -> str:
+    """Stable text form of a make_key() tuple"""
+    return json.dumps(key, separators=(',', ':'), default=str)
+
+
+class SQLiteCache:
+    """TTL cache in a SQLite file shared by every process that opens it"""
+
+    def __init__(self, path: str, max_bytes: int = SHARED_CACHE_MAX_BYTES,
+                 clock=time.time):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._clock = clock
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._writes = 0
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.sets = 0
+        self.evictions = 0
+        self.errors = 0
+        self._connect()  # create the schema up front
+
+    def _connect(self) -> sqlite3.Connection:
+        """This thread's connection (connections cannot cross threads or a fork)"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None and self._local.pid == os.getpid():
+            return conn
+        conn = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT, isolation_level=None)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.executescript(_SCHEMA)
+        self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+    def _failed(self, action: str, error: Exception) -> None:
+        with self._lock:
+            self.errors += 1
+        logger.warning("Shared cache %s failed: %s", action, error)
+
+    def get(self, key: Hashable, stale: bool = True) -> Optional[Tuple[Any, float, float]]:
+        """
+        (value, seconds until it expires, seconds until its stale period ends)
+        for an entry still within its stale period, else None; the first number
+        is negative once the entry has expired. With stale=False expired entries
+        are misses, and their value is not even read.
+        """
+        now = self._clock()
+        # Rows out of range are filtered in SQLite, so their values are never read or unpickled
+        query = 'SELECT value, expires_at, stale_until FROM entries WHERE key = ? AND stale_until > ?'
+        if not stale:
+            query += ' AND expires_at > ?'
+        try:
+            row = self._connect().execute(query, (_key_text(key), now) + (() if stale else (now,))).fetchone()
+        except sqlite3.Error as e:
+            self._failed('read', e)
+            return None
+        if row is None:
+            with self._lock:
+                self.misses += 1
+            return None
+        try:
+            value = pickle.loads(row[0])
+        except Exception as e:
+            self._failed('decode', e)
+            self.delete(key)
+            return None
+        expired = row[1] <= now
+        with self._lock:
+            if expired:
+                self.stale_hits += 1
+            else:
+                self.hits += 1
+        return value, row[1] - now, row[2] - now
+
+    def set(self, key: Hashable, value: Any, ttl: float, stale_ttl: float = 0.0) -> None:
+        if ttl <= 0:
+            return
+        try:
+            blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception as e:
+            self._failed('encode', e)
+            return
+        now = self._clock()
+        try:
+            self._connect().execute(
+                'INSERT OR REPLACE INTO entries (key, value, size, expires_at, stale_until) VALUES (?, ?, ?, ?, ?)',
+                (_key_text(key), blob, len(blob), now + ttl, now + ttl + max(stale_ttl, 0.0)))
+        except sqlite3.Error as e:
+            self._failed('write', e)
+            return
+        with self._lock:
+            self.sets += 1
+            self._writes += 1
+            evict = self._writes % _EVICT_EVERY == 0
+        if evict:
+            self.evict()
+
+    def delete(self, key: Hashable) -> None:
+        try:
+            self._connect().execute('DELETE FROM entries WHERE key = ?', (_key_text(key),))
+        except sqlite3.Error as e:
+            self._failed('delete', e)
+
+    def clear(self) -> None:
+        try:
+            self._connect().execute('DELETE FROM entries')
+        except sqlite3.Error as e:
+            self._failed('clear', e)
+
+    def evict(self) -> int:
+        """Drop rows past their stale period, then the soonest-to-go rows while over max_bytes"""
+        removed = 0
+        try:
+            conn = self._connect()
+            removed += conn.execute('DELETE FROM entries WHERE stale_until <= ?', (self._clock(),)).rowcount
+            total = conn.execute('SELECT COALESCE(SUM(size), 0) FROM entries').fetchone()[0]
+            target = self.max_bytes * _EVICT_TO
+            if total > self.max_bytes:
+                while total > target:
+                    rows = conn.execute('SELECT key, size FROM entries ORDER BY stale_until LIMIT ?',
+                                        (_EVICT_BATCH,)).fetchall()
+                    victims = []
+                    for key, size in rows:
+                        if total <= target:
+                            break
+                        victims.append((key,))
+                        total -= size
+                    if not victims:
+                        break
+                    conn.executemany('DELETE FROM entries WHERE key = ?', victims)
+                    removed += len(victims)
+        except sqlite3.Error as e:
+            self._failed('eviction', e)
+        with self._lock:
+            self.evictions += removed
+        return removed
+
+    def stats(self) -> dict:
+        try:
+            entries, size = self._connect().execute(
+                'SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries').fetchone()
+        except sqlite3.Error:
+            entries, size = -1, -1
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": entries,
+                "bytes": size,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "stale_hits": self.stale_hits,
+                "misses": self.misses,
+                "sets": self.sets,
+                "evictions": self.evictions,
+                "errors": self.errors,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+def open_shared_cache() -> Optional[SQLiteCache]:
+    """The cache configured by STOCKBOT_SHARED_CACHE, or None when it is not enabled"""
+    setting = os.getenv('STOCKBOT_SHARED_CACHE', '').strip()
+    if setting.lower() in ('', '0', 'false', 'no'):
+        return None
+    if setting.lower() in ('1', 'true', 'yes'):
+        setting = os.path.join(data_dir('cache'), 'responses.sqlite3')
+    try:
+        return SQLiteCache(setting)
+    except (sqlite3.Error, OSError) as e:
+        logger.warning("Shared cache at %s unavailable, using the in-process cache only: %s", setting, e)
+        return None
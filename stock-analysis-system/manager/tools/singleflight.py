@@ -0,0 +1,85 @@
+"""
+Request coalescing ("single flight") for upstream fetches.
+
+While a call for a key is in flight, callers asking for the same key wait for
+it and share its result instead of sending their own request. Calls may carry
+a ``size`` (e.g. number of history bars): a request can also join an in-flight
+call for the same key whose size covers it, and slice what it needs from the
+shared result.
+"""
+
+import threading
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+
+class _Call:
+    __slots__ = ('done', 'size', 'result', 'error')
+
+    def __init__(self, size: Optional[int]):
+        self.done = threading.Event()
+        self.size = size
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """Deduplicates concurrent calls per key across threads"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, List[_Call]] = {}
+        self.executed = 0
+        self.shared = 0
+
+    def do(self, key: Hashable, fn: Callable[[], Any], size: Optional[int] = None) -> Tuple[Any, bool]:
+        """
+        Run fn for key unless an equivalent call is already in flight
+
+        Returns:
+            (result, shared) where shared is True when the result came from
+            another caller's in-flight call (whose size may exceed ``size``)
+        """
+        with self._lock:
+            for call in self._calls.get(key, ()):
+                if size is None or (call.size is not None and call.size >= size):
+                    self.shared += 1
+                    break
+            else:
+                call = None
+            if call is None:
+                leader = _Call(size)
+                self._calls.setdefault(key, []).append(leader)
+                self.executed += 1
+
+        if call is not None:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            leader.result = fn()
+            return leader.result, False
+        except BaseException as e:
+            leader.error = e
+            raise
+        finally:
+            with self._lock:
+                calls = self._calls.get(key)
+                if calls is not None:
+                    calls.remove(leader)
+                    if not calls:
+                        del self._calls[key]
+            leader.done.set()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "in_flight": sum(len(calls) for calls in self._calls.values()),
+                "executed": self.executed,
+                "shared": self.shared,
+            }
+
+
+# Shared by every FMPTools instance in the process
+upstream_flights = SingleFlight()
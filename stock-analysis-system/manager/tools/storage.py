@@ -0,0 +1,16 @@
+"""
+Location of StockBot's local on-disk data (price history and other stores).
+
+Defaults to ``~/.stockbot``; set STOCKBOT_DATA_DIR to move it, e.g. onto a
+volume shared by all workers on a host.
+"""
+
+import os
+
+
+def data_dir(*parts: str) -> str:
+    """Directory under the data root, created if it does not exist yet"""
+    root = os.getenv('STOCKBOT_DATA_DIR') or os.path.join(os.path.expanduser('~'), '.stockbot')
+    path = os.path.join(root, *parts)
+    os.makedirs(path, exist_ok=True)
+    return path
@@ -0,0 +1,303 @@
+"""
+Offline symbol directory for resolving tickers from free text.
+
+Company names, aliases and tickers are compiled into a word-level Aho-Corasick
+automaton, so every name mentioned in a query is found in one pass over its
+words with no network calls. The listing is refreshed from FMP's symbol list
+and cached on disk (``<data dir>/symbols/directory.json``); until a listing is
+available, only the built-in aliases are known.
+"""
+
+import json
+import os
+import re
+import threading
+import time
+from collections import deque
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from .rate_limit import BACKGROUND, priority
+from .storage import data_dir
+
+# Well-known names that should always resolve, whatever the listing says
+BUILTIN_ALIASES = {
+    'tesla': 'TSLA',
+    'apple': 'AAPL',
+    'microsoft': 'MSFT',
+    'google': 'GOOGL',
+    'alphabet': 'GOOGL',
+    'amazon': 'AMZN',
+    'meta': 'META',
+    'facebook': 'META',
+    'nvidia': 'NVDA',
+    'palantir': 'PLTR',
+    'netflix': 'NFLX',
+    'spotify': 'SPOT',
+    'uber': 'UBER',
+    'lyft': 'LYFT',
+    'airbnb': 'ABNB',
+}
+
+# Listings outside these exchanges are skipped to keep the index small
+EXCHANGES = ('NASDAQ', 'NYSE', 'AMEX', 'NYSEARCA', 'BATS')
+
+REFRESH_DAYS = float(os.getenv('STOCKBOT_SYMBOL_REFRESH_DAYS', '7'))
+
+_WORD_RE = re.compile(r'[a-z0-9]+|&')
+_TICKER_RE = re.compile(r'(?<![\w$])([A-Z]{2,5}(?:\.[A-Z])?)\b')
+_CASHTAG_RE = re.compile(r'(?<![\w$])\$([A-Za-z]{1,5}(?:\.[A-Za-z])?)\b')
+
+# Trailing words of listed names that people leave out when they talk about a company
+_NAME_SUFFIXES = {
+    'inc', 'incorporated', 'corp', 'corporation', 'co', 'company', 'ltd', 'limited', 'plc',
+    'holdings', 'holding', 'group', 'sa', 'ag', 'nv', 'se', 'lp', 'llc', 'the', 'class',
+    'a', 'b', 'c', 'common', 'stock', 'shares', 'ordinary', 'adr', 'ads', 'new',
+}
+
+# Single words that are company names but mostly appear as plain English in queries
+_AMBIGUOUS_NAMES = {
+    'stock', 'price', 'market', 'today', 'news', 'target', 'block', 'match', 'visa', 'now', 'best',
+    'first', 'global', 'united', 'american', 'general', 'national', 'energy', 'capital', 'trust',
+    'financial', 'technology', 'technologies', 'international', 'industries', 'why', 'what', 'how',
+    'week', 'month', 'year', 'up', 'down', 'gap', 'live', 'compass', 'open', 'fund', 'etf', 'america',
+}
+
+
+def _word_spans(text: str) -> List[Tuple[str, int]]:
+    return [('and' if m.group() == '&' else m.group(), m.start()) for m in _WORD_RE.finditer(text.lower())]
+
+
+def tokenize(text: str) -> List[str]:
+    return [word for word, _ in _word_spans(text)]
+
+
+def name_tokens(name: str) -> Tuple[str, ...]:
+    """Tokens of a listed company name with legal suffixes stripped"""
+    tokens = tokenize(name)
+    while tokens and tokens[-1] in _NAME_SUFFIXES:
+        tokens.pop()
+    while tokens and tokens[0] == 'the':
+        tokens.pop(0)
+    return tuple(tokens)
+
+
+class Match(NamedTuple):
+    symbol: str
+    start: int
+    end: int
+    method: str
+
+
+class _Automaton:
+    """Aho-Corasick automaton whose alphabet is words rather than characters"""
+
+    def __init__(self):
+        self.goto: List[Dict[str, int]] = [{}]
+        self.fail: List[int] = [0]
+        self.value: List[Optional[Tuple[int, str, str]]] = [None]
+        self.link: List[int] = [0]
+
+    def add(self, tokens: Tuple[str, ...], symbol: str, method: str) -> None:
+        node = 0
+        for token in tokens:
+            nxt = self.goto[node].get(token)
+            if nxt is None:
+                nxt = len(self.goto)
+                self.goto[node][token] = nxt
+                self.goto.append({})
+                self.fail.append(0)
+                self.value.append(None)
+                self.link.append(0)
+            node = nxt
+        # First registration wins: callers add patterns in priority order
+        if self.value[node] is None:
+            self.value[node] = (len(tokens), symbol, method)
+
+    def build(self) -> None:
+        queue = deque(self.goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for token, child in self.goto[node].items():
+                state = self.fail[node]
+                while state and token not in self.goto[state]:
+                    state = self.fail[state]
+                target = self.goto[state].get(token, 0)
+                self.fail[child] = target if target != child else 0
+                # Nearest proper suffix that is itself a pattern
+                fail = self.fail[child]
+                self.link[child] = fail if self.value[fail] is not None else self.link[fail]
+                queue.append(child)
+
+    def iter_matches(self, tokens: List[str]) -> Iterable[Tuple[int, int, str, str]]:
+        node = 0
+        for end, token in enumerate(tokens, 1):
+            while node and token not in self.goto[node]:
+                node = self.fail[node]
+            node = self.goto[node].get(token, 0)
+            hit = node if self.value[node] is not None else self.link[node]
+            while hit:
+                length, symbol, method = self.value[hit]
+                yield end - length, end, symbol, method
+                hit = self.link[hit]
+
+
+class SymbolDirectory:
+    """Name/alias/ticker index over a symbol listing"""
+
+    def __init__(self, listings: Optional[List[dict]] = None):
+        self.symbols = set(BUILTIN_ALIASES.values())
+        self.names: Dict[str, str] = {}
+        self.has_listing = bool(listings)
+        self._automaton = _Automaton()
+        for alias, symbol in BUILTIN_ALIASES.items():
+            self._automaton.add(tuple(tokenize(alias)), symbol, 'company_name_match')
+        for listing in sorted(listings or [], key=_listing_rank):
+            symbol = str(listing.get('symbol') or '').upper()
+            if not symbol:
+                continue
+            self.symbols.add(symbol)
+            name = listing.get('name') or ''
+            self.names.setdefault(symbol, name)
+            tokens = name_tokens(name)
+            if not tokens or (len(tokens) == 1 and (len(tokens[0]) < 4 or tokens[0] in _AMBIGUOUS_NAMES)):
+                continue
+            self._automaton.add(tokens, symbol, 'directory_match')
+        self._automaton.build()
+
+    def __len__(self) -> int:
+        return len(self.symbols)
+
+    def is_symbol(self, ticker: str) -> bool:
+        return ticker.upper() in self.symbols
+
+    def find_tickers(self, query: str) -> List[Match]:
+        """
+        Ticker mentions: cashtags in any case ($nvda) and 2-5 letter uppercase
+        words (NVDA), the latter validated against the listing when one is loaded
+        """
+        found = [Match(m.group(1).upper(), m.start(), m.end(), 'direct_match') for m in _CASHTAG_RE.finditer(query)]
+        for m in _TICKER_RE.finditer(query):
+            if self.has_listing and m.group(1) not in self.symbols:
+                continue
+            found.append(Match(m.group(1), m.start(), m.end(), 'direct_match'))
+        return sorted(found, key=lambda match: match.start)
+
+    def find_names(self, query: str) -> List[Match]:
+        """Company names and aliases in a query, leftmost-longest and non-overlapping"""
+        spans = _word_spans(query)
+        tokens = [word for word, _ in spans]
+        candidates = sorted(self._automaton.iter_matches(tokens), key=lambda m: (m[0], -(m[1] - m[0])))
+        matches, covered_to = [], 0
+        for start, end, symbol, method in candidates:
+            if start < covered_to:
+                continue
+            last_word, last_offset = spans[end - 1]
+            matches.append(Match(symbol, spans[start][1], last_offset + len(last_word), method))
+            covered_to = end
+        return matches
+
+    def resolve(self, query: str) -> List[Tuple[str, str]]:
+        """All (symbol, method) pairs mentioned in a query, in order of mention, without duplicates"""
+        resolved, seen = [], set()
+        for match in sorted(self.find_tickers(query) + self.find_names(query), key=lambda m: m.start):
+            if match.symbol not in seen:
+                seen.add(match.symbol)
+                resolved.append((match.symbol, match.method))
+        return resolved
+
+
+def _listing_rank(listing: dict) -> tuple:
+    """Prefer major-exchange common stock and shorter symbols when names collide"""
+    exchange = str(listing.get('exchangeShortName') or '').upper()
+    kind = str(listing.get('type') or 'stock').lower()
+    return (
+        EXCHANGES.index(exchange) if exchange in EXCHANGES else len(EXCHANGES),
+        kind != 'stock',
+        len(str(listing.get('symbol') or '')),
+    )
+
+
+def directory_path() -> str:
+    return os.path.join(data_dir('symbols'), 'directory.json')
+
+
+def load_listings(path: Optional[str] = None) -> List[dict]:
+    try:
+        with open(path or directory_path()) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return []
+
+
+def save_listings(listings: List[dict], path: Optional[str] = None) -> None:
+    path = path or directory_path()
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, 'w') as f:
+        json.dump(listings, f, separators=(',', ':'))
+    os.replace(tmp, path)
+
+
+def _filter_listings(listings: List[dict]) -> List[dict]:
+    keep = []
+    for listing in listings or []:
+        if not isinstance(listing, dict) or not listing.get('symbol'):
+            continue
+        if str(listing.get('exchangeShortName') or '').upper() not in EXCHANGES:
+            continue
+        keep.append({key: listing.get(key) for key in ('symbol', 'name', 'exchangeShortName', 'type')})
+    return keep
+
+
+_directory: Optional[SymbolDirectory] = None
+_directory_lock = threading.Lock()
+_refresh_started = False
+
+
+def get_symbol_directory() -> SymbolDirectory:
+    """The process-wide directory, loaded from disk on first use"""
+    global _directory
+    if _directory is None:
+        with _directory_lock:
+            if _directory is None:
+                _directory = SymbolDirectory(load_listings())
+                _maybe_refresh_in_background()
+    return _directory
+
+
+def refresh_symbol_directory(fmp_tools=None) -> dict:
+    """Download the symbol listing from FMP, store it on disk and rebuild the index"""
+    global _directory
+    if fmp_tools is None:
+        from .tools import FMPTools
+        fmp_tools = FMPTools()
+    result = fmp_tools.get_symbol_list()
+    if result["status"] == "error":
+        return result
+    listings = _filter_listings(result["data"])
+    if not listings:
+        return {"status": "error", "error": "Symbol list endpoint returned no usable listings"}
+    save_listings(listings)
+    directory = SymbolDirectory(listings)
+    with _directory_lock:
+        _directory = directory
+    return {"status": "success", "count": len(listings)}
+
+
+def _maybe_refresh_in_background() -> None:
+    """Refresh a missing or stale listing once per process, without blocking the caller"""
+    global _refresh_started
+    if _refresh_started or not os.getenv('FMP_API_KEY'):
+        return
+    try:
+        age_days = (time.time() - os.path.getmtime(directory_path())) / 86400
+    except OSError:
+        age_days = float('inf')
+    if age_days < REFRESH_DAYS:
+        return
+    _refresh_started = True
+    threading.Thread(target=_refresh_in_background, name='symbol-directory-refresh', daemon=True).start()
+
+
+def _refresh_in_background() -> None:
+    with priority(BACKGROUND):
+        refresh_symbol_directory()
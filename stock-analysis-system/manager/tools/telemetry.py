@@ -0,0 +1,393 @@
+"""
+Instrumentation for the agents, tool functions and upstream calls.
+
+Metrics are kept in-process and exported in the Prometheus text format, either
+with ``render_prometheus()`` or over HTTP (``/metrics``) when
+``STOCKBOT_METRICS_PORT`` is set:
+
+- ``stockbot_tool_duration_seconds{tool,status}``: tool function calls
+- ``stockbot_agent_duration_seconds{agent}``: agent invocations (hops)
+- ``stockbot_agent_tool_duration_seconds{agent,tool}``: tool calls made by an LLM agent
+- ``stockbot_upstream_duration_seconds{provider,endpoint,outcome}``: HTTP latency
+- ``stockbot_upstream_response_bytes{provider,endpoint}``: payload sizes
+- ``stockbot_cache_requests_total{kind,result}``: response cache hits and misses
+- gauges from registered collectors (cache, single-flight, rate limiter stats)
+
+Every span is also an OpenTelemetry span when the ``opentelemetry`` package is
+installed, so traces reach whatever exporter the OpenTelemetry SDK is set up with.
+"""
+
+import functools
+import inspect
+import logging
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+
+def get_logger(name: str) -> logging.Logger:
+    """Logger under the 'stockbot' namespace"""
+    return logging.getLogger(f"stockbot.{name}")
+
+
+def configure_logging() -> None:
+    """Basic logging setup at STOCKBOT_LOG_LEVEL (default INFO; DEBUG for per-call details)"""
+    logging.basicConfig(level=os.getenv('STOCKBOT_LOG_LEVEL', 'INFO').upper(),
+                        format='%(asctime)s - %(levelname)s - StockBot: %(message)s')
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    parts = [f'{k}="{_escape(v)}"' for k, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_value(value: float) -> str:
+    """Sample value at full precision (``:g`` would export 1234567 as 1.23457e+06)"""
+    value = float(value)
+    if math.isnan(value):
+        return "NaN"
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(value)
+
+
+class Counter:
+    def __init__(self, name: str, help: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values: Dict[tuple, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, help: str, labelnames: Iterable[str] = (), buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        # label values -> [per-bucket counts..., +Inf count, sum]
+        self._values: Dict[tuple, list] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[i] += 1
+            state[len(self.buckets)] += 1
+            state[-1] += value
+
+    def snapshot(self) -> Dict[tuple, dict]:
+        """Count and sum per label set"""
+        with self._lock:
+            return {key: {"count": state[len(self.buckets)], "sum": state[-1]} for key, state in self._values.items()}
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for key, state in sorted(self._values.items()):
+                bounds = [f"{bound:g}" for bound in self.buckets] + ["+Inf"]
+                for bound, count in zip(bounds, state):
+                    le = 'le="%s"' % bound
+                    lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {count}")
+                count = state[len(self.buckets)]
+                lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(state[-1])}")
+                lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """Named metrics plus collectors whose numeric stats are exported as gauges"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics: Dict[str, object] = {}
+        self._collectors: List[Tuple[str, Callable[[], dict], Optional[str]]] = []
+
+    def counter(self, name: str, help: str, labelnames: Iterable[str] = ()) -> Counter:
+        with self._lock:
+            return self._metrics.setdefault(name, Counter(name, help, labelnames))
+
+    def histogram(self, name: str, help: str, labelnames: Iterable[str] = (),
+                  buckets: Tuple[float, ...] = LATENCY_BUCKETS) -> Histogram:
+        with self._lock:
+            return self._metrics.setdefault(name, Histogram(name, help, labelnames, buckets))
+
+    def register_collector(self, prefix: str, collect: Callable[[], dict], label: Optional[str] = None) -> None:
+        """
+        Export collect()'s numbers as gauges named stockbot_<prefix>_<key>
+
+        When label is given, collect() returns {label value: {key: number}}.
+        """
+        with self._lock:
+            self._collectors.append((prefix, collect, label))
+
+    def _collector_lines(self, prefix: str, collect: Callable[[], dict], label: Optional[str]) -> List[str]:
+        try:
+            stats = collect()
+        except Exception as e:
+            get_logger('telemetry').warning("Metrics collector %s failed: %s", prefix, e)
+            return []
+        rows = stats.items() if label else [(None, stats)]
+        gauges: Dict[str, List[str]] = {}
+        for label_value, values in rows:
+            for key, value in values.items():
+                if isinstance(value, bool) or not isinstance(value, (int, float)):
+                    continue
+                labels = _format_labels((label,), (label_value,)) if label else ""
+                gauges.setdefault(f"stockbot_{prefix}_{key}", []).append(f"{labels} {_format_value(value)}")
+        lines = []
+        for name, samples in gauges.items():
+            lines.append(f"# TYPE {name} gauge")
+            lines.extend(f"{name}{sample}" for sample in samples)
+        return lines
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+            collectors = list(self._collectors)
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        for collector in collectors:
+            lines.extend(self._collector_lines(*collector))
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+TOOL_SECONDS = registry.histogram(
+    'stockbot_tool_duration_seconds', 'Tool function call latency', ('tool', 'status'))
+AGENT_SECONDS = registry.histogram(
+    'stockbot_agent_duration_seconds', 'Agent invocation latency', ('agent',))
+AGENT_TOOL_SECONDS = registry.histogram(
+    'stockbot_agent_tool_duration_seconds', 'Latency of tool calls made by LLM agents', ('agent', 'tool'))
+UPSTREAM_SECONDS = registry.histogram(
+    'stockbot_upstream_duration_seconds', 'Upstream HTTP request latency', ('provider', 'endpoint', 'outcome'))
+UPSTREAM_BYTES = registry.histogram(
+    'stockbot_upstream_response_bytes', 'Upstream response payload size', ('provider', 'endpoint'), SIZE_BUCKETS)
+CACHE_REQUESTS = registry.counter(
+    'stockbot_cache_requests_total', 'Response cache lookups', ('kind', 'result'))
+
+
+def render_prometheus() -> str:
+    return registry.render()
+
+
+_tracer = None
+_tracer_loaded = False
+
+
+def _get_tracer():
+    """OpenTelemetry tracer, imported on the first span (None when opentelemetry is not installed)"""
+    global _tracer, _tracer_loaded
+    if not _tracer_loaded:
+        try:
+            from opentelemetry import trace
+            _tracer = trace.get_tracer('stockbot')
+        except ImportError:  # tracing is optional
+            _tracer = None
+        _tracer_loaded = True
+    return _tracer
+
+
+class Span:
+    """A timed operation; set labels (e.g. status) on it before it ends"""
+
+    __slots__ = ('name', 'labels', 'start', 'duration', '_otel')
+
+    def __init__(self, name: str, labels: dict):
+        self.name = name
+        self.labels = labels
+        self.start = time.perf_counter()
+        self.duration = 0.0
+        self._otel = None
+
+    def set_attribute(self, key: str, value) -> None:
+        if self._otel is not None:
+            self._otel.set_attribute(f"stockbot.{key}", value)
+
+
+@contextmanager
+def span(name: str, histogram: Optional[Histogram] = None, **labels):
+    """Time the enclosed block, record it in histogram and mirror it as an OpenTelemetry span"""
+    current = Span(name, labels)
+    tracer = _get_tracer()
+    otel_context = tracer.start_as_current_span(name) if tracer is not None else None
+    if otel_context is not None:
+        current._otel = otel_context.__enter__()
+        for key, value in labels.items():
+            current.set_attribute(key, value)
+    error = None
+    try:
+        yield current
+    except BaseException as e:
+        error = e
+        current.labels.setdefault('status', 'exception')
+        raise
+    finally:
+        current.duration = time.perf_counter() - current.start
+        if histogram is not None:
+            histogram.observe(current.duration, **current.labels)
+        if otel_context is not None:
+            for key, value in current.labels.items():
+                current.set_attribute(key, value)
+            if error is not None:
+                otel_context.__exit__(type(error), error, error.__traceback__)
+            else:
+                otel_context.__exit__(None, None, None)
+
+
+def _result_status(result) -> str:
+    return str(result.get("status", "unknown")) if isinstance(result, dict) else "success"
+
+
+def traced_tool(fn: Callable) -> Callable:
+    """
+    Record every call of a tool function (sync or async) under its name
+
+    The wrapper keeps the function's name, docstring and signature, so agents
+    build the same tool declaration from it.
+    """
+    name = fn.__name__
+    if inspect.iscoroutinefunction(fn):
+        @functools.wraps(fn)
+        async def async_wrapper(*args, **kwargs):
+            with span(f"tool {name}", TOOL_SECONDS, tool=name) as current:
+                result = await fn(*args, **kwargs)
+                current.labels['status'] = _result_status(result)
+                return result
+        return async_wrapper
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        with span(f"tool {name}", TOOL_SECONDS, tool=name) as current:
+            result = fn(*args, **kwargs)
+            current.labels['status'] = _result_status(result)
+            return result
+    return wrapper
+
+
+# Agent hops, timed from ADK before/after callbacks
+
+_MAX_OPEN_HOPS = 10000
+_hop_starts: Dict[tuple, float] = {}
+_hop_lock = threading.Lock()
+
+
+def _hop_start(key: tuple) -> None:
+    with _hop_lock:
+        if len(_hop_starts) >= _MAX_OPEN_HOPS:
+            # after-callbacks that never ran (cancelled invocations)
+            _hop_starts.clear()
+        _hop_starts[key] = time.perf_counter()
+
+
+def _hop_duration(key: tuple) -> Optional[float]:
+    with _hop_lock:
+        start = _hop_starts.pop(key, None)
+    return None if start is None else time.perf_counter() - start
+
+
+def _before_agent(callback_context):
+    _hop_start(('agent', callback_context.invocation_id, callback_context.agent_name))
+    return None
+
+
+def _after_agent(callback_context):
+    duration = _hop_duration(('agent', callback_context.invocation_id, callback_context.agent_name))
+    if duration is not None:
+        AGENT_SECONDS.observe(duration, agent=callback_context.agent_name)
+        get_logger('agents').debug("Agent %s finished in %.3fs", callback_context.agent_name, duration)
+    return None
+
+
+def _tool_key(tool, tool_context) -> tuple:
+    return ('tool', tool_context.invocation_id, getattr(tool_context, 'function_call_id', None) or tool.name)
+
+
+def _before_tool(tool, args, tool_context):
+    _hop_start(_tool_key(tool, tool_context))
+    return None
+
+
+def _after_tool(tool, args, tool_context, tool_response):
+    duration = _hop_duration(_tool_key(tool, tool_context))
+    if duration is not None:
+        AGENT_TOOL_SECONDS.observe(duration, agent=tool_context.agent_name, tool=tool.name)
+    return None
+
+
+def agent_callbacks(llm: bool = True) -> dict:
+    """Keyword arguments that time an agent's invocations (and, for LLM agents, its tool calls)"""
+    callbacks = {"before_agent_callback": _before_agent, "after_agent_callback": _after_agent}
+    if llm:
+        callbacks.update(before_tool_callback=_before_tool, after_tool_callback=_after_tool)
+    return callbacks
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        if self.path.split('?')[0] not in ('/', '/metrics'):
+            self.send_response(404)
+            self.end_headers()
+            return
+        payload = render_prometheus().encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+_metrics_server: Optional[ThreadingHTTPServer] = None
+
+
+def start_metrics_server(port: Optional[int] = None, host: str = '127.0.0.1') -> Optional[ThreadingHTTPServer]:
+    """Serve /metrics on port (default STOCKBOT_METRICS_PORT; not started when neither is set)"""
+    global _metrics_server
+    if _metrics_server is not None:
+        return _metrics_server
+    if port is None:
+        port = int(os.getenv('STOCKBOT_METRICS_PORT', '0') or 0)
+        if not port:
+            return None
+    host = os.getenv('STOCKBOT_METRICS_HOST', host)
+    _metrics_server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    _metrics_server.daemon_threads = True
+    threading.Thread(target=_metrics_server.serve_forever, name='metrics-server', daemon=True).start()
+    get_logger('telemetry').info("Serving metrics on http://%s:%d/metrics", host, port)
+    return _metrics_server
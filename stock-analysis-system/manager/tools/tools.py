@@ -1,83 +1,602 @@
-import requests
 import os
-from typing import Dict, List, Optional
-from datetime import datetime, timedelta
-import json
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional
+from datetime import datetime, timedelta, timezone
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from .cache import make_key, response_cache, staleness, ttl_for
+from .circuit import circuit_breakers, is_upstream_failure
+from .hedge import ProviderStats, hedged_call
+from .json_stream import CHUNK_SIZE, iter_array
+from .news_store import news_store, since_param
+from .market_hours import MARKET_TZ, is_market_open, last_completed_session
+from .models import NewsItem, PriceSeries, Quote
+from .price_store import BAR_DTYPE, bars_from_row_stream, price_store
+from .rate_limit import BACKGROUND, in_context, priority, rate_limiter
+from .session import POOL_MAXSIZE, get_with_retries
+from .singleflight import upstream_flights
+from .telemetry import CACHE_REQUESTS, UPSTREAM_BYTES, UPSTREAM_SECONDS, get_logger, registry, span
+
+# Symbols per upstream request for the comma-separated batch endpoints
+QUOTE_BATCH_SIZE = 50
+HISTORY_BATCH_SIZE = 5
+
+# Upstream base URLs, overridable to point at a proxy or the offline benchmark stub
+FMP_BASE_URL = os.getenv('FMP_BASE_URL', 'https://financialmodelingprep.com/api/v3')
+NEWS_API_BASE_URL = os.getenv('NEWS_API_BASE_URL', 'https://newsapi.org/v2')
+
+# Unread bytes left after a streamed parse that are still read so the connection
+# can be reused; a longer remainder is dropped together with the connection
+STREAM_DRAIN_LIMIT = 64 * 1024
+
+# Start FMP news when NewsAPI has not answered within this many seconds,
+# and give up on both after the deadline
+NEWS_HEDGE_DELAY = float(os.getenv('STOCKBOT_NEWS_HEDGE_DELAY', '0.3'))
+NEWS_DEADLINE = float(os.getenv('STOCKBOT_NEWS_DEADLINE', '8'))
+# Time zone of each news provider's publication times (NewsAPI's carry a Z, FMP's are US/Eastern)
+NEWS_TIMEZONES = {"newsapi": timezone.utc, "fmp": MARKET_TZ}
+
+# Latency and win counts of the news providers
+news_provider_stats = ProviderStats()
+
+logger = get_logger('tools')
+
+registry.register_collector('response_cache', response_cache.stats)
+registry.register_collector('upstream_flights', upstream_flights.stats)
+registry.register_collector('rate_limit', rate_limiter.stats, label='provider')
+registry.register_collector('news_provider', news_provider_stats.snapshot, label='provider')
+registry.register_collector('circuit_breaker', circuit_breakers.stats, label='endpoint')
+if response_cache.backing is not None:
+    registry.register_collector('shared_cache', response_cache.backing.stats)
+
+# Worker threads of the hedged news provider calls
+NEWS_WORKERS = int(os.getenv('STOCKBOT_NEWS_WORKERS', '8'))
+# Worker threads of the background refreshes
+REFRESH_WORKERS = int(os.getenv('STOCKBOT_REFRESH_WORKERS', '4'))
+
+# One pool per kind of task: a task that waits on tasks of another pool never
+# waits behind itself, e.g. a background refresh on the tasks it fans out
+_executors: Dict[str, ThreadPoolExecutor] = {}
+_executors_lock = threading.Lock()
+
+def _get_executor(name: str, max_workers: int) -> ThreadPoolExecutor:
+    executor = _executors.get(name)
+    if executor is None:
+        with _executors_lock:
+            executor = _executors.get(name)
+            if executor is None:
+                executor = _executors[name] = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+    return executor
+
+def _get_batch_executor() -> ThreadPoolExecutor:
+    """Blocking chunk fetches of the batch methods"""
+    return _get_executor('fmp-batch', POOL_MAXSIZE)
+
+# First bar of symbols whose full upstream history is stored (listed for fewer sessions than asked for)
+_listing_starts: Dict[str, np.datetime64] = {}
+
+# Keys of the background refreshes queued or running
+_revalidating = set()
+_revalidating_lock = threading.Lock()
+
+def _revalidate(key, refresh: Callable[[], Any]) -> None:
+    """Run refresh in the background at background priority, once per key at a time"""
+    with _revalidating_lock:
+        if key in _revalidating:
+            return
+        _revalidating.add(key)
+    
+    def run():
+        try:
+            with priority(BACKGROUND):
+                refresh()
+        except Exception as e:
+            logger.warning("Background refresh of %s failed: %s", key, e)
+        finally:
+            with _revalidating_lock:
+                _revalidating.discard(key)
+    
+    _get_executor('refresh', REFRESH_WORKERS).submit(run)
+
+def _stale_result(cache_key, cache_kind: str) -> Optional[dict]:
+    """The last known good value of a cache entry past its TTL, marked stale (None if there is none)"""
+    entry = response_cache.get_stale(cache_key)
+    if entry is None:
+        return None
+    value, age = entry
+    CACHE_REQUESTS.inc(kind=cache_kind, result="stale")
+    return {"status": "success", "data": value, "stale": True, "stale_seconds": round(age, 1)}
+
+def _fill_stale(symbols: List[str], data: dict, errors: dict, key_for: Callable[[str], Any],
+                unwrap: Callable[[Any], Any] = lambda value: value) -> List[str]:
+    """Move failed symbols that have a stale cache entry from errors into data; returns them"""
+    stale = []
+    for symbol in symbols:
+        if symbol not in errors:
+            continue
+        entry = response_cache.get_stale(key_for(symbol))
+        if entry is not None:
+            data[symbol] = unwrap(entry[0])
+            del errors[symbol]
+            stale.append(symbol)
+    return stale
+
+def _normalize_symbols(symbols: List[str]) -> List[str]:
+    """Upper-case, strip and de-duplicate symbols, keeping their order"""
+    seen = []
+    for symbol in symbols:
+        symbol = symbol.strip().upper()
+        if symbol and symbol not in seen:
+            seen.append(symbol)
+    return seen
+
+def _news_articles(result: dict) -> List[dict]:
+    """Article dicts of a successful provider result"""
+    data = result.get("data")
+    return [a for a in data if isinstance(a, dict)] if isinstance(data, list) else []
+
+class _HistoryStream(NamedTuple):
+    """
+    Streaming parser of a single-symbol historical-price-full body
+    
+    Rows go straight from the socket into the bar array; reading stops after
+    `limit` bars or at the first bar on or before `stop_at` (rows arrive
+    newest first).
+    """
+    symbol: str
+    limit: Optional[int] = None
+    stop_at: Optional[np.datetime64] = None
+    
+    def __call__(self, chunks: Iterable[bytes]) -> PriceSeries:
+        rows = iter_array(chunks, "historical")
+        try:
+            return PriceSeries(self.symbol, bars_from_row_stream(rows, self.limit, self.stop_at))
+        finally:
+            rows.close()
+
+def _parse_history_bulk(data) -> Dict[str, PriceSeries]:
+    """Parse a (possibly comma-separated) historical-price-full response into symbol -> series"""
+    # A single symbol comes back unwrapped, several under historicalStockList
+    entries = data.get("historicalStockList", [data]) if isinstance(data, dict) else []
+    return {
+        str(e.get("symbol", "")).upper(): PriceSeries.from_rows(str(e.get("symbol", "")).upper(), e["historical"])
+        for e in entries if isinstance(e, dict) and e.get("historical")
+    }
+
+def _parse_quotes(data) -> List[Quote]:
+    """Parse a (possibly comma-separated) quote response"""
+    return [Quote.from_fmp(q) for q in (data or []) if isinstance(q, dict)]
+
+def _read_stream(response, parse: Callable[[Iterable[bytes]], Any], endpoint: str) -> Any:
+    """Feed a streamed response body to parse chunk by chunk"""
+    received = 0
+    
+    def chunks():
+        nonlocal received
+        for chunk in response.iter_content(CHUNK_SIZE):
+            received += len(chunk)
+            yield chunk
+    
+    body = chunks()
+    try:
+        response.raise_for_status()
+        data = parse(body)
+        # Normally only the closing brace is left; reading it returns the connection to the pool
+        parsed = received
+        for _ in body:
+            if received - parsed > STREAM_DRAIN_LIMIT:
+                break
+        return data
+    finally:
+        response.close()
+        UPSTREAM_BYTES.observe(received, provider='fmp', endpoint=endpoint)
+
+def _batch_status(data: dict, errors: dict) -> str:
+    if not errors:
+        return "success"
+    return "partial" if data else "error"
 
 class FMPTools:
     def __init__(self):
         self.api_key = os.getenv('FMP_API_KEY')
-        self.base_url = 'https://financialmodelingprep.com/api/v3'
+        self.base_url = FMP_BASE_URL.rstrip('/')
+    
+    def _get_json(self, url: str, params: dict, cache_kind: Optional[str] = None,
+                  parse: Optional[Callable[[Any], Any]] = None, stream: bool = False) -> dict:
+        """
+        GET a JSON endpoint through the shared pooled session.
+        
+        When cache_kind is given (quote, history, news, search) successful
+        responses are cached with that data type's TTL. When parse is given the
+        decoded body is passed through it once and the parsed value is what is
+        returned and cached. With stream=True parse receives the body as an
+        iterable of byte chunks instead, while it is still being received.
+        Concurrent identical requests share a single upstream call.
+        
+        Cached kinds fall back to the last known good value, marked "stale",
+        when the request fails. While the endpoint's circuit breaker is not
+        closed that value is returned right away and refreshed in the background.
+        """
+        cache_key = make_key(url, params) if cache_kind else None
+        if cache_key is not None:
+            cached = response_cache.get(cache_key)
+            CACHE_REQUESTS.inc(kind=cache_kind, result="miss" if cached is None else "hit")
+            if cached is not None:
+                return {"status": "success", "data": cached}
+        
+        fetch = lambda: upstream_flights.do(
+            ('http', make_key(url, params), parse),
+            lambda: self._fetch_json(url, params, cache_key, cache_kind, parse, stream),
+        )[0]
+        if cache_key is not None and not circuit_breakers.get('fmp', self._endpoint(url)).closed:
+            stale = _stale_result(cache_key, cache_kind)
+            if stale is not None:
+                _revalidate(cache_key, in_context(fetch))
+                return stale
+        
+        result = fetch()
+        if result["status"] == "error" and cache_key is not None:
+            return _stale_result(cache_key, cache_kind) or result
+        return result
+    
+    def _endpoint(self, url: str) -> str:
+        """First path segment after the base URL (quote, historical-price-full, ...)"""
+        return url[len(self.base_url):].strip('/').split('/')[0] if url.startswith(self.base_url) else url
+    
+    def _fetch_json(self, url: str, params: dict, cache_key, cache_kind: Optional[str],
+                    parse: Optional[Callable[[Any], Any]] = None, stream: bool = False) -> dict:
+        endpoint = self._endpoint(url)
+        breaker = circuit_breakers.get('fmp', endpoint)
+        if not breaker.allow():
+            UPSTREAM_SECONDS.observe(0.0, provider='fmp', endpoint=endpoint, outcome='circuit_open')
+            return {"status": "error",
+                    "error": f"FMP {endpoint} is failing; not retried for {breaker.retry_in():.0f}s"}
+        if not rate_limiter.acquire('fmp', endpoint):
+            breaker.cancel()
+            UPSTREAM_SECONDS.observe(0.0, provider='fmp', endpoint=endpoint, outcome='rate_limited')
+            return {"status": "error", "error": f"FMP rate limit reached for {endpoint}; try again shortly"}
+        
+        started = time.monotonic()
+        healthy = False
+        with span(f"GET fmp/{endpoint}", UPSTREAM_SECONDS, provider='fmp', endpoint=endpoint) as current:
+            try:
+                response = get_with_retries(url, params=params, stream=stream,
+                                            acquire=lambda: rate_limiter.acquire('fmp', endpoint))
+                if stream:
+                    data = _read_stream(response, parse, endpoint)
+                else:
+                    UPSTREAM_BYTES.observe(len(response.content), provider='fmp', endpoint=endpoint)
+                    response.raise_for_status()
+                    data = response.json()
+                    if parse is not None:
+                        data = parse(data)
+                healthy = True
+            except Exception as e:
+                healthy = not is_upstream_failure(e)
+                current.labels['outcome'] = 'error'
+                logger.warning("FMP %s request failed: %s", endpoint, e)
+                return {"status": "error", "error": str(e)}
+            finally:
+                breaker.record(healthy, time.monotonic() - started)
+            current.labels['outcome'] = 'ok'
+        
+        if cache_key is not None:
+            response_cache.set(cache_key, data, ttl_for(cache_kind))
+        return {"status": "success", "data": data}
     
     def get_stock_quote(self, symbol: str) -> dict:
-        """Get current stock quote"""
+        """Get current stock quote (a list with one Quote, empty for unknown symbols)"""
+        symbol = symbol.strip().upper()
         url = f"{self.base_url}/quote/{symbol}"
         params = {'apikey': self.api_key}
         
-        try:
-            response = requests.get(url, params=params)
-            response.raise_for_status()
-            data = response.json()
-            return {"status": "success", "data": data}
-        except Exception as e:
-            return {"status": "error", "error": str(e)}
+        return self._get_json(url, params, cache_kind='quote', parse=_parse_quotes)
     
     def get_historical_prices(self, symbol: str, days: int = 30) -> dict:
-        """Get historical price data"""
+        """Get historical price data as FMP-style rows (newest first); see get_price_history"""
+        symbol = symbol.strip().upper()
+        result = self.get_price_history(symbol, days)
+        if result["status"] == "error":
+            return result
+        return {"status": "success", "data": result["data"].to_dict()}
+    
+    def get_price_history(self, symbol: str, days: int = 30) -> dict:
+        """
+        Get the last `days` daily bars as a PriceSeries (oldest first)
+        
+        Completed sessions are served from the local price store and only bars
+        after the last stored date are requested upstream. When the store is up
+        to date the returned bars are a zero-copy view of the memory-mapped file.
+        Upstream responses are parsed as they stream in, so a long window is
+        never held as decoded JSON. When the upstream request fails, the stored
+        bars are returned marked "stale", with "as_of" the date of the newest one.
+        A request arriving while a window at least as large is being loaded for
+        the same symbol waits for it and takes a slice.
+        """
+        symbol = symbol.strip().upper()
+        result, shared = upstream_flights.do(
+            ('history', self.base_url, symbol),
+            lambda: self._load_price_history(symbol, days),
+            size=days,
+        )
+        if shared and result["status"] == "success":
+            return {**result, "data": result["data"][-days:]}
+        return result
+    
+    def get_price_histories(self, symbols: List[str], days: int = 30) -> dict:
+        """
+        get_price_history for many symbols in parallel
+        
+        Unlike get_historical_prices_bulk this goes through the local price
+        store, so repeated calls only fetch bars newer than the stored ones.
+        Returns per-symbol PriceSeries under "data" and failures under "errors";
+        symbols served from last known good data are listed under "stale".
+        """
+        symbols = _normalize_symbols(symbols)
+        stale = []
+        
+        def fetch_chunk(chunk):
+            symbol = chunk[0]
+            result = self.get_price_history(symbol, days)
+            if result["status"] == "error":
+                return {}, {symbol: result["error"]}
+            if not len(result["data"]):
+                return {}, {symbol: f"No historical data returned for {symbol}"}
+            if result.get("stale"):
+                stale.append(symbol)
+            return {symbol: result["data"]}, {}
+        
+        data, errors = self._fetch_chunks(symbols, 1, fetch_chunk)
+        return self._batch_result(symbols, data, errors, stale)
+    
+    def _batch_result(self, symbols: List[str], data: dict, errors: dict, stale: List[str]) -> dict:
+        ordered = {symbol: data[symbol] for symbol in symbols if symbol in data}
+        result = {"status": _batch_status(ordered, errors), "data": ordered, "errors": errors}
+        if stale:
+            result["stale"] = [symbol for symbol in symbols if symbol in stale]
+        return result
+    
+    def _load_price_history(self, symbol: str, days: int) -> dict:
         url = f"{self.base_url}/historical-price-full/{symbol}"
-        params = {
-            'apikey': self.api_key,
-            'timeseries': days
-        }
+        final_day = np.datetime64(last_completed_session(), 'D')
+        first_day = np.busday_offset(final_day, -(days - 1), roll='backward')
+        stored = price_store.load(symbol)
+        live = np.empty(0, dtype=BAR_DTYPE)
+        marker = {}
         
-        try:
-            response = requests.get(url, params=params)
-            response.raise_for_status()
-            data = response.json()
-            return {"status": "success", "data": data}
-        except Exception as e:
-            return {"status": "error", "error": str(e)}
+        if not len(stored) or (stored['date'][0] > first_day and stored['date'][0] != _listing_starts.get(symbol)):
+            # The store does not reach back far enough yet: fetch the whole window once.
+            # One bar more than needed, since while the market is open the newest is today's live bar.
+            params = {'apikey': self.api_key, 'timeseries': days + 1}
+            result = self._get_json(url, params, cache_kind='history',
+                                    parse=_HistoryStream(symbol, limit=days + 1), stream=True)
+            if result["status"] == "error":
+                return self._stored_history(symbol, stored, days, result)
+            marker = staleness(result)
+            bars = result["data"].bars
+            if 0 < len(bars) < days + 1 and not marker:
+                _listing_starts[symbol] = bars['date'][0]
+            price_store.merge(symbol, bars[bars['date'] <= final_day])
+            stored = price_store.load(symbol)
+            live = bars[bars['date'] > final_day]
+        elif stored['date'][-1] < final_day or is_market_open():
+            # Only ask for bars after the newest stored one (plus today's live bar).
+            # A closed-market catch-up stays uncached so a late final bar is picked up.
+            params = {'apikey': self.api_key, 'from': str(stored['date'][-1] + 1)}
+            result = self._get_json(url, params, cache_kind='history' if is_market_open() else None,
+                                    parse=_HistoryStream(symbol, stop_at=stored['date'][-1]), stream=True)
+            if result["status"] == "error":
+                return self._stored_history(symbol, stored, days, result)
+            marker = staleness(result)
+            bars = result["data"].bars
+            price_store.append(symbol, bars[bars['date'] <= final_day])
+            stored = price_store.load(symbol)
+            live = bars[bars['date'] > final_day]
+        
+        if len(live):
+            stored = np.concatenate([np.asarray(stored[-days:]), live])
+        return {"status": "success", "data": PriceSeries(symbol, stored[-days:]), **marker}
+    
+    def _stored_history(self, symbol: str, stored: np.ndarray, days: int, failed: dict) -> dict:
+        """Last known good bars from the price store after a failed request (the failure if there are none)"""
+        if not len(stored):
+            return failed
+        logger.info("Serving stored history for %s after upstream failure: %s", symbol, failed["error"])
+        return {"status": "success", "data": PriceSeries(symbol, stored[-days:]), "stale": True,
+                "as_of": str(stored['date'][-1])}
+    
+    def _fetch_chunks(self, symbols: List[str], chunk_size: int, fetch_chunk) -> tuple:
+        """Run fetch_chunk over upstream-sized chunks in parallel and merge per-symbol results"""
+        chunks = [symbols[i:i + chunk_size] for i in range(0, len(symbols), chunk_size)]
+        data, errors = {}, {}
+        if not chunks:
+            return data, errors
+        for chunk_data, chunk_errors in _get_batch_executor().map(in_context(fetch_chunk), chunks):
+            data.update(chunk_data)
+            errors.update(chunk_errors)
+        return data, errors
+    
+    def get_stock_quotes(self, symbols: List[str], chunk_size: int = QUOTE_BATCH_SIZE) -> dict:
+        """
+        Get current quotes for many symbols using comma-separated batch requests
+        
+        Returns per-symbol Quotes under "data" and per-symbol failures under
+        "errors". Symbols whose request failed but that have a last known good
+        quote get that one and are listed under "stale".
+        """
+        symbols = _normalize_symbols(symbols)
+        data, missing = {}, []
+        for symbol in symbols:
+            cached = response_cache.get(make_key(f"{self.base_url}/quote/{symbol}"))
+            if cached:
+                data[symbol] = cached[0]
+            else:
+                missing.append(symbol)
+        
+        def fetch_chunk(chunk):
+            result = self._get_json(f"{self.base_url}/quote/{','.join(chunk)}", {'apikey': self.api_key},
+                                    parse=_parse_quotes)
+            if result["status"] == "error":
+                return {}, {symbol: result["error"] for symbol in chunk}
+            quotes = {q.symbol: q for q in result["data"]}
+            chunk_data, chunk_errors = {}, {}
+            ttl = ttl_for('quote')
+            for symbol in chunk:
+                if symbol in quotes:
+                    chunk_data[symbol] = quotes[symbol]
+                    # Same entry a single get_stock_quote call would use
+                    response_cache.set(make_key(f"{self.base_url}/quote/{symbol}"), [quotes[symbol]], ttl)
+                else:
+                    chunk_errors[symbol] = f"No quote returned for {symbol}"
+            return chunk_data, chunk_errors
+        
+        fetched, errors = self._fetch_chunks(missing, chunk_size, fetch_chunk)
+        data.update(fetched)
+        stale = _fill_stale(missing, data, errors, lambda symbol: make_key(f"{self.base_url}/quote/{symbol}"),
+                            unwrap=lambda quotes: quotes[0])
+        return self._batch_result(symbols, data, errors, stale)
+    
+    def get_historical_prices_bulk(self, symbols: List[str], days: int = 30,
+                                   chunk_size: int = HISTORY_BATCH_SIZE) -> dict:
+        """
+        Get historical price data for many symbols using comma-separated batch requests
+        
+        Each symbol's entry under "data" is a PriceSeries (oldest first);
+        per-symbol failures are reported under "errors", and symbols served
+        from last known good data under "stale".
+        """
+        symbols = _normalize_symbols(symbols)
+        data, missing = {}, []
+        for symbol in symbols:
+            cached = response_cache.get(make_key(f"{self.base_url}/historical-price-full/{symbol}", {'timeseries': days}))
+            if cached:
+                data[symbol] = cached
+            else:
+                missing.append(symbol)
+        
+        def fetch_chunk(chunk):
+            url = f"{self.base_url}/historical-price-full/{','.join(chunk)}"
+            result = self._get_json(url, {'apikey': self.api_key, 'timeseries': days}, parse=_parse_history_bulk)
+            if result["status"] == "error":
+                return {}, {symbol: result["error"] for symbol in chunk}
+            by_symbol = result["data"]
+            chunk_data, chunk_errors = {}, {}
+            ttl = ttl_for('history')
+            for symbol in chunk:
+                series = by_symbol.get(symbol)
+                if series is not None and len(series):
+                    chunk_data[symbol] = series
+                    # Same entry a single-symbol history request would use
+                    response_cache.set(
+                        make_key(f"{self.base_url}/historical-price-full/{symbol}", {'timeseries': days}), series, ttl)
+                else:
+                    chunk_errors[symbol] = f"No historical data returned for {symbol}"
+            return chunk_data, chunk_errors
+        
+        fetched, errors = self._fetch_chunks(missing, chunk_size, fetch_chunk)
+        data.update(fetched)
+        stale = _fill_stale(missing, data, errors, lambda symbol: make_key(
+            f"{self.base_url}/historical-price-full/{symbol}", {'timeseries': days}))
+        return self._batch_result(symbols, data, errors, stale)
     
     def get_stock_news(self, symbol: str, limit: int = 10) -> dict:
-        """Get news for a specific stock"""
-        # Try to use NewsAPI first
-        news_api_result = self._get_news_from_newsapi(symbol, limit)
-        if news_api_result["status"] == "success" and news_api_result["data"]:
-            return news_api_result
+        """
+        Get news for a specific stock
         
-        # Fall back to FMP if NewsAPI fails
+        Articles are served from the local news store. Unless the ticker was
+        checked within the news TTL, NewsAPI and FMP are hedged: NewsAPI is
+        asked first, FMP joins if NewsAPI fails or is slower than the hedge
+        delay, and the first good answer is merged into the store. A slower
+        provider that still answers is merged in the background. Returns
+        NewsItems, newest first.
+        
+        When neither provider can be reached, the stored articles are returned
+        marked "stale" ("as_of" is the newest one's date). While every
+        provider's circuit breaker is open that happens right away, and the
+        store is refreshed in the background.
+        """
+        symbol = symbol.strip().upper()
+        stale = False
+        if not news_store.checked_since(symbol, ttl_for('news')):
+            if self._news_unavailable() and news_store.latest(symbol, 1):
+                _revalidate(('news', symbol), in_context(lambda: self._refresh_news(symbol, limit)))
+                stale = True
+            else:
+                winner, result = self._refresh_news(symbol, limit)
+                if winner is None and not news_store.latest(symbol, 1):
+                    return result
+                stale = winner is None or bool(result.get("stale"))
+        
+        articles = [NewsItem.from_dict(a) for a in news_store.latest(symbol, limit)]
+        if stale:
+            return {"status": "success", "data": articles, "stale": True, "as_of": news_store.newest_published(symbol)}
+        return {"status": "success", "data": articles}
+    
+    def _refresh_news(self, symbol: str, limit: int) -> tuple:
+        """Hedged NewsAPI/FMP request merged into the news store; (winning provider or None, its result)"""
+        since = news_store.newest_published(symbol)
+        winner, result = hedged_call(
+            [("newsapi", lambda: self._get_news_from_newsapi(symbol, limit, since)),
+             ("fmp", lambda: self._get_news_from_fmp(symbol, limit, since))],
+            _get_executor('news-hedge', NEWS_WORKERS),
+            hedge_delay=NEWS_HEDGE_DELAY,
+            deadline=NEWS_DEADLINE,
+            stats=news_provider_stats,
+            on_late=lambda provider, late: news_store.merge(symbol, _news_articles(late), checked=False,
+                                                            tz=NEWS_TIMEZONES[provider]),
+        )
+        if winner is not None:
+            logger.info("News for %s served by %s", symbol, winner)
+            news_store.merge(symbol, _news_articles(result), tz=NEWS_TIMEZONES[winner])
+        return winner, result
+    
+    def _news_unavailable(self) -> bool:
+        """Whether the circuit breakers of every configured news provider are open"""
+        newsapi_down = not os.getenv('NEWS_API_KEY') or not circuit_breakers.get('newsapi', 'everything').closed
+        return newsapi_down and not circuit_breakers.get('fmp', 'stock_news').closed
+    
+    def _get_news_from_fmp(self, symbol: str, limit: int = 10, since: Optional[str] = None) -> dict:
+        """Get news from FMP's stock_news endpoint, optionally only from a date on"""
         url = f"{self.base_url}/stock_news"
         params = {
             'tickers': symbol,
             'limit': limit,
+            'from': since_param(since, "%Y-%m-%d", MARKET_TZ),
             'apikey': self.api_key
         }
+        params = {k: v for k, v in params.items() if v is not None}
         
-        try:
-            response = requests.get(url, params=params)
-            response.raise_for_status()
-            data = response.json()
-            return {"status": "success", "data": data}
-        except Exception as e:
-            return {"status": "error", "error": str(e)}
+        return self._get_json(url, params, cache_kind='news')
     
-    def _get_news_from_newsapi(self, symbol: str, limit: int = 10) -> dict:
-        """Get news from NewsAPI as a backup/alternative source"""
+    def _get_news_from_newsapi(self, symbol: str, limit: int = 10, since: Optional[str] = None) -> dict:
+        """Get news from NewsAPI for the last 7 days, or only after `since` when given"""
         news_api_key = os.getenv('NEWS_API_KEY')
         if not news_api_key:
             return {"status": "error", "error": "NEWS_API_KEY not found in environment variables"}
         
-        # Calculate date range for last 7 days
-        end_date = datetime.now()
+        # Calculate date range for last 7 days (or since the newest stored article)
+        end_date = datetime.now(timezone.utc)
         start_date = end_date - timedelta(days=7)
         from_date = start_date.strftime("%Y-%m-%d")
+        if since:
+            from_date = max(from_date, since_param(since, "%Y-%m-%dT%H:%M:%S"))
         to_date = end_date.strftime("%Y-%m-%d")
         
+        # The date window moves every day, so key the cache on what was asked for
+        cache_key = make_key("newsapi/everything", {"symbol": symbol, "pageSize": limit, "from": from_date})
+        cached = response_cache.get(cache_key)
+        CACHE_REQUESTS.inc(kind='news', result="miss" if cached is None else "hit")
+        if cached is not None:
+            return {"status": "success", "data": cached}
+        
         # Create search query for better results
         query = f"{symbol} stock OR {symbol} shares OR {symbol} company"
         
         # NewsAPI endpoint
-        url = "https://newsapi.org/v2/everything"
+        url = f"{NEWS_API_BASE_URL.rstrip('/')}/everything"
         
         params = {
             "q": query,
@@ -89,36 +608,64 @@ class FMPTools:
             "apiKey": news_api_key
         }
         
+        breaker = circuit_breakers.get('newsapi', 'everything')
+        if not breaker.allow():
+            UPSTREAM_SECONDS.observe(0.0, provider='newsapi', endpoint='everything', outcome='circuit_open')
+            return {"status": "error", "error": f"NewsAPI is failing; not retried for {breaker.retry_in():.0f}s"}
+        if not rate_limiter.acquire('newsapi', 'everything'):
+            breaker.cancel()
+            UPSTREAM_SECONDS.observe(0.0, provider='newsapi', endpoint='everything', outcome='rate_limited')
+            return {"status": "error", "error": "NewsAPI rate limit reached; try again later"}
+        
+        started = time.monotonic()
+        healthy = False
         try:
-            print(f"--- Attempting to fetch news for {symbol} from NewsAPI ---")
-            response = requests.get(url, params=params)
-            response.raise_for_status()
-            news_data = response.json()
+            logger.debug("Fetching news for %s from NewsAPI", symbol)
+            with span("GET newsapi/everything", UPSTREAM_SECONDS, provider='newsapi', endpoint='everything') as current:
+                current.labels['outcome'] = 'error'
+                response = get_with_retries(url, params=params,
+                                            acquire=lambda: rate_limiter.acquire('newsapi', 'everything'))
+                UPSTREAM_BYTES.observe(len(response.content), provider='newsapi', endpoint='everything')
+                response.raise_for_status()
+                news_data = response.json()
+                current.labels['outcome'] = 'ok'
+            healthy = True
             
-            # Check if we got valid data
-            if news_data.get("status") == "ok" and news_data.get("articles"):
+            # Check if we got valid data (no articles since `since` is a valid answer)
+            if news_data.get("status") == "ok" and (news_data.get("articles") or since):
                 # Convert to a format similar to FMP for consistency
                 formatted_articles = []
                 
-                for article in news_data["articles"]:
+                for article in news_data.get("articles") or []:
                     formatted_articles.append({
                         "title": article.get("title", "No title"),
-                        "text": article.get("description", "") + "\n\n" + article.get("content", ""),
+                        "text": (article.get("description") or "") + "\n\n" + (article.get("content") or ""),
                         "publishedDate": article.get("publishedAt", "Unknown date"),
                         "url": article.get("url", ""),
                         "source": article.get("source", {}).get("name", "Unknown source"),
                         "image": article.get("urlToImage", "")
                     })
                 
-                print(f"--- Successfully retrieved {len(formatted_articles)} articles from NewsAPI ---")
+                logger.debug("Retrieved %d articles from NewsAPI for %s", len(formatted_articles), symbol)
+                response_cache.set(cache_key, formatted_articles, ttl_for('news'))
                 return {"status": "success", "data": formatted_articles}
             else:
-                print(f"--- No articles found on NewsAPI for {symbol} ---")
+                logger.info("No articles found on NewsAPI for %s", symbol)
                 return {"status": "error", "error": f"No news found for {symbol} on NewsAPI"}
                 
         except Exception as e:
-            print(f"--- NewsAPI error: {str(e)} ---")
+            healthy = not is_upstream_failure(e)
+            logger.warning("NewsAPI error: %s", e)
             return {"status": "error", "error": f"NewsAPI error: {str(e)}"}
+        finally:
+            breaker.record(healthy, time.monotonic() - started)
+    
+    def get_symbol_list(self) -> dict:
+        """Get the full listing of tradable symbols (used to build the symbol directory)"""
+        url = f"{self.base_url}/stock/list"
+        params = {'apikey': self.api_key}
+        
+        return self._get_json(url, params, cache_kind='search')
     
     def search_symbol(self, query: str) -> dict:
         """Search for stock symbols"""
@@ -129,10 +676,4 @@ class FMPTools:
             'apikey': self.api_key
         }
         
-        try:
-            response = requests.get(url, params=params)
-            response.raise_for_status()
-            data = response.json()
-            return {"status": "success", "data": data}
-        except Exception as e:
-            return {"status": "error", "error": str(e)}
\ No newline at end of file
+        return self._get_json(url, params, cache_kind='search')
\ No newline at end of file
@@ -0,0 +1,223 @@
+"""
+Long-running watchlist mode.
+
+A Watchlist polls its symbols on a schedule with batched quote requests (one
+upstream call per 50 symbols) and keeps the latest quote of each in memory.
+Subscribers only hear about changes: a "price" event when a symbol has moved
+more than the threshold since the last price reported for it, and a "news"
+event for each headline not seen before. Polling runs at background priority,
+so interactive queries are served first when the API quota is tight.
+
+    watchlist = Watchlist(["AAPL", "MSFT", "NVDA"], threshold_percent=0.5)
+    async for event in watchlist.events():
+        print(event)
+"""
+
+import asyncio
+import inspect
+import time
+from typing import AsyncIterator, Awaitable, Callable, Dict, Iterable, List, Optional, Union
+
+from .tools import AsyncFMPTools
+from .tools.market_hours import is_market_open, seconds_until_next_open
+from .tools.models import Quote
+from .tools.rate_limit import BACKGROUND, priority
+from .tools.telemetry import get_logger
+
+logger = get_logger('watchlist')
+
+# Seconds between quote polls while the market is open
+DEFAULT_INTERVAL = 30.0
+# Seconds between news checks (the news store does not ask upstream more often than its TTL)
+DEFAULT_NEWS_INTERVAL = 300.0
+# Move, in percent of the last reported price, that triggers a price event
+DEFAULT_THRESHOLD_PERCENT = 1.0
+# News checks running at once
+NEWS_CONCURRENCY = 4
+# Events buffered per async-iterator subscriber before the oldest are dropped
+QUEUE_SIZE = 1000
+
+Callback = Callable[[dict], Union[None, Awaitable[None]]]
+
+
+class Watchlist:
+    """Polls quotes and news for a set of symbols and emits only what changed"""
+
+    def __init__(
+        self,
+        symbols: Iterable[str] = (),
+        interval: float = DEFAULT_INTERVAL,
+        threshold_percent: float = DEFAULT_THRESHOLD_PERCENT,
+        news_interval: Optional[float] = DEFAULT_NEWS_INTERVAL,
+        news_limit: int = 5,
+        tools: Optional[AsyncFMPTools] = None,
+    ):
+        self.interval = interval
+        self.threshold_percent = threshold_percent
+        self.news_interval = news_interval
+        self.news_limit = news_limit
+        self._tools = tools or AsyncFMPTools()
+        self._symbols: List[str] = []
+        self._quotes: Dict[str, Quote] = {}
+        self._reported: Dict[str, float] = {}
+        self._seen_news: Dict[str, set] = {}
+        self._last_news_check = 0.0
+        self._callbacks: List[Callback] = []
+        self._queues: List[asyncio.Queue] = []
+        self._task: Optional[asyncio.Task] = None
+        self.add(symbols)
+
+    @property
+    def symbols(self) -> List[str]:
+        return list(self._symbols)
+
+    def add(self, symbols: Iterable[str]) -> None:
+        for symbol in symbols:
+            symbol = symbol.strip().upper()
+            if symbol and symbol not in self._symbols:
+                self._symbols.append(symbol)
+
+    def remove(self, symbols: Iterable[str]) -> None:
+        for symbol in symbols:
+            symbol = symbol.strip().upper()
+            if symbol in self._symbols:
+                self._symbols.remove(symbol)
+            for state in (self._quotes, self._reported, self._seen_news):
+                state.pop(symbol, None)
+
+    def snapshot(self) -> Dict[str, dict]:
+        """Latest quote of every symbol polled so far"""
+        return {symbol: self._quotes[symbol].to_dict() for symbol in self._symbols if symbol in self._quotes}
+
+    def subscribe(self, callback: Callback) -> Callable[[], None]:
+        """Call callback (plain function or coroutine function) with every event; returns an unsubscribe function"""
+        self._callbacks.append(callback)
+        return lambda: self._callbacks.remove(callback) if callback in self._callbacks else None
+
+    async def events(self) -> AsyncIterator[dict]:
+        """Iterate over events, starting the polling loop if it is not running"""
+        queue: asyncio.Queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+        self._queues.append(queue)
+        self.start()
+        try:
+            while True:
+                yield await queue.get()
+        finally:
+            self._queues.remove(queue)
+
+    def start(self) -> asyncio.Task:
+        """Start polling in the background on the running event loop"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self.run())
+        return self._task
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def run(self) -> None:
+        """Poll until cancelled; outside market hours only news is checked"""
+        with priority(BACKGROUND):
+            while True:
+                try:
+                    await self.poll_once()
+                except Exception:
+                    # Keep polling: subscribers would otherwise wait for events forever
+                    logger.exception("watchlist poll failed")
+                delay = self.interval
+                if not is_market_open():
+                    delay = max(self.interval, min(seconds_until_next_open(), self.news_interval or float('inf')))
+                await asyncio.sleep(delay)
+
+    async def poll_once(self) -> List[dict]:
+        """Poll quotes (while the market is open or before the first snapshot) and due news, then emit the events"""
+        events = []
+        symbols = self.symbols
+        if symbols and (is_market_open() or any(s not in self._quotes for s in symbols)):
+            events.extend(await self._poll_quotes(symbols))
+        if symbols and self.news_interval is not None and time.monotonic() - self._last_news_check >= self.news_interval:
+            self._last_news_check = time.monotonic()
+            events.extend(await self._poll_news(symbols))
+        for event in events:
+            await self._emit(event)
+        return events
+
+    async def _poll_quotes(self, symbols: List[str]) -> List[dict]:
+        result = await self._tools.get_stock_quotes(symbols)
+        if result["status"] == "error":
+            logger.warning("quote poll failed: %s", result.get('errors') or result.get('error'))
+        events = []
+        # Last known good quotes served during an outage are not news
+        stale = set(result.get("stale", ()))
+        for symbol, quote in result.get("data", {}).items():
+            price = quote.price
+            if price is None or symbol not in self._symbols or symbol in stale:
+                continue
+            self._quotes[symbol] = quote
+            reference = self._reported.get(symbol)
+            if reference is None:
+                # First quote is the baseline, not a change
+                self._reported[symbol] = price
+                continue
+            change = price - reference
+            change_percent = (change / reference) * 100 if reference else 0.0
+            if abs(change_percent) >= self.threshold_percent:
+                self._reported[symbol] = price
+                events.append({
+                    "type": "price",
+                    "symbol": symbol,
+                    "price": price,
+                    "previous_price": reference,
+                    "change": round(change, 2),
+                    "change_percent": round(change_percent, 2),
+                    "direction": "up" if change > 0 else "down",
+                    "quote": quote.to_dict(),
+                })
+        return events
+
+    async def _poll_news(self, symbols: List[str]) -> List[dict]:
+        semaphore = asyncio.Semaphore(NEWS_CONCURRENCY)
+
+        async def fetch(symbol):
+            async with semaphore:
+                return symbol, await self._tools.get_stock_news(symbol, self.news_limit)
+
+        events = []
+        results = await asyncio.gather(*(fetch(s) for s in symbols), return_exceptions=True)
+        for symbol, result in zip(symbols, results):
+            if isinstance(result, BaseException):
+                logger.warning("news check for %s failed: %s", symbol, result)
+                continue
+            _, result = result
+            if result.get("status") != "success" or symbol not in self._symbols:
+                continue
+            articles = result["data"]
+            keys = [a.key for a in articles]
+            seen = self._seen_news.get(symbol)
+            if seen is None:
+                # Headlines already out when a symbol is first checked are the baseline
+                self._seen_news[symbol] = set(keys)
+                continue
+            for key, article in zip(keys, articles):
+                if key not in seen:
+                    seen.add(key)
+                    events.append({"type": "news", "symbol": symbol, "article": article.to_dict()})
+        return events
+
+    async def _emit(self, event: dict) -> None:
+        for queue in list(self._queues):
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(event)
+        for callback in list(self._callbacks):
+            try:
+                result = callback(event)
+                if inspect.isawaitable(result):
+                    await result
+            except Exception as e:
+                logger.warning("subscriber failed on %s event for %s: %s", event['type'], event['symbol'], e)
@@ -0,0 +1,70 @@
+"""
+Concurrent data-gathering step of the stock analysis workflow.
+
+Price, price change and news do not depend on each other, so they are fetched
+together and the step takes as long as the slowest upstream rather than the sum.
+"""
+
+import asyncio
+from typing import Optional
+
+from .sub_agents.ticker_news.agent import get_ticker_news_async
+from .sub_agents.ticker_price.agent import get_current_price_async
+from .sub_agents.ticker_price_change.agent import calculate_price_change_async
+from .tools.telemetry import get_logger, traced_tool
+
+logger = get_logger('workflow')
+
+
+@traced_tool
+async def gather_ticker_data(ticker: str, timeframe: str = "1day", news_limit: int = 5) -> dict:
+    """
+    Fetch current price, price change and recent news for a ticker concurrently
+
+    Args:
+        ticker: Stock ticker symbol
+        timeframe: Time period for the price change (1day, 1week, 1month)
+        news_limit: Number of news articles to retrieve
+
+    Returns:
+        Dictionary with the price, price_change and news results
+    """
+    logger.info("gather_ticker_data called for %s, timeframe: %s", ticker, timeframe)
+
+    ticker = ticker.strip().upper()
+    price, price_change, news = await asyncio.gather(
+        get_current_price_async(request=f"get price for {ticker}"),
+        calculate_price_change_async(ticker, timeframe),
+        get_ticker_news_async(ticker, news_limit),
+        return_exceptions=True,
+    )
+
+    results = {}
+    for name, result in (("price", price), ("price_change", price_change), ("news", news)):
+        if isinstance(result, BaseException):
+            result = {"status": "error", "error": f"Error gathering {name} for {ticker}: {str(result)}"}
+        results[name] = result
+
+    ok = [r["status"] == "success" for r in results.values()]
+    return {
+        "status": "success" if all(ok) else "partial" if any(ok) else "error",
+        "ticker": ticker,
+        "timeframe": timeframe,
+        **results,
+    }
+
+
+def describe_price_change(change: dict) -> str:
+    """Render a price change result the way analyze_stock_movement expects it"""
+    return (
+        f"{change['ticker']} stock {change['direction']} by {abs(change['change_percent']):.2f}% "
+        f"({change['period_description']}): ${change['previous_price']:.2f} -> ${change['current_price']:.2f}"
+    )
+
+
+def describe_news(news: dict) -> Optional[str]:
+    """Render a get_ticker_news result as analyze_stock_movement news_data (one article per line)"""
+    articles = news.get("news") if news.get("status") == "success" else None
+    if not isinstance(articles, list) or not articles:
+        return None
+    return "\n".join(f"{a['title']}. {a['summary']}" for a in articles)
@@ -0,0 +1,127 @@
+import json
+
+import pytest
+import requests
+
+from manager.tools.circuit import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitBreakers, is_upstream_failure
+
+
+def _breaker(now: list, **settings) -> CircuitBreaker:
+    """Breaker on a clock that only moves when the test moves now[0]"""
+    settings = {"failure_rate": 0.5, "min_calls": 4, "window": 10, "open_seconds": 30, "slow_call": 2, **settings}
+    return CircuitBreaker(clock=lambda: now[0], **settings)
+
+
+def _http_error(status: int) -> requests.HTTPError:
+    response = requests.Response()
+    response.status_code = status
+    return requests.HTTPError(response=response)
+
+
+def _call(breaker: CircuitBreaker, ok: bool, seconds: float = 0.1) -> bool:
+    allowed = breaker.allow()
+    if allowed:
+        breaker.record(ok, seconds)
+    return allowed
+
+
+def test_opens_once_enough_calls_fail_within_the_window():
+    now = [0.0]
+    breaker = _breaker(now)
+    for ok in (False, False, False):
+        _call(breaker, ok)
+    # Too few calls to judge yet
+    assert breaker.state == CLOSED
+
+    _call(breaker, True)
+    assert breaker.state == OPEN
+    assert not breaker.allow() and breaker.stats()["rejected"] == 1
+    assert breaker.retry_in() == 30
+
+
+def test_failures_that_left_the_window_do_not_count():
+    now = [0.0]
+    breaker = _breaker(now)
+    _call(breaker, False)
+    _call(breaker, False)
+    now[0] = 11.0
+    for ok in (True, True, False):
+        _call(breaker, ok)
+
+    assert breaker.state == CLOSED
+    assert breaker.stats()["window_failures"] == 1
+
+
+def test_slow_successes_count_as_failures():
+    now = [0.0]
+    breaker = _breaker(now)
+    for _ in range(4):
+        _call(breaker, True, seconds=3)
+
+    assert breaker.state == OPEN
+
+
+def test_half_open_lets_one_probe_through_and_closes_on_success():
+    now = [0.0]
+    breaker = _breaker(now, min_calls=1)
+    _call(breaker, False)
+    now[0] = 30.0
+
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow()
+    assert not breaker.allow()
+    breaker.record(True)
+
+    assert breaker.state == CLOSED and breaker.stats()["window_calls"] == 0
+
+
+def test_failed_probe_reopens_for_another_period():
+    now = [0.0]
+    breaker = _breaker(now, min_calls=1)
+    _call(breaker, False)
+    now[0] = 31.0
+
+    assert _call(breaker, False)
+    assert breaker.state == OPEN and breaker.stats()["opened"] == 2
+    now[0] = 60.0
+    assert breaker.state == OPEN
+    now[0] = 61.0
+    assert breaker.state == HALF_OPEN
+
+
+def test_cancelled_probe_frees_the_slot():
+    now = [0.0]
+    breaker = _breaker(now, min_calls=1)
+    _call(breaker, False)
+    now[0] = 30.0
+
+    assert breaker.allow()
+    breaker.cancel()
+    assert breaker.allow()
+
+
+def test_breakers_are_per_endpoint():
+    breakers = CircuitBreakers(min_calls=1, failure_rate=0.5)
+    breakers.get('fmp', 'quote').allow()
+    breakers.get('fmp', 'quote').record(False)
+
+    assert breakers.get('fmp', 'quote').state == OPEN
+    assert breakers.get('fmp', 'historical-price-full').state == CLOSED
+    assert breakers.stats()["fmp/quote"]["state"] == 2
+
+
+@pytest.mark.parametrize("error, failure", [
+    (requests.ConnectionError(), True),
+    (requests.ReadTimeout(), True),
+    (ConnectionResetError(), True),
+    (_http_error(503), True),
+    (_http_error(429), True),
+    (requests.HTTPError(), True),
+    (_http_error(404), False),
+    (_http_error(401), False),
+    (requests.JSONDecodeError("Expecting value", "", 0), False),
+    (json.JSONDecodeError("Expecting value", "", 0), False),
+    (KeyError("price"), False),
+])
+def test_is_upstream_failure(error, failure):
+    assert is_upstream_failure(error) is failure
@@ -0,0 +1,134 @@
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import pytest
+
+from manager.tools.hedge import ProviderStats, hedged_call
+
+
+class _Provider:
+    """News provider that answers after `delay` seconds, or when released"""
+
+    def __init__(self, name: str, delay: float = 0.0, ok: bool = True, gated: bool = False):
+        self.name = name
+        self.delay = delay
+        self.ok = ok
+        self.release = threading.Event()
+        if not gated:
+            self.release.set()
+        self.calls = 0
+
+    def __call__(self) -> dict:
+        self.calls += 1
+        time.sleep(self.delay)
+        self.release.wait(5)
+        if not self.ok:
+            return {"status": "error", "error": f"{self.name} unavailable"}
+        return {"status": "success", "articles": [self.name]}
+
+    @property
+    def entry(self):
+        return self.name, self
+
+
+class _SaturatedPool(ThreadPoolExecutor):
+    """Pool with `free` idle workers; whatever is submitted after them stays queued"""
+
+    def __init__(self, free: int):
+        super().__init__(max_workers=free)
+        self.free = free
+        self.queued = []
+
+    def submit(self, fn, *args, **kwargs):
+        if self.free:
+            self.free -= 1
+            return super().submit(fn, *args, **kwargs)
+        future = Future()
+        self.queued.append(future)
+        return future
+
+
+@pytest.fixture
+def executor():
+    pool = ThreadPoolExecutor(max_workers=2)
+    yield pool
+    pool.shutdown(wait=True, cancel_futures=True)
+
+
+def test_fast_first_provider_wins_without_hedging(executor):
+    first, second = _Provider('newsapi'), _Provider('fmp')
+    stats = ProviderStats()
+
+    winner, result = hedged_call([first.entry, second.entry], executor, hedge_delay=1.0, deadline=2.0, stats=stats)
+
+    assert (winner, result["articles"]) == ('newsapi', ['newsapi'])
+    assert second.calls == 0
+    assert stats.snapshot()["newsapi"]["wins"] == 1
+
+
+def test_slow_provider_is_hedged_and_its_late_answer_is_delivered(executor):
+    slow, fast = _Provider('newsapi', gated=True), _Provider('fmp')
+    late = []
+    delivered = threading.Event()
+
+    def on_late(name, result):
+        late.append((name, result["articles"]))
+        delivered.set()
+
+    started = time.monotonic()
+    winner, _ = hedged_call([slow.entry, fast.entry], executor, hedge_delay=0.05, deadline=2.0, on_late=on_late)
+
+    assert winner == 'fmp'
+    assert 0.05 <= time.monotonic() - started < 1.0
+    slow.release.set()
+    assert delivered.wait(2)
+    assert late == [('newsapi', ['newsapi'])]
+
+
+def test_a_failure_starts_the_next_provider_at_once(executor):
+    failing, backup = _Provider('newsapi', ok=False), _Provider('fmp')
+
+    started = time.monotonic()
+    winner, _ = hedged_call([failing.entry, backup.entry], executor, hedge_delay=5.0, deadline=10.0)
+
+    assert winner == 'fmp'
+    assert time.monotonic() - started < 1.0
+
+
+def test_losers_not_yet_started_are_cancelled_and_running_ones_finish_late():
+    pool = _SaturatedPool(free=2)
+    fast = _Provider('newsapi', delay=0.1)
+    running, queued = _Provider('fmp', gated=True), _Provider('backup')
+    late = []
+
+    winner, _ = hedged_call([fast.entry, running.entry, queued.entry], pool,
+                            hedge_delay=0.02, deadline=2.0, on_late=lambda name, result: late.append(name))
+    running.release.set()
+    pool.shutdown(wait=True)
+
+    assert winner == 'newsapi'
+    assert len(pool.queued) == 1 and pool.queued[0].cancelled()
+    assert queued.calls == 0 and late == ['fmp']
+
+
+def test_late_failures_are_not_delivered(executor):
+    slow_failure, fast = _Provider('newsapi', ok=False, gated=True), _Provider('fmp')
+    late = []
+
+    hedged_call([slow_failure.entry, fast.entry], executor, hedge_delay=0.02, deadline=2.0,
+                on_late=lambda name, result: late.append(name))
+    slow_failure.release.set()
+    executor.shutdown(wait=True)
+
+    assert late == []
+
+
+def test_deadline_returns_an_error_combining_the_providers(executor):
+    failing, stuck = _Provider('newsapi', ok=False), _Provider('fmp', gated=True)
+
+    winner, result = hedged_call([failing.entry, stuck.entry], executor, hedge_delay=0.01, deadline=0.1)
+    stuck.release.set()
+
+    assert winner is None and result["status"] == "error"
+    assert result["error"] == "newsapi: newsapi unavailable; deadline of 0.1s exceeded"
@@ -0,0 +1,75 @@
+import pytest
+
+from manager import intent
+from manager.intent import CONFIDENCE_THRESHOLD, parse_intent, parse_timeframe
+from manager.tools.symbol_directory import SymbolDirectory
+
+LISTINGS = [
+    {"symbol": "AMD", "name": "Advanced Micro Devices, Inc.", "exchangeShortName": "NASDAQ", "type": "stock"},
+    {"symbol": "NVDA", "name": "NVIDIA Corporation", "exchangeShortName": "NASDAQ", "type": "stock"},
+    {"symbol": "KO", "name": "The Coca-Cola Company", "exchangeShortName": "NYSE", "type": "stock"},
+]
+
+
+@pytest.fixture
+def listed(monkeypatch):
+    directory = SymbolDirectory(LISTINGS)
+    monkeypatch.setattr(intent, 'get_symbol_directory', lambda: directory)
+
+
+@pytest.fixture
+def unlisted(monkeypatch):
+    directory = SymbolDirectory()
+    monkeypatch.setattr(intent, 'get_symbol_directory', lambda: directory)
+
+
+@pytest.mark.parametrize("query, horizon", [
+    ("How did AMD do over the last 30 days?", "1month"),
+    ("AMD in the past 20 days", "1month"),  # 21 sessions
+    ("AMD over the last 5 days", "1week"),  # 5 sessions
+    ("AMD over the last 8 days", "1week"),
+    ("AMD over three months", "3month"),
+    ("AMD over 6 months", "6month"),
+    ("AMD over twelve months", "1year"),
+    ("AMD over the last 10 days", None),
+    ("AMD over the last two weeks", None),
+    ("AMD over two years", None),
+])
+def test_spans_snap_only_to_a_horizon_within_tolerance(query, horizon):
+    assert parse_timeframe(query) == (horizon, True)
+
+
+def test_named_periods_and_the_default():
+    assert parse_timeframe("AMD year to date") == ("ytd", True)
+    assert parse_timeframe("AMD this quarter") == ("3month", True)
+    assert parse_timeframe("Why is AMD down?") == ("1day", False)
+
+
+def test_confidence_is_that_of_the_weakest_ticker(listed):
+    strong = parse_intent("Why did $NVDA and AMD drop this week?")
+    weak = parse_intent("Compare NVDA with Coca-Cola this year")
+
+    assert (strong.tickers, strong.confidence, strong.request) == (["NVDA", "AMD"], 0.95, "comparison")
+    assert (weak.tickers, weak.methods) == (["NVDA", "KO"], ["direct_match", "directory_match"])
+    assert weak.confidence == 0.8 and weak.confident
+
+
+def test_uncovered_span_caps_confidence_below_the_threshold(listed):
+    parsed = parse_intent("Why did $NVDA fall over the last 10 days?")
+
+    assert parsed.timeframe is None and parsed.timeframe_explicit
+    assert parsed.confidence < CONFIDENCE_THRESHOLD and not parsed.confident
+    assert parsed.describe() == "none"
+
+
+def test_unlisted_uppercase_words_are_tickers_unless_they_are_jargon(unlisted):
+    parsed = parse_intent("Did the CEO change move XYZ or the RSI?")
+
+    assert parsed.tickers == ["XYZ"] and parsed.methods == ["unlisted_match"]
+    assert parsed.confidence == 0.8
+
+
+def test_listed_directory_rejects_unknown_uppercase_words(listed):
+    parsed = parse_intent("What happened to XYZ today?")
+
+    assert parsed.tickers == [] and parsed.confidence == 0.0 and not parsed.confident
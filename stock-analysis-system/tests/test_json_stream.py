@@ -0,0 +1,67 @@
+import json
+
+import pytest
+
+from manager.tools.json_stream import iter_array
+
+BODY = json.dumps({
+    "symbol": "NESN.SW",
+    "note": "brackets ] and braces } inside a string, and a café",
+    "meta": {"splits": [[2, 1], [5, 1]], "currency": "CHF"},
+    "historical": [
+        {"date": "2024-06-12", "close": 92.5, "label": "Jun 12, 24 – ünchanged"},
+        {"date": "2024-06-11", "close": 1234567.125, "volume": 0},
+        {"date": "2024-06-10", "close": -0.5e-3, "volume": None},
+    ],
+    "tail": [1, 2, 3],
+}, ensure_ascii=False).encode('utf-8')
+
+
+def _chunks(body: bytes, size: int, read: list = None):
+    for start in range(0, len(body), size):
+        if read is not None:
+            read.append(start)
+        yield body[start:start + size]
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7, 64, len(BODY)])
+def test_elements_match_json_loads_whatever_the_chunking(size):
+    assert list(iter_array(_chunks(BODY, size), 'historical')) == json.loads(BODY)["historical"]
+
+
+@pytest.mark.parametrize("size", [1, 5])
+def test_top_level_numbers_split_across_chunks(size):
+    body = b'{"data": [12345, 6.0625, -7e2, 8]}'
+
+    assert list(iter_array(_chunks(body, size), 'data')) == [12345, 6.0625, -700.0, 8]
+
+
+def test_missing_key_or_non_array_yields_nothing():
+    assert list(iter_array(_chunks(BODY, 16), 'absent')) == []
+    assert list(iter_array(_chunks(BODY, 16), 'symbol')) == []
+    assert list(iter_array([b'{}'], 'historical')) == []
+    assert list(iter_array([b' {"historical" : [ ] } '], 'historical')) == []
+
+
+def test_nested_arrays_under_other_keys_are_skipped():
+    assert list(iter_array(_chunks(BODY, 4), 'tail')) == [1, 2, 3]
+
+
+def test_stops_reading_once_the_caller_has_enough():
+    rows = [{"date": f"2024-01-{day:02d}", "close": day} for day in range(1, 29)]
+    body = json.dumps({"historical": rows}).encode()
+    read = []
+
+    elements = iter_array(_chunks(body, 32, read), 'historical')
+    first = [next(elements) for _ in range(2)]
+    elements.close()
+
+    assert first == rows[:2]
+    assert len(read) < len(body) // 32 // 4
+
+
+def test_truncated_body_raises():
+    with pytest.raises(ValueError):
+        list(iter_array(_chunks(BODY[:-40], 16), 'historical'))
+    with pytest.raises(ValueError):
+        list(iter_array([b'["not", "an", "object"]'], 'historical'))
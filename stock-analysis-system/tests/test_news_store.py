@@ -0,0 +1,101 @@
+from datetime import datetime, timedelta, timezone
+
+from manager.tools.market_hours import MARKET_TZ
+from manager.tools.news_store import NewsStore, normalize_date, since_param
+
+
+def _ago(hours: float) -> datetime:
+    return datetime.now(timezone.utc) - timedelta(hours=hours)
+
+
+def test_normalize_date_converts_provider_times_to_utc():
+    assert normalize_date('2024-06-12T14:03:00Z') == '2024-06-12 14:03:00'
+    assert normalize_date('2024-06-12T14:03:00.120Z') == '2024-06-12 14:03:00'
+    assert normalize_date('2024-06-12 10:03:00', MARKET_TZ) == '2024-06-12 14:03:00'
+    assert normalize_date('2024-01-12 10:03:00', MARKET_TZ) == '2024-01-12 15:03:00'
+    assert normalize_date('Unknown date') == ''
+
+
+def test_since_param_is_expressed_in_the_upstream_time_zone():
+    assert since_param('2024-06-12 02:00:00', '%Y-%m-%d', MARKET_TZ) == '2024-06-11'
+    assert since_param('2024-06-12 02:00:00', '%Y-%m-%dT%H:%M:%S') == '2024-06-12T02:00:00'
+    assert since_param(None, '%Y-%m-%d') is None
+
+
+def test_articles_of_both_providers_are_ordered_on_one_clock(tmp_path):
+    store = NewsStore(str(tmp_path))
+    eastern = _ago(1).astimezone(MARKET_TZ).strftime('%Y-%m-%d %H:%M:%S')
+    store.merge('AAPL', [{"url": "https://fmp.example/a", "title": "Apple ships new chips", "publishedDate": eastern}],
+                tz=MARKET_TZ)
+    utc = _ago(2).strftime('%Y-%m-%dT%H:%M:%SZ')
+    store.merge('AAPL', [{"url": "https://newsapi.example/b", "title": "Supplier results beat estimates",
+                          "publishedDate": utc}])
+
+    assert [a["url"] for a in store.latest('AAPL')] == ["https://fmp.example/a", "https://newsapi.example/b"]
+
+
+def test_latest_cutoff_uses_utc(tmp_path):
+    store = NewsStore(str(tmp_path))
+    store.merge('AAPL', [
+        {"url": "https://x.example/new", "title": "Inside the window", "publishedDate": _ago(24 * 7 - 1).isoformat()},
+        {"url": "https://x.example/old", "title": "Outside the window", "publishedDate": _ago(24 * 7 + 1).isoformat()},
+    ])
+
+    assert [a["url"] for a in store.latest('AAPL')] == ["https://x.example/new"]
+    assert len(store.latest('AAPL', max_age=None)) == 2
+
+
+def _article(url: str, title: str, hours_ago: float = 1) -> dict:
+    return {"url": url, "title": title, "publishedDate": _ago(hours_ago).isoformat()}
+
+
+def test_same_url_in_another_form_is_a_duplicate(tmp_path):
+    store = NewsStore(str(tmp_path))
+    store.merge('AAPL', [_article("https://www.reuters.com/markets/apple-results/", "Apple results beat estimates")])
+
+    added = store.merge('AAPL', [
+        _article("http://reuters.com/markets/apple-results?utm_source=feed#top", "Apple results top forecasts"),
+        _article("https://reuters.com/markets/apple-results-2", "Apple opens a store in Mumbai"),
+    ])
+
+    assert added == 1
+    assert len(store.latest('AAPL')) == 2
+
+
+def test_syndicated_headline_is_a_duplicate_but_a_different_story_is_not(tmp_path):
+    store = NewsStore(str(tmp_path))
+    store.merge('AAPL', [_article("https://a.example/1", "Apple shares fall as iPhone sales slow in China")])
+
+    added = store.merge('AAPL', [
+        _article("https://b.example/2", "Apple Shares Fall as iPhone Sales Slow in China - Yahoo Finance"),
+        _article("https://c.example/3", "Apple shares fall as iPhone sales slow in China again | Reuters"),
+        _article("https://d.example/4", "Apple shares rise as iPhone sales recover in India"),
+    ])
+
+    assert added == 1
+    assert [a["url"] for a in store.latest('AAPL')] == ["https://a.example/1", "https://d.example/4"]
+
+
+def test_articles_without_url_are_keyed_by_headline(tmp_path):
+    store = NewsStore(str(tmp_path))
+
+    added = store.merge('AAPL', [
+        {"title": "Apple names a new CFO", "publishedDate": _ago(1).isoformat()},
+        {"url": "", "title": "apple names a new cfo", "publishedDate": _ago(2).isoformat()},
+    ])
+
+    assert added == 1
+
+
+def test_merged_batches_stay_newest_first_and_survive_a_restart(tmp_path, monkeypatch):
+    monkeypatch.setattr('manager.tools.news_store.MAX_ARTICLES', 3)
+    newest = _article("https://x.example/1h", "One hour ago", 1)
+    store = NewsStore(str(tmp_path))
+    store.merge('AAPL', [_article("https://x.example/5h", "Five hours ago", 5), newest], checked=False)
+    store.merge('AAPL', [_article("https://x.example/3h", "Three hours ago", 3),
+                         _article("https://x.example/9h", "Nine hours ago", 9)], checked=False)
+
+    reopened = NewsStore(str(tmp_path))
+    assert [a["title"] for a in reopened.latest('AAPL')] == ["One hour ago", "Three hours ago", "Five hours ago"]
+    assert reopened.newest_published('AAPL') == normalize_date(newest["publishedDate"])
+    assert not reopened.checked_since('AAPL', 60)
@@ -0,0 +1,82 @@
+from datetime import date
+
+import numpy as np
+import pytest
+
+from manager.sub_agents.ticker_price_change.engine import (
+    HORIZONS, bars_needed, compute_price_change, compute_price_changes, target_date,
+)
+from manager.tools.price_store import BAR_DTYPE
+
+
+def _sessions(last: str, count: int) -> np.ndarray:
+    """`count` weekday bars ending on `last`, closing at 100, 101, ..."""
+    days = np.busday_offset(np.datetime64(last, 'D'), np.arange(1 - count, 1), roll='backward')
+    bars = np.zeros(count, dtype=BAR_DTYPE)
+    bars['date'] = days
+    bars['close'] = 100 + np.arange(count, dtype=float)
+    return bars
+
+
+@pytest.mark.parametrize("horizon, as_of, expected", [
+    ("1day", date(2024, 6, 10), date(2024, 6, 9)),
+    ("1week", date(2024, 6, 12), date(2024, 6, 5)),
+    ("1month", date(2024, 3, 31), date(2024, 2, 29)),
+    ("3month", date(2024, 5, 31), date(2024, 2, 29)),
+    ("6month", date(2024, 8, 31), date(2024, 2, 29)),
+    ("1year", date(2024, 2, 29), date(2023, 2, 28)),
+    ("1month", date(2024, 1, 15), date(2023, 12, 15)),
+    ("ytd", date(2024, 6, 12), date(2023, 12, 31)),
+])
+def test_target_date_clamps_to_the_end_of_shorter_months(horizon, as_of, expected):
+    assert target_date(horizon, as_of) == expected
+
+
+def test_unknown_horizon_is_rejected():
+    with pytest.raises(ValueError):
+        target_date("2decades", date(2024, 6, 12))
+
+
+def test_bars_needed_scales_calendar_days_to_weekdays():
+    as_of = date(2024, 6, 12)
+
+    assert bars_needed(["1day"], as_of) == 6
+    # 2023-06-12 -> 2024-06-12 spans a leap day: 366 days, 262 weekdays
+    assert bars_needed(HORIZONS, as_of) == 267
+    assert bars_needed(["ytd", "1week"], as_of) == bars_needed(["ytd"], as_of)
+
+
+@pytest.mark.parametrize("as_of", [date(2024, 6, 12), date(2024, 3, 4), date(2025, 1, 2), date(2024, 12, 31)])
+def test_bars_needed_window_reaches_every_horizon(as_of):
+    bars = _sessions(str(as_of), bars_needed(HORIZONS, as_of))
+
+    changes = compute_price_change(bars)
+
+    assert not [h for h in HORIZONS if isinstance(changes[h], dict)]
+
+
+def test_lookup_takes_the_last_session_on_or_before_the_target():
+    bars = _sessions('2024-06-10', 40)
+
+    changes = compute_price_change(bars, ["1day", "1week"])
+
+    # Monday compares against Friday; a week back lands on the previous Monday
+    assert changes["1day"].previous_date == "2024-06-07"
+    assert changes["1week"].previous_date == "2024-06-03"
+    assert changes["1week"].change == 5.0
+    assert changes["1week"].change_percent == pytest.approx(5 / bars['close'][-6] * 100)
+
+
+def test_symbols_are_looked_up_against_their_own_latest_bar():
+    results = compute_price_changes({
+        "AAPL": _sessions('2024-06-12', 30),
+        "MSFT": _sessions('2024-06-07', 30),
+        "IPO": _sessions('2024-06-12', 3),
+        "NEW": _sessions('2024-06-12', 1),
+    }, ["1day", "1month"])
+
+    assert results["AAPL"]["1day"].previous_date == "2024-06-11"
+    assert results["MSFT"]["1day"].previous_date == "2024-06-06"
+    assert results["MSFT"]["1month"].previous_date == "2024-05-07"
+    assert "error" in results["IPO"]["1month"] and results["IPO"]["1day"].change == 1.0
+    assert "error" in results["NEW"]
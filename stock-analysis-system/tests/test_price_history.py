@@ -0,0 +1,70 @@
+from datetime import date
+
+import numpy as np
+import pytest
+
+import manager.tools.tools as tools
+from manager.tools.models import PriceSeries
+from manager.tools.price_store import BAR_DTYPE, PriceStore
+
+# A Wednesday during market hours: the newest upstream bar is today's live one
+TODAY = np.datetime64('2024-06-12')
+LAST_COMPLETED = date(2024, 6, 11)
+
+
+def _sessions_until(last: np.datetime64, count: int) -> np.ndarray:
+    return np.busday_offset(last, np.arange(-count + 1, 1), roll='backward')
+
+
+class _Upstream:
+    """Stands in for FMPTools._get_json, serving bars listed since `listed`"""
+
+    def __init__(self, listed: str = '2000-01-03'):
+        self.listed = np.datetime64(listed)
+        self.requests = []
+
+    def __call__(self, url, params, cache_kind=None, parse=None, stream=False):
+        self.requests.append(dict(params))
+        if 'from' in params:
+            days = np.arange(np.datetime64(params['from']), TODAY + 1)
+            days = days[np.is_busday(days)]
+        else:
+            days = _sessions_until(TODAY, params['timeseries'])
+        days = days[days >= self.listed]
+        bars = np.zeros(len(days), dtype=BAR_DTYPE)
+        bars['date'] = days
+        bars['close'] = 100.0
+        return {"status": "success", "data": PriceSeries(url.rsplit('/', 1)[-1], bars)}
+
+
+@pytest.fixture
+def upstream(monkeypatch, tmp_path):
+    fake = _Upstream()
+    monkeypatch.setattr(tools, 'price_store', PriceStore(str(tmp_path)))
+    monkeypatch.setattr(tools, 'is_market_open', lambda: True)
+    monkeypatch.setattr(tools, 'last_completed_session', lambda: LAST_COMPLETED)
+    monkeypatch.setattr(tools, '_listing_starts', {})
+    monkeypatch.setattr(tools.FMPTools, '_get_json', lambda self, *args, **kwargs: fake(*args, **kwargs))
+    return fake
+
+
+@pytest.mark.parametrize('days', [1, 30])
+def test_second_call_while_market_is_open_only_asks_for_new_bars(upstream, days):
+    fmp = tools.FMPTools()
+    first = fmp._load_price_history('AAPL', days)
+    second = fmp._load_price_history('AAPL', days)
+
+    assert 'timeseries' in upstream.requests[0]
+    assert upstream.requests[1].get('from') == str(np.datetime64(LAST_COMPLETED) + 1)
+    assert len(first['data'].bars) == len(second['data'].bars) == days
+    assert second['data'].bars['date'][-1] == TODAY
+
+
+def test_recent_listing_is_fetched_in_full_only_once(upstream):
+    upstream.listed = np.datetime64('2024-05-20')
+    fmp = tools.FMPTools()
+    fmp._load_price_history('NEWCO', 60)
+    result = fmp._load_price_history('NEWCO', 60)
+
+    assert ['from' in params for params in upstream.requests] == [False, True]
+    assert result['data'].bars['date'][0] == upstream.listed
@@ -0,0 +1,61 @@
+import numpy as np
+
+from manager.tools.price_store import BAR_DTYPE, PriceStore
+
+
+def _bars(start: str, sessions: int) -> np.ndarray:
+    days = np.busday_offset(np.datetime64(start, 'D'), np.arange(sessions), roll='forward')
+    bars = np.zeros(sessions, dtype=BAR_DTYPE)
+    bars['date'] = days
+    bars['close'] = np.arange(sessions, dtype=float)
+    return bars
+
+
+def _is_contiguous(bars: np.ndarray) -> bool:
+    dates = bars['date']
+    return bool(np.all(np.busday_offset(dates[:-1], 1, roll='forward') == dates[1:]))
+
+
+def test_merge_replaces_stored_bars_when_window_leaves_a_gap(tmp_path):
+    store = PriceStore(str(tmp_path))
+    store.merge('AAPL', _bars('2023-01-02', 30))
+
+    recent = _bars('2024-01-02', 60)
+    store.merge('AAPL', recent)
+
+    stored = store.load('AAPL')
+    assert len(stored) == 60
+    assert stored['date'][0] == recent['date'][0]
+    assert _is_contiguous(stored)
+
+
+def test_merge_appends_an_adjoining_window(tmp_path):
+    store = PriceStore(str(tmp_path))
+    bars = _bars('2024-01-02', 90)
+    store.merge('AAPL', bars[:30])
+    store.merge('AAPL', bars[20:])
+
+    stored = store.load('AAPL')
+    assert len(stored) == 90
+    assert _is_contiguous(stored)
+
+
+def test_merge_backfills_older_overlapping_bars(tmp_path):
+    store = PriceStore(str(tmp_path))
+    bars = _bars('2024-01-02', 90)
+    store.merge('AAPL', bars[60:])
+    store.merge('AAPL', bars[:61])
+
+    stored = store.load('AAPL')
+    assert len(stored) == 90
+    assert _is_contiguous(stored)
+
+
+def test_merge_ignores_older_bars_that_do_not_touch_the_stored_range(tmp_path):
+    store = PriceStore(str(tmp_path))
+    store.merge('AAPL', _bars('2024-01-02', 30))
+    store.merge('AAPL', _bars('2023-01-02', 30))
+
+    stored = store.load('AAPL')
+    assert len(stored) == 30
+    assert stored['date'][0] == np.datetime64('2024-01-02')
@@ -0,0 +1,80 @@
+import threading
+import time
+
+from manager.tools.rate_limit import BACKGROUND, INTERACTIVE, RateLimiter, priority, request_priority
+
+
+def _frozen_limiter(**endpoint_quotas) -> RateLimiter:
+    """FMP limiter whose buckets never refill, with no provider-wide quota"""
+    limiter = RateLimiter(clock=lambda: 0.0)
+    limiter.configure('fmp')
+    for endpoint, per_minute in endpoint_quotas.items():
+        limiter.configure('fmp', endpoint.replace('_', '-'), per_minute=per_minute)
+    return limiter
+
+
+def test_an_endpoint_out_of_quota_does_not_hold_up_the_others():
+    limiter = _frozen_limiter(historical_price_full=1)
+
+    assert limiter.acquire('fmp', 'historical-price-full', max_wait=0)
+    assert not limiter.acquire('fmp', 'historical-price-full', max_wait=0)
+    assert limiter.acquire('fmp', 'quote', max_wait=0)
+    assert limiter.stats()["fmp"] == {"granted": 2, "waited": 0, "rejected": 1, "wait_seconds": 0.0, "queued": 0}
+
+
+def test_provider_quota_is_shared_by_its_endpoints():
+    limiter = RateLimiter(clock=lambda: 0.0)
+    limiter.configure('newsapi', per_day=2)
+
+    endpoints = ('everything', 'top-headlines', 'everything')
+    granted = [limiter.acquire('newsapi', endpoint, max_wait=0) for endpoint in endpoints]
+
+    assert granted == [True, True, False]
+
+
+def test_outranked_by_a_higher_priority_waiter_on_another_endpoint():
+    limiter = _frozen_limiter(historical_price_full=1)
+    limiter._queues[('fmp', 'quote')] = [(INTERACTIVE, 0)]
+
+    assert limiter._outranked('fmp', 'historical-price-full', BACKGROUND)
+    assert not limiter._outranked('fmp', 'historical-price-full', INTERACTIVE)
+    assert not limiter._outranked('fmp', 'quote', BACKGROUND)
+
+
+def test_not_outranked_by_a_waiter_whose_own_endpoint_is_empty():
+    limiter = _frozen_limiter(quote=1)
+    limiter.acquire('fmp', 'quote', max_wait=0)
+    limiter._queues[('fmp', 'quote')] = [(INTERACTIVE, 0)]
+
+    assert not limiter._outranked('fmp', 'historical-price-full', BACKGROUND)
+
+
+def test_waiters_on_an_endpoint_are_served_in_priority_order():
+    limiter = RateLimiter()
+    limiter.configure('fmp', 'quote', per_minute=600)
+    # Spent up front: the next token comes 100ms from now
+    bucket, = limiter._buckets[('fmp', 'quote')]
+    bucket.tokens, bucket._updated = 0.0, time.monotonic()
+    served = []
+
+    def request(level, name):
+        if limiter.acquire('fmp', 'quote', level=level, max_wait=5):
+            served.append(name)
+
+    background = threading.Thread(target=request, args=(BACKGROUND, 'background'))
+    background.start()
+    time.sleep(0.01)
+    interactive = threading.Thread(target=request, args=(INTERACTIVE, 'interactive'))
+    interactive.start()
+    background.join()
+    interactive.join()
+
+    assert served == ['interactive', 'background']
+    assert limiter.stats()["fmp"]["waited"] == 2
+
+
+def test_priority_context_sets_the_default_level():
+    assert request_priority.get() == INTERACTIVE
+    with priority(BACKGROUND):
+        assert request_priority.get() == BACKGROUND
+    assert request_priority.get() == INTERACTIVE
@@ -0,0 +1,70 @@
+import pytest
+import requests
+
+from manager.tools import session
+
+
+class _Response:
+    def __init__(self, status_code: int, headers: dict = None):
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+def _replay(monkeypatch, outcomes):
+    """Make http_get answer with the given responses (or raise the given errors) in order"""
+    calls = []
+
+    def http_get(url, params=None, timeout=None, **kwargs):
+        outcome = outcomes[len(calls)]
+        calls.append(url)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    monkeypatch.setattr(session, 'http_get', http_get)
+    monkeypatch.setattr(session, 'MAX_RETRIES', 3)
+    return calls
+
+
+def test_every_retry_takes_a_rate_limit_token(monkeypatch):
+    calls = _replay(monkeypatch, [_Response(503), requests.ReadTimeout(), _Response(200)])
+    tokens, delays = [], []
+
+    response = session.get_with_retries('https://fmp.example/quote/AAPL', acquire=lambda: tokens.append(1) or True,
+                                        sleep=delays.append)
+
+    assert response.status_code == 200
+    assert len(calls) == 3 and len(tokens) == 2
+    assert delays[1] > delays[0]
+
+
+def test_rate_limited_responses_are_not_retried(monkeypatch):
+    calls = _replay(monkeypatch, [_Response(429)])
+
+    response = session.get_with_retries('https://fmp.example/quote/AAPL', acquire=lambda: pytest.fail('retried'),
+                                        sleep=lambda seconds: None)
+
+    assert response.status_code == 429 and len(calls) == 1
+
+
+def test_refused_token_returns_the_last_answer(monkeypatch):
+    first = _Response(502, {'Retry-After': '7'})
+    calls = _replay(monkeypatch, [first])
+    delays = []
+
+    response = session.get_with_retries('https://fmp.example/quote/AAPL', acquire=lambda: False, sleep=delays.append)
+
+    assert response is first and not first.closed
+    assert len(calls) == 1 and delays[0] >= 7
+
+
+def test_gives_up_after_max_retries(monkeypatch):
+    calls = _replay(monkeypatch, [requests.ReadTimeout()] * 4)
+
+    with pytest.raises(requests.ReadTimeout):
+        session.get_with_retries('https://newsapi.example/everything', sleep=lambda seconds: None)
+    assert len(calls) == 4
@@ -0,0 +1,94 @@
+import pickle
+
+import pytest
+
+from manager.tools.cache import TTLCache
+from manager.tools.shared_cache import _EVICT_TO, SQLiteCache
+
+
+class _Clock:
+    def __init__(self, now: float = 1_000_000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float) -> None:
+        self.now += seconds
+
+
+@pytest.fixture
+def clock():
+    return _Clock()
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / 'responses.sqlite3')
+
+
+def _worker(path, clock, stale_ttl=100.0):
+    """A process's response cache on top of its own connection to the shared file"""
+    return TTLCache(maxsize=16, clock=clock, stale_ttl=stale_ttl, backing=SQLiteCache(path, clock=clock))
+
+
+def test_set_is_written_through_and_read_by_another_worker(path, clock):
+    first, second = _worker(path, clock), _worker(path, clock)
+    first.set('quote/AAPL', {"price": 190.5}, ttl=10)
+
+    assert second.get('quote/AAPL') == {"price": 190.5}
+    assert second.stats()["shared_hits"] == 1
+    # Copied into the local cache: the next lookup does not touch the file
+    second.get('quote/AAPL')
+    assert second.backing.stats()["hits"] == 1
+
+
+def test_expired_shared_row_is_a_miss_and_is_not_copied_locally(path, clock):
+    first, second = _worker(path, clock), _worker(path, clock)
+    first.set('quote/AAPL', {"price": 190.5}, ttl=10)
+    clock.advance(11)
+
+    assert second.get('quote/AAPL') is None
+    assert len(second) == 0
+    stats = second.backing.stats()
+    assert (stats["hits"], stats["stale_hits"], stats["misses"]) == (0, 0, 1)
+
+
+def test_stale_lookup_counts_separately_from_hits(path, clock):
+    first, second = _worker(path, clock), _worker(path, clock)
+    first.set('quote/AAPL', {"price": 190.5}, ttl=10)
+    clock.advance(25)
+
+    value, age = second.get_stale('quote/AAPL')
+    assert value == {"price": 190.5} and age == pytest.approx(15)
+    stats = second.backing.stats()
+    assert (stats["hits"], stats["stale_hits"]) == (0, 1)
+    assert stats["hit_rate"] == 0.0
+
+
+def test_row_past_its_stale_period_is_gone(path, clock):
+    first, second = _worker(path, clock, stale_ttl=5), _worker(path, clock, stale_ttl=5)
+    first.set('news/AAPL', ["headline"], ttl=10)
+    clock.advance(16)
+
+    assert second.get_stale('news/AAPL') is None
+
+
+def test_evict_drops_rows_past_their_stale_period_then_the_soonest_to_go(path, clock):
+    value = 'x' * 1000
+    size = len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+    store = SQLiteCache(path, max_bytes=10 * size, clock=clock)
+    store.set('expired', value, ttl=1, stale_ttl=1)
+    for i in range(12):
+        # Later keys stay stale for longer
+        store.set(f'key{i}', value, ttl=10, stale_ttl=i)
+    clock.advance(5)
+
+    removed = store.evict()
+
+    stats = store.stats()
+    assert stats["bytes"] <= 10 * size * _EVICT_TO
+    # Down to the target, not a whole batch below it
+    assert (removed, stats["entries"]) == (4, 9)
+    assert store.get('expired') is None
+    assert [store.get(f'key{i}') is not None for i in range(4)] == [False, False, False, True]
@@ -0,0 +1,93 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from manager.tools.singleflight import SingleFlight
+
+
+def _wait_until(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.001)
+
+
+@pytest.fixture
+def pool():
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        yield executor
+
+
+def test_concurrent_callers_share_one_call(pool):
+    flights, release, runs = SingleFlight(), threading.Event(), []
+
+    def fetch():
+        runs.append(1)
+        release.wait(2)
+        return {"symbol": "AAPL"}
+
+    leader = pool.submit(flights.do, 'quote/AAPL', fetch)
+    _wait_until(lambda: runs)
+    followers = [pool.submit(flights.do, 'quote/AAPL', fetch) for _ in range(5)]
+    _wait_until(lambda: flights.stats()["shared"] == 5)
+    release.set()
+
+    assert leader.result() == ({"symbol": "AAPL"}, False)
+    assert all(f.result() == ({"symbol": "AAPL"}, True) for f in followers)
+    assert len(runs) == 1
+    assert flights.stats() == {"in_flight": 0, "executed": 1, "shared": 5}
+
+
+def test_smaller_request_joins_a_larger_call_but_not_the_reverse(pool):
+    flights, release = SingleFlight(), threading.Event()
+    started = threading.Semaphore(0)
+
+    def history(size):
+        def fetch():
+            started.release()
+            release.wait(2)
+            return list(range(size))
+        return fetch
+
+    large = pool.submit(flights.do, 'history/AAPL', history(250), 250)
+    assert started.acquire(timeout=2)
+    small = pool.submit(flights.do, 'history/AAPL', history(20), 20)
+    larger = pool.submit(flights.do, 'history/AAPL', history(500), 500)
+    assert started.acquire(timeout=2)
+    _wait_until(lambda: flights.stats()["shared"] == 1)
+    release.set()
+
+    assert large.result() == (list(range(250)), False)
+    assert small.result() == (list(range(250)), True)
+    assert larger.result() == (list(range(500)), False)
+    assert flights.stats()["executed"] == 2
+
+
+def test_error_reaches_every_waiter_and_the_key_is_freed(pool):
+    flights, release = SingleFlight(), threading.Event()
+
+    def failing():
+        release.wait(2)
+        raise ConnectionError("upstream down")
+
+    leader = pool.submit(flights.do, 'news/AAPL', failing)
+    _wait_until(lambda: flights.stats()["in_flight"] == 1)
+    follower = pool.submit(flights.do, 'news/AAPL', failing)
+    _wait_until(lambda: flights.stats()["shared"] == 1)
+    release.set()
+
+    for future in (leader, follower):
+        with pytest.raises(ConnectionError):
+            future.result()
+    assert flights.do('news/AAPL', lambda: []) == ([], False)
+
+
+def test_different_keys_do_not_wait_for_each_other():
+    flights = SingleFlight()
+
+    assert flights.do('quote/AAPL', lambda: 1) == (1, False)
+    assert flights.do('quote/MSFT', lambda: 2) == (2, False)
+    assert flights.do('quote/AAPL', lambda: 3) == (3, False)
+    assert flights.stats()["executed"] == 3
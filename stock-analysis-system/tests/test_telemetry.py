@@ -0,0 +1,27 @@
+from manager.tools.telemetry import Counter, Histogram, MetricsRegistry
+
+
+def test_counter_past_a_million_keeps_every_digit():
+    counter = Counter('stockbot_test_total', 'test', ['kind'])
+    counter.inc(1234567, kind='quote')
+
+    assert counter.render()[-1] == 'stockbot_test_total{kind="quote"} 1234567.0'
+
+
+def test_histogram_sum_keeps_every_digit():
+    histogram = Histogram('stockbot_test_seconds', 'test', buckets=(0.5, 1.0))
+    histogram.observe(1000000.25)
+    histogram.observe(0.5)
+
+    lines = histogram.render()
+    assert 'stockbot_test_seconds_sum 1000000.75' in lines
+    assert 'stockbot_test_seconds_bucket{le="0.5"} 1' in lines
+
+
+def test_collector_gauges_keep_every_digit():
+    registry = MetricsRegistry()
+    registry.register_collector('store', lambda: {"bytes": 268435456, "ok": True, "name": "x"})
+
+    text = registry.render()
+    assert 'stockbot_store_bytes 268435456.0' in text
+    assert 'stockbot_store_ok' not in text and 'stockbot_store_name' not in text
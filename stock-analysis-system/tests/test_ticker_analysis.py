@@ -0,0 +1,33 @@
+from manager.sub_agents.ticker_analysis.agent import TOP_ARTICLES, analyze_stock_movement, analyze_stock_movements
+
+NEWS = "\n".join([
+    "Company schedules annual shareholder meeting. Details inside",
+    "Shares plunge after fraud probe and bankruptcy warning. Investors fear the worst",
+    "Analysts upgrade the stock on record earnings. Revenue beat estimates",
+])
+
+
+def test_analysis_cites_the_articles_that_drove_the_sentiment():
+    result = analyze_stock_movement("ACME", "ACME stock decreased by 4.00%", NEWS)
+
+    articles = result["top_articles"]
+    # The neutral line hits no lexicon word and is left out; the strongest comes first
+    assert [a["article"].split()[0] for a in articles] == ["Shares", "Analysts"]
+    assert articles[0]["label"] == "negative" and articles[0]["score"] < 5 < articles[1]["score"]
+    assert result["news_sentiment"] in ("positive", "negative", "neutral")
+
+
+def test_top_articles_are_capped():
+    news = "\n".join(f"Stock {i} beat estimates" for i in range(TOP_ARTICLES + 3))
+
+    assert len(analyze_stock_movement("ACME", "ACME stock increased by 1.00%", news)["top_articles"]) == TOP_ARTICLES
+
+
+def test_batch_analysis_returns_top_articles_per_ticker():
+    result = analyze_stock_movements([
+        {"ticker": "ACME", "price_data": "ACME stock decreased by 4.00%", "news_data": NEWS},
+        {"ticker": "INIT", "price_data": "INIT stock increased by 1.00%"},
+    ])
+
+    assert len(result["analyses"]["ACME"]["top_articles"]) == 2
+    assert result["analyses"]["INIT"]["top_articles"] == []